@@ -0,0 +1,79 @@
+"""Shared xmlsec keys and signature templates"""
+
+from copy import deepcopy
+from functools import lru_cache
+
+import xmlsec
+from lxml.etree import Element, _Element, fromstring, tostring  # nosec
+
+from authentik.common.saml.constants import (
+    DIGEST_ALGORITHM_TRANSLATION_MAP,
+    NS_SIGNATURE,
+    SIGN_ALGORITHM_TRANSFORM_MAP,
+)
+from authentik.crypto.models import CertificateKeyPair
+
+
+@lru_cache(maxsize=128)
+def _load_signing_key(key_data: str, certificate_data: str | None) -> xmlsec.Key:
+    key = xmlsec.Key.from_memory(key_data, xmlsec.constants.KeyDataFormatPem, None)
+    if certificate_data:
+        key.load_cert_from_memory(certificate_data, xmlsec.constants.KeyDataFormatCertPem)
+    return key
+
+
+@lru_cache(maxsize=128)
+def _load_encryption_key(certificate_data: str) -> xmlsec.Key:
+    return xmlsec.Key.from_memory(certificate_data, xmlsec.constants.KeyDataFormatCertPem)
+
+
+@lru_cache(maxsize=32)
+def _build_signature_template(signature_algorithm: str, digest_algorithm: str) -> _Element:
+    signature = xmlsec.template.create(
+        Element("template"),
+        xmlsec.constants.TransformExclC14N,
+        SIGN_ALGORITHM_TRANSFORM_MAP.get(signature_algorithm, xmlsec.constants.TransformRsaSha1),
+        ns="ds",
+    )
+    ref = xmlsec.template.add_reference(
+        signature,
+        DIGEST_ALGORITHM_TRANSLATION_MAP.get(digest_algorithm, xmlsec.constants.TransformSha1),
+        uri="#",
+    )
+    xmlsec.template.add_transform(ref, xmlsec.constants.TransformEnveloped)
+    xmlsec.template.add_transform(ref, xmlsec.constants.TransformExclC14N)
+    key_info = xmlsec.template.ensure_key_info(signature)
+    xmlsec.template.add_x509_data(key_info)
+    # Newlines added by xmlsec have to be removed before signing,
+    # see https://github.com/xmlsec/python-xmlsec/issues/196
+    return fromstring(tostring(signature, encoding=str).replace("\n", ""))  # nosec
+
+
+def get_signing_key(kp: CertificateKeyPair, with_certificate: bool = True) -> xmlsec.Key:
+    """Get an xmlsec key to sign with the private key of `kp`, optionally with its certificate
+    loaded to be included in signatures.
+
+    Keys are parsed once per process for each key pair's PEM data, so changing a key pair
+    results in a new key. `SignatureContext` copies keys assigned to it, so the same key is
+    safe to use for multiple signatures."""
+    return _load_signing_key(kp.key_data, kp.certificate_data if with_certificate else None)
+
+
+def get_encryption_key(kp: CertificateKeyPair) -> xmlsec.Key:
+    """Get an xmlsec key to encrypt for the certificate of `kp`. Like signing keys, keys are
+    parsed once per process, and `KeysManager` copies keys added to it."""
+    return _load_encryption_key(kp.certificate_data)
+
+
+def get_signature_template(
+    signature_algorithm: str, digest_algorithm: str, reference_id: str
+) -> _Element:
+    """Get an enveloped signature template for the element with the ID `reference_id`,
+    including the signing certificate.
+
+    Templates are built once per process for each combination of algorithms, and copied
+    for every signature."""
+    signature = deepcopy(_build_signature_template(signature_algorithm, digest_algorithm))
+    reference = signature.find(f"{{{NS_SIGNATURE}}}SignedInfo/{{{NS_SIGNATURE}}}Reference")
+    reference.attrib["URI"] = f"#{reference_id}"
+    return signature
@@ -0,0 +1,56 @@
+"""Benchmark group ancestry maintenance"""
+
+from time import perf_counter
+
+from django.db import transaction
+
+from authentik.core.models import (
+    Group,
+    GroupAncestryNode,
+    GroupParentageNode,
+    deferred_group_ancestry,
+)
+from authentik.lib.generators import generate_id
+from authentik.tenants.management import TenantCommand
+
+
+class Command(TenantCommand):
+    """Benchmark maintaining group ancestry while building a group hierarchy. All changes are
+    rolled back."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--groups", type=int, default=50000, help="How many groups should be created."
+        )
+        parser.add_argument(
+            "--children", type=int, default=10, help="How many children each group has."
+        )
+
+    def build(self, groups: int, children: int, deferred: bool) -> tuple[float, int]:
+        """Create a tree of `groups` groups and return the time taken to add their parents,
+        and the resulting number of ancestry nodes"""
+        prefix = generate_id()
+        created = Group.objects.bulk_create(
+            [Group(name=f"{prefix}-{idx}") for idx in range(groups)], batch_size=1000
+        )
+        nodes = [
+            GroupParentageNode(child=group, parent=created[(idx - 1) // children])
+            for idx, group in enumerate(created)
+            if idx > 0
+        ]
+        start = perf_counter()
+        if deferred:
+            with deferred_group_ancestry():
+                GroupParentageNode.objects.bulk_create(nodes, batch_size=1000)
+        else:
+            GroupParentageNode.objects.bulk_create(nodes, batch_size=1000)
+        duration = perf_counter() - start
+        return duration, GroupAncestryNode.objects.count()
+
+    def handle_per_tenant(self, **options):
+        groups, children = options["groups"], options["children"]
+        for label, deferred in (("Incremental", False), ("Deferred", True)):
+            with transaction.atomic():
+                duration, nodes = self.build(groups, children, deferred)
+                transaction.set_rollback(True)
+            self.stdout.write(f"{label}: {groups} groups, {nodes} ancestry nodes, {duration:.2f}s")
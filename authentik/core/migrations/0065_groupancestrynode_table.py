@@ -0,0 +1,154 @@
+# Generated by Django 5.2.17 on 2026-10-18 09:12
+
+import uuid
+
+import django.db.models.deletion
+import pgtrigger.compiler
+import pgtrigger.migrations
+from django.db import migrations, models
+
+CREATE_MATERIALIZED_VIEW = """
+CREATE MATERIALIZED VIEW authentik_core_groupancestry AS
+WITH RECURSIVE accumulator AS (
+    SELECT
+    child_id::text || '-' || parent_id::text as id,
+    child_id AS descendant_id,
+    parent_id AS ancestor_id
+    FROM authentik_core_groupparentage
+
+    UNION
+
+    SELECT
+    accumulator.descendant_id::text || '-' || current.parent_id::text as id,
+    accumulator.descendant_id,
+    current.parent_id AS ancestor_id
+    FROM accumulator
+    JOIN authentik_core_groupparentage current
+    ON accumulator.ancestor_id = current.child_id
+)
+SELECT * FROM accumulator;
+CREATE INDEX authentik_c_descend_f83a71_idx ON authentik_core_groupancestry (descendant_id);
+CREATE INDEX authentik_c_ancesto_974845_idx ON authentik_core_groupancestry (ancestor_id);
+CREATE UNIQUE INDEX authentik_c_id_5d0bb4_idx ON authentik_core_groupancestry (id);
+"""
+
+POPULATE_GROUP_ANCESTRY = """
+WITH RECURSIVE accumulator AS (
+    SELECT child_id AS descendant_id, parent_id AS ancestor_id
+    FROM authentik_core_groupparentage
+
+    UNION
+
+    SELECT accumulator.descendant_id, current.parent_id AS ancestor_id
+    FROM accumulator
+    JOIN authentik_core_groupparentage current
+    ON accumulator.ancestor_id = current.child_id
+)
+INSERT INTO authentik_core_groupancestry (uuid, descendant_id, ancestor_id)
+SELECT gen_random_uuid(), descendant_id, ancestor_id FROM accumulator;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authentik_core", "0064_user_authentik_c_usernam_2f0e4b_idx"),
+    ]
+
+    operations = [
+        pgtrigger.migrations.RemoveTrigger(
+            model_name="groupparentagenode",
+            name="refresh_groupancestry",
+        ),
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    "DROP MATERIALIZED VIEW IF EXISTS authentik_core_groupancestry;",
+                    reverse_sql=CREATE_MATERIALIZED_VIEW,
+                ),
+            ],
+            state_operations=[
+                migrations.DeleteModel(name="GroupAncestryNode"),
+            ],
+        ),
+        migrations.CreateModel(
+            name="GroupAncestryNode",
+            fields=[
+                (
+                    "uuid",
+                    models.UUIDField(
+                        default=uuid.uuid4, editable=False, primary_key=True, serialize=False
+                    ),
+                ),
+                (
+                    "ancestor",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="descendant_nodes",
+                        to="authentik_core.group",
+                    ),
+                ),
+                (
+                    "descendant",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="ancestor_nodes",
+                        to="authentik_core.group",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "authentik_core_groupancestry",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("descendant", "ancestor"), name="unique_group_ancestry"
+                    )
+                ],
+            },
+        ),
+        migrations.RunSQL(POPULATE_GROUP_ANCESTRY, reverse_sql=migrations.RunSQL.noop),
+        pgtrigger.migrations.AddTrigger(
+            model_name="groupparentagenode",
+            trigger=pgtrigger.compiler.Trigger(
+                name="groupancestry_insert",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n    IF current_setting('authentik.group_ancestry_deferred', true) = 'on' THEN\n        RETURN NULL;\n    END IF;\n\n    INSERT INTO authentik_core_groupancestry (uuid, descendant_id, ancestor_id)\n    SELECT gen_random_uuid(), descendants.id, ancestors.id\n    FROM (\n        SELECT NEW.child_id AS id\n        UNION\n        SELECT descendant_id FROM authentik_core_groupancestry WHERE ancestor_id = NEW.child_id\n    ) AS descendants\n    CROSS JOIN (\n        SELECT NEW.parent_id AS id\n        UNION\n        SELECT ancestor_id FROM authentik_core_groupancestry WHERE descendant_id = NEW.parent_id\n    ) AS ancestors\n    ON CONFLICT (descendant_id, ancestor_id) DO NOTHING;\nRETURN NULL;",
+                    hash="14096f7b87620265ef88d58f7b8bc31bf7088a18",
+                    operation="INSERT",
+                    pgid="pgtrigger_groupancestry_insert_f554b",
+                    table="authentik_core_groupparentage",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="groupparentagenode",
+            trigger=pgtrigger.compiler.Trigger(
+                name="groupancestry_update",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n    IF current_setting('authentik.group_ancestry_deferred', true) = 'on' THEN\n        RETURN NULL;\n    END IF;\n\n    WITH RECURSIVE affected AS (\n        SELECT OLD.child_id AS id\n        UNION\n        SELECT descendant_id FROM authentik_core_groupancestry WHERE ancestor_id = OLD.child_id\n    ),\n    accumulator AS (\n        SELECT child_id AS descendant_id, parent_id AS ancestor_id\n        FROM authentik_core_groupparentage\n        WHERE child_id IN (SELECT id FROM affected)\n\n        UNION\n\n        SELECT accumulator.descendant_id, current.parent_id AS ancestor_id\n        FROM accumulator\n        JOIN authentik_core_groupparentage current\n        ON accumulator.ancestor_id = current.child_id\n    )\n    DELETE FROM authentik_core_groupancestry\n    WHERE descendant_id IN (SELECT id FROM affected)\n    AND (descendant_id, ancestor_id) NOT IN (\n        SELECT descendant_id, ancestor_id FROM accumulator\n    );\n\n    INSERT INTO authentik_core_groupancestry (uuid, descendant_id, ancestor_id)\n    SELECT gen_random_uuid(), descendants.id, ancestors.id\n    FROM (\n        SELECT NEW.child_id AS id\n        UNION\n        SELECT descendant_id FROM authentik_core_groupancestry WHERE ancestor_id = NEW.child_id\n    ) AS descendants\n    CROSS JOIN (\n        SELECT NEW.parent_id AS id\n        UNION\n        SELECT ancestor_id FROM authentik_core_groupancestry WHERE descendant_id = NEW.parent_id\n    ) AS ancestors\n    ON CONFLICT (descendant_id, ancestor_id) DO NOTHING;\nRETURN NULL;",
+                    hash="40140d445be0344f1058564d5bef76c42186ec24",
+                    operation="UPDATE",
+                    pgid="pgtrigger_groupancestry_update_46a75",
+                    table="authentik_core_groupparentage",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="groupparentagenode",
+            trigger=pgtrigger.compiler.Trigger(
+                name="groupancestry_delete",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n    IF current_setting('authentik.group_ancestry_deferred', true) = 'on' THEN\n        RETURN NULL;\n    END IF;\n\n    WITH RECURSIVE affected AS (\n        SELECT OLD.child_id AS id\n        UNION\n        SELECT descendant_id FROM authentik_core_groupancestry WHERE ancestor_id = OLD.child_id\n    ),\n    accumulator AS (\n        SELECT child_id AS descendant_id, parent_id AS ancestor_id\n        FROM authentik_core_groupparentage\n        WHERE child_id IN (SELECT id FROM affected)\n\n        UNION\n\n        SELECT accumulator.descendant_id, current.parent_id AS ancestor_id\n        FROM accumulator\n        JOIN authentik_core_groupparentage current\n        ON accumulator.ancestor_id = current.child_id\n    )\n    DELETE FROM authentik_core_groupancestry\n    WHERE descendant_id IN (SELECT id FROM affected)\n    AND (descendant_id, ancestor_id) NOT IN (\n        SELECT descendant_id, ancestor_id FROM accumulator\n    );\nRETURN NULL;",
+                    hash="c86fe98d8243002029b0fb91a5a6cdd46d6083ed",
+                    operation="DELETE",
+                    pgid="pgtrigger_groupancestry_delete_442bc",
+                    table="authentik_core_groupparentage",
+                    when="AFTER",
+                ),
+            ),
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.17 on 2026-10-18 16:40
+
+import pgtrigger.compiler
+import pgtrigger.migrations
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authentik_core", "0066_groupancestry_lock"),
+    ]
+
+    operations = [
+        pgtrigger.migrations.RemoveTrigger(
+            model_name="groupparentagenode",
+            name="groupancestry_insert",
+        ),
+        pgtrigger.migrations.RemoveTrigger(
+            model_name="groupparentagenode",
+            name="groupancestry_update",
+        ),
+        pgtrigger.migrations.RemoveTrigger(
+            model_name="groupparentagenode",
+            name="groupancestry_delete",
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="groupparentagenode",
+            trigger=pgtrigger.compiler.Trigger(
+                name="groupancestry_insert",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n    IF current_setting('authentik.group_ancestry_deferred', true) = 'on' THEN\n        PERFORM set_config('authentik.group_ancestry_changed', 'on', true);\n        RETURN NULL;\n    END IF;\n\n    PERFORM pg_advisory_xact_lock(hashtext('authentik_core_groupancestry'));\n\n    INSERT INTO authentik_core_groupancestry (uuid, descendant_id, ancestor_id)\n    SELECT gen_random_uuid(), descendants.id, ancestors.id\n    FROM (\n        SELECT NEW.child_id AS id\n        UNION\n        SELECT descendant_id FROM authentik_core_groupancestry WHERE ancestor_id = NEW.child_id\n    ) AS descendants\n    CROSS JOIN (\n        SELECT NEW.parent_id AS id\n        UNION\n        SELECT ancestor_id FROM authentik_core_groupancestry WHERE descendant_id = NEW.parent_id\n    ) AS ancestors\n    ON CONFLICT (descendant_id, ancestor_id) DO NOTHING;\nRETURN NULL;",
+                    hash="6397d99cfa3da9e45675aa500aefc52322f0f655",
+                    operation="INSERT",
+                    pgid="pgtrigger_groupancestry_insert_f554b",
+                    table="authentik_core_groupparentage",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="groupparentagenode",
+            trigger=pgtrigger.compiler.Trigger(
+                name="groupancestry_update",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n    IF current_setting('authentik.group_ancestry_deferred', true) = 'on' THEN\n        PERFORM set_config('authentik.group_ancestry_changed', 'on', true);\n        RETURN NULL;\n    END IF;\n\n    PERFORM pg_advisory_xact_lock(hashtext('authentik_core_groupancestry'));\n\n    WITH RECURSIVE affected AS (\n        SELECT OLD.child_id AS id\n        UNION\n        SELECT descendant_id FROM authentik_core_groupancestry WHERE ancestor_id = OLD.child_id\n    ),\n    accumulator AS (\n        SELECT child_id AS descendant_id, parent_id AS ancestor_id\n        FROM authentik_core_groupparentage\n        WHERE child_id IN (SELECT id FROM affected)\n\n        UNION\n\n        SELECT accumulator.descendant_id, current.parent_id AS ancestor_id\n        FROM accumulator\n        JOIN authentik_core_groupparentage current\n        ON accumulator.ancestor_id = current.child_id\n    )\n    DELETE FROM authentik_core_groupancestry\n    WHERE descendant_id IN (SELECT id FROM affected)\n    AND (descendant_id, ancestor_id) NOT IN (\n        SELECT descendant_id, ancestor_id FROM accumulator\n    );\n\n    INSERT INTO authentik_core_groupancestry (uuid, descendant_id, ancestor_id)\n    SELECT gen_random_uuid(), descendants.id, ancestors.id\n    FROM (\n        SELECT NEW.child_id AS id\n        UNION\n        SELECT descendant_id FROM authentik_core_groupancestry WHERE ancestor_id = NEW.child_id\n    ) AS descendants\n    CROSS JOIN (\n        SELECT NEW.parent_id AS id\n        UNION\n        SELECT ancestor_id FROM authentik_core_groupancestry WHERE descendant_id = NEW.parent_id\n    ) AS ancestors\n    ON CONFLICT (descendant_id, ancestor_id) DO NOTHING;\nRETURN NULL;",
+                    hash="f31a40dd18f5b99fdbea7252359b7fcdf2229d80",
+                    operation="UPDATE",
+                    pgid="pgtrigger_groupancestry_update_46a75",
+                    table="authentik_core_groupparentage",
+                    when="AFTER",
+                ),
+            ),
+        ),
+        pgtrigger.migrations.AddTrigger(
+            model_name="groupparentagenode",
+            trigger=pgtrigger.compiler.Trigger(
+                name="groupancestry_delete",
+                sql=pgtrigger.compiler.UpsertTriggerSql(
+                    func="\n    IF current_setting('authentik.group_ancestry_deferred', true) = 'on' THEN\n        PERFORM set_config('authentik.group_ancestry_changed', 'on', true);\n        RETURN NULL;\n    END IF;\n\n    PERFORM pg_advisory_xact_lock(hashtext('authentik_core_groupancestry'));\n\n    WITH RECURSIVE affected AS (\n        SELECT OLD.child_id AS id\n        UNION\n        SELECT descendant_id FROM authentik_core_groupancestry WHERE ancestor_id = OLD.child_id\n    ),\n    accumulator AS (\n        SELECT child_id AS descendant_id, parent_id AS ancestor_id\n        FROM authentik_core_groupparentage\n        WHERE child_id IN (SELECT id FROM affected)\n\n        UNION\n\n        SELECT accumulator.descendant_id, current.parent_id AS ancestor_id\n        FROM accumulator\n        JOIN authentik_core_groupparentage current\n        ON accumulator.ancestor_id = current.child_id\n    )\n    DELETE FROM authentik_core_groupancestry\n    WHERE descendant_id IN (SELECT id FROM affected)\n    AND (descendant_id, ancestor_id) NOT IN (\n        SELECT descendant_id, ancestor_id FROM accumulator\n    );\nRETURN NULL;",
+                    hash="0d8982f8c506a4cd313d7957e0072ec5af25bdd5",
+                    operation="DELETE",
+                    pgid="pgtrigger_groupancestry_delete_442bc",
+                    table="authentik_core_groupparentage",
+                    when="AFTER",
+                ),
+            ),
+        ),
+    ]
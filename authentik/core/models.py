@@ -2,6 +2,10 @@
 
 import re
 import traceback
+from collections.abc import Generator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from copy import deepcopy
 from datetime import datetime
 from enum import StrEnum
 from hashlib import sha256
@@ -16,17 +20,14 @@ from django.contrib.auth.models import UserManager as DjangoUserManager
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.sessions.base_session import AbstractBaseSession
 from django.core.validators import validate_slug
-from django.db import models
+from django.db import connection, models, transaction
 from django.db.models import Q, QuerySet, options
 from django.http import HttpRequest
-from django.utils.functional import cached_property
 from django.utils.timezone import now
 from django.utils.translation import gettext_lazy as _
 from guardian.conf import settings
 from guardian.models import RoleModelPermission, RoleObjectPermission
 from model_utils.managers import InheritanceManager
-from psqlextra.indexes import UniqueIndex
-from psqlextra.models import PostgresMaterializedViewModel
 from rest_framework.exceptions import ValidationError
 from rest_framework.fields import BooleanField, CharField, IntegerField, ListField
 from rest_framework.serializers import Serializer
@@ -237,7 +238,7 @@ class Group(SerializerModel, AttributesMixin):
 
     def is_member(self, user: User) -> bool:
         """Recursively check if `user` is member of us, or any parent."""
-        return user.all_groups().filter(group_uuid=self.group_uuid).exists()
+        return self.pk in user.membership.group_pks
 
     def all_roles(self) -> QuerySet[Role]:
         """Get all roles of this group and all of its ancestors."""
@@ -266,6 +267,68 @@ class Group(SerializerModel, AttributesMixin):
         role.assign_perms(perms, obj)
 
 
+# Set for the current transaction by `deferred_group_ancestry`
+GROUP_ANCESTRY_DEFERRED_SETTING = "authentik.group_ancestry_deferred"
+# Set by the triggers when they skip a change of the group hierarchy in a deferred block
+GROUP_ANCESTRY_CHANGED_SETTING = "authentik.group_ancestry_changed"
+_CTX_GROUP_ANCESTRY_DEFERRED = ContextVar("authentik_group_ancestry_deferred", default=False)
+
+# Add every pair of the child (and its descendants) and the parent (and its ancestors)
+_GROUP_ANCESTRY_ADD = """
+    INSERT INTO authentik_core_groupancestry (uuid, descendant_id, ancestor_id)
+    SELECT gen_random_uuid(), descendants.id, ancestors.id
+    FROM (
+        SELECT NEW.child_id AS id
+        UNION
+        SELECT descendant_id FROM authentik_core_groupancestry WHERE ancestor_id = NEW.child_id
+    ) AS descendants
+    CROSS JOIN (
+        SELECT NEW.parent_id AS id
+        UNION
+        SELECT ancestor_id FROM authentik_core_groupancestry WHERE descendant_id = NEW.parent_id
+    ) AS ancestors
+    ON CONFLICT (descendant_id, ancestor_id) DO NOTHING;
+"""
+# Removing an edge can only remove pairs of the child (and its descendants), so remove those
+# of their pairs which can't be derived from the remaining edges anymore
+_GROUP_ANCESTRY_REMOVE = """
+    WITH RECURSIVE affected AS (
+        SELECT OLD.child_id AS id
+        UNION
+        SELECT descendant_id FROM authentik_core_groupancestry WHERE ancestor_id = OLD.child_id
+    ),
+    accumulator AS (
+        SELECT child_id AS descendant_id, parent_id AS ancestor_id
+        FROM authentik_core_groupparentage
+        WHERE child_id IN (SELECT id FROM affected)
+
+        UNION
+
+        SELECT accumulator.descendant_id, current.parent_id AS ancestor_id
+        FROM accumulator
+        JOIN authentik_core_groupparentage current
+        ON accumulator.ancestor_id = current.child_id
+    )
+    DELETE FROM authentik_core_groupancestry
+    WHERE descendant_id IN (SELECT id FROM affected)
+    AND (descendant_id, ancestor_id) NOT IN (
+        SELECT descendant_id, ancestor_id FROM accumulator
+    );
+"""
+_GROUP_ANCESTRY_SKIP_DEFERRED = f"""
+    IF current_setting('{GROUP_ANCESTRY_DEFERRED_SETTING}', true) = 'on' THEN
+        PERFORM set_config('{GROUP_ANCESTRY_CHANGED_SETTING}', 'on', true);
+        RETURN NULL;
+    END IF;
+"""
+# Changes of the ancestry table read the ancestry of other groups, so concurrent changes have to
+# be serialized; otherwise each would miss the other's pairs. Held until the end of the transaction
+_GROUP_ANCESTRY_LOCK_KEY = "hashtext('authentik_core_groupancestry')"
+_GROUP_ANCESTRY_LOCK = f"""
+    PERFORM pg_advisory_xact_lock({_GROUP_ANCESTRY_LOCK_KEY});
+"""
+
+
 class GroupParentageNode(models.Model):
     uuid = models.UUIDField(primary_key=True, editable=False, default=uuid4)
 
@@ -280,13 +343,32 @@ class GroupParentageNode(models.Model):
 
         triggers = [
             pgtrigger.Trigger(
-                name="refresh_groupancestry",
-                operation=pgtrigger.Insert | pgtrigger.Update | pgtrigger.Delete,
+                name="groupancestry_insert",
+                operation=pgtrigger.Insert,
+                when=pgtrigger.After,
+                func=_GROUP_ANCESTRY_SKIP_DEFERRED
+                + _GROUP_ANCESTRY_LOCK
+                + _GROUP_ANCESTRY_ADD
+                + "RETURN NULL;",
+            ),
+            pgtrigger.Trigger(
+                name="groupancestry_update",
+                operation=pgtrigger.Update,
+                when=pgtrigger.After,
+                func=_GROUP_ANCESTRY_SKIP_DEFERRED
+                + _GROUP_ANCESTRY_LOCK
+                + _GROUP_ANCESTRY_REMOVE
+                + _GROUP_ANCESTRY_ADD
+                + "RETURN NULL;",
+            ),
+            pgtrigger.Trigger(
+                name="groupancestry_delete",
+                operation=pgtrigger.Delete,
                 when=pgtrigger.After,
-                func="""
-                    REFRESH MATERIALIZED VIEW CONCURRENTLY authentik_core_groupancestry;
-                    RETURN NULL;
-                """,
+                func=_GROUP_ANCESTRY_SKIP_DEFERRED
+                + _GROUP_ANCESTRY_LOCK
+                + _GROUP_ANCESTRY_REMOVE
+                + "RETURN NULL;",
             ),
         ]
 
@@ -294,49 +376,126 @@ class GroupParentageNode(models.Model):
         return f"Group Parentage Node from #{self.child_id} to {self.parent_id}"
 
 
-class GroupAncestryNode(PostgresMaterializedViewModel):
+class GroupAncestryNode(models.Model):
+    """Transitive closure of `GroupParentageNode`, maintained by triggers on the parentage table.
+    See https://en.wikipedia.org/wiki/Transitive_closure#In_graph_theory"""
+
+    uuid = models.UUIDField(primary_key=True, editable=False, default=uuid4)
+
     descendant = models.ForeignKey(
-        Group, related_name="ancestor_nodes", on_delete=models.DO_NOTHING
+        Group, related_name="ancestor_nodes", on_delete=models.DO_NOTHING, db_constraint=False
     )
     ancestor = models.ForeignKey(
-        Group, related_name="descendant_nodes", on_delete=models.DO_NOTHING
+        Group, related_name="descendant_nodes", on_delete=models.DO_NOTHING, db_constraint=False
     )
 
     class Meta:
-        # This is a transitive closure of authentik_core_groupparentage
-        # See https://en.wikipedia.org/wiki/Transitive_closure#In_graph_theory
         db_table = "authentik_core_groupancestry"
-        indexes = [
-            models.Index(fields=["descendant"]),
-            models.Index(fields=["ancestor"]),
-            UniqueIndex(fields=["id"]),
+        constraints = [
+            models.UniqueConstraint(
+                fields=["descendant", "ancestor"], name="unique_group_ancestry"
+            ),
         ]
 
-    class ViewMeta:
-        query = """
-            WITH RECURSIVE accumulator AS (
-                SELECT
-                child_id::text || '-' || parent_id::text as id,
-                child_id AS descendant_id,
-                parent_id AS ancestor_id
-                FROM authentik_core_groupparentage
-
-                UNION
-
-                SELECT
-                accumulator.descendant_id::text || '-' || current.parent_id::text as id,
-                accumulator.descendant_id,
-                current.parent_id AS ancestor_id
-                FROM accumulator
-                JOIN authentik_core_groupparentage current
-                ON accumulator.ancestor_id = current.child_id
-            )
-            SELECT * FROM accumulator
-        """
-
     def __str__(self) -> str:
         return f"Group Ancestry Node from {self.descendant_id} to {self.ancestor_id}"
 
+    @staticmethod
+    def rebuild():
+        """Recompute the whole closure from the parentage table"""
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"SELECT pg_advisory_xact_lock({_GROUP_ANCESTRY_LOCK_KEY})")
+            cursor.execute("DELETE FROM authentik_core_groupancestry")
+            cursor.execute("""
+                WITH RECURSIVE accumulator AS (
+                    SELECT child_id AS descendant_id, parent_id AS ancestor_id
+                    FROM authentik_core_groupparentage
+
+                    UNION
+
+                    SELECT accumulator.descendant_id, current.parent_id AS ancestor_id
+                    FROM accumulator
+                    JOIN authentik_core_groupparentage current
+                    ON accumulator.ancestor_id = current.child_id
+                )
+                INSERT INTO authentik_core_groupancestry (uuid, descendant_id, ancestor_id)
+                SELECT gen_random_uuid(), descendant_id, ancestor_id FROM accumulator
+            """)
+
+
+@contextmanager
+def deferred_group_ancestry() -> Generator[None]:
+    """Don't maintain group ancestry for each change of the group hierarchy made within this
+    block, and rebuild it once at the end instead, if the hierarchy was changed. Meant for bulk
+    imports, which change many parents at once. Runs in a transaction, so the ancestry is never
+    stale outside of it; nested blocks rebuild with the outermost block."""
+    if _CTX_GROUP_ANCESTRY_DEFERRED.get():
+        yield
+        return
+    token = _CTX_GROUP_ANCESTRY_DEFERRED.set(True)
+    try:
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(f"SET LOCAL {GROUP_ANCESTRY_DEFERRED_SETTING} = 'on'")
+            yield
+            with connection.cursor() as cursor:
+                cursor.execute(f"SET LOCAL {GROUP_ANCESTRY_DEFERRED_SETTING} = 'off'")
+                cursor.execute("SELECT current_setting(%s, true)", [GROUP_ANCESTRY_CHANGED_SETTING])
+                changed = cursor.fetchone()[0] == "on"
+                cursor.execute(f"SET LOCAL {GROUP_ANCESTRY_CHANGED_SETTING} = 'off'")
+            if changed:
+                GroupAncestryNode.rebuild()
+    finally:
+        _CTX_GROUP_ANCESTRY_DEFERRED.reset(token)
+
+
+class UserMembership:
+    """Group and role membership of a user, resolved once and shared by `User.all_groups`,
+    `User.all_roles`, `User.is_superuser`, `User.group_attributes` and `User.app_entitlements`.
+
+    A snapshot is kept on the user instance, which lives as long as the request or task it was
+    loaded for. Any change to group membership, the group hierarchy, roles or groups made by this
+    process invalidates all snapshots; changes made by other processes are seen by users loaded
+    afterwards."""
+
+    # Bumped by membership signals, see `authentik.core.signals`
+    _generation = 0
+
+    def __init__(self, user: User):
+        self.generation = UserMembership._generation
+        self.user_pk = user.pk
+        groups = list(
+            user.groups.all()
+            .with_ancestors()
+            .order_by("name")
+            .values_list("pk", "is_superuser", "attributes")
+        )
+        self.group_pks = frozenset(pk for pk, _, _ in groups)
+        self.is_superuser = any(is_superuser for _, is_superuser, _ in groups)
+        # Ordered by group name
+        self.group_attributes = [attributes for _, _, attributes in groups]
+        self._role_pks: frozenset | None = None
+
+    @staticmethod
+    def invalidate():
+        """Invalidate the membership snapshots of all users in this process"""
+        UserMembership._generation += 1
+
+    @property
+    def stale(self) -> bool:
+        return self.generation != UserMembership._generation
+
+    @property
+    def role_pks(self) -> frozenset:
+        """Primary keys of all roles of the user and all of its groups"""
+        if self._role_pks is None:
+            self._role_pks = frozenset(
+                Role.objects.filter(Q(users=self.user_pk) | Q(groups__in=self.group_pks))
+                .values_list("pk", flat=True)
+                .distinct()
+            )
+        return self._role_pks
+
 
 class UserQuerySet(models.QuerySet):
     """User queryset"""
@@ -408,18 +567,33 @@ class User(SerializerModel, AttributesMixin, AbstractUser):
     def __str__(self):
         return self.username
 
+    def __getstate__(self):
+        state = super().__getstate__()
+        # Membership is resolved again by the process loading the user
+        state.pop("_membership", None)
+        return state
+
     @staticmethod
     def default_path() -> str:
         """Get the default user path"""
         return User._meta.get_field("path").default
 
+    @property
+    def membership(self) -> UserMembership:
+        """Get the group and role membership of this user, resolved once until it changes"""
+        membership: UserMembership | None = self.__dict__.get("_membership")
+        if membership is None or membership.stale or membership.user_pk != self.pk:
+            membership = UserMembership(self)
+            self.__dict__["_membership"] = membership
+        return membership
+
     def all_groups(self) -> QuerySet[Group]:
         """Recursively get all groups this user is a member of."""
-        return self.groups.all().with_ancestors()
+        return Group.objects.filter(pk__in=self.membership.group_pks)
 
     def all_roles(self) -> QuerySet[Role]:
         """Get all roles of this user and all of its groups (recursively)."""
-        return Role.objects.filter(Q(users=self) | Q(groups__in=self.all_groups())).distinct()
+        return Role.objects.filter(pk__in=self.membership.role_pks)
 
     def get_managed_role(self, create=False):
         if create:
@@ -476,8 +650,8 @@ class User(SerializerModel, AttributesMixin, AbstractUser):
         final_attributes = {}
         if request and hasattr(request, "brand"):
             always_merger.merge(final_attributes, request.brand.attributes)
-        for group in self.all_groups().order_by("name"):
-            always_merger.merge(final_attributes, group.attributes)
+        for attributes in self.membership.group_attributes:
+            always_merger.merge(final_attributes, deepcopy(attributes))
         always_merger.merge(final_attributes, self.attributes)
         return final_attributes
 
@@ -485,7 +659,7 @@ class User(SerializerModel, AttributesMixin, AbstractUser):
         """Get all entitlements this user has for `app`."""
         if not app:
             return []
-        all_groups = self.all_groups()
+        all_groups = self.membership.group_pks
         qs = app.applicationentitlement_set.filter(
             Q(
                 Q(bindings__user=self) | Q(bindings__group__in=all_groups),
@@ -513,10 +687,10 @@ class User(SerializerModel, AttributesMixin, AbstractUser):
 
         return UserSerializer
 
-    @cached_property
+    @property
     def is_superuser(self) -> bool:
         """Get supseruser status based on membership in a group with superuser status"""
-        return self.all_groups().filter(is_superuser=True).exists()
+        return self.membership.is_superuser
 
     @property
     def is_staff(self) -> bool:
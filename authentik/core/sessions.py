@@ -1,18 +1,35 @@
 """authentik sessions engine"""
 
 import pickle  # nosec
+from hashlib import sha256
 
+from asgiref.sync import sync_to_async
 from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.sessions.backends.base import UpdateError
 from django.contrib.sessions.backends.db import SessionStore as SessionBase
 from django.core.exceptions import SuspiciousOperation
+from django.db import DatabaseError, router, transaction
 from django.utils import timezone
 from django.utils.functional import cached_property
 from structlog.stdlib import get_logger
 
 from authentik.core.user_switching import activate_session
+from authentik.lib.config import CONFIG
+from authentik.lib.utils.cache import cache_get, cache_populate
 from authentik.root.middleware import ClientIPMiddleware
 
 LOGGER = get_logger()
+SESSION_CACHE_PREFIX = "goauthentik.io/core/sessions/"
+
+
+def session_cache_key(session_key: str) -> str:
+    """Cache key for a session loaded from the database"""
+    return f"{SESSION_CACHE_PREFIX}{sha256(session_key.encode()).hexdigest()}"
+
+
+def session_cache_timeout() -> int:
+    """How long sessions are cached for, 0 if they are not cached"""
+    return CONFIG.get_int("cache.timeout_sessions", 0)
 
 
 class SessionStore(SessionBase):
@@ -22,6 +39,8 @@ class SessionStore(SessionBase):
             "last_ip": last_ip or ClientIPMiddleware.default_ip,
             "last_user_agent": last_user_agent,
         }
+        # Session data as loaded from the database, to only write it when it was changed
+        self._loaded_session_data: bytes | None = None
 
     @classmethod
     def get_model_class(cls):
@@ -38,7 +57,35 @@ class SessionStore(SessionBase):
         authenticated_session = getattr(session, "authenticatedsession", None)
         return authenticated_session is None or authenticated_session.is_current
 
+    def _get_cached_session(self):
+        """Get the session from the cache, if sessions are cached and it is still valid"""
+        if session_cache_timeout() <= 0 or not self.session_key:
+            return None
+        session = cache_get(session_cache_key(self.session_key))
+        if session is None or session.expires <= timezone.now():
+            return None
+        return session
+
+    def _set_cached_session(self, session):
+        """Cache a session loaded from the database, unless it was changed in the meantime"""
+        session.session_data = bytes(session.session_data)
+        timeout = min(
+            session_cache_timeout(), int((session.expires - timezone.now()).total_seconds())
+        )
+        if timeout > 0:
+            cache_populate(session_cache_key(session.session_key), session, timeout)
+
+    def _check_session(self, session):
+        if not self._is_current(session):
+            LOGGER.info("Session denied: superseded by a newer login")
+            self._session_key = None
+            return None
+        self._loaded_session_data = bytes(session.session_data)
+        return session
+
     def _get_session_from_db(self):
+        if (session := self._get_cached_session()) is not None:
+            return self._check_session(session)
         try:
             session = self.model.objects.select_related(
                 "authenticatedsession",
@@ -48,17 +95,17 @@ class SessionStore(SessionBase):
                 session_key=self.session_key,
                 expires__gt=timezone.now(),
             )
-            if not self._is_current(session):
-                LOGGER.info("Session denied: superseded by a newer login")
-                self._session_key = None
-                return None
-            return session
+            if session_cache_timeout() > 0:
+                self._set_cached_session(session)
+            return self._check_session(session)
         except (self.model.DoesNotExist, SuspiciousOperation) as exc:
             if isinstance(exc, SuspiciousOperation):
                 LOGGER.warning(str(exc))
             self._session_key = None
 
     async def _aget_session_from_db(self):
+        if (session := await sync_to_async(self._get_cached_session)()) is not None:
+            return self._check_session(session)
         try:
             session = await self.model.objects.select_related(
                 "authenticatedsession",
@@ -68,11 +115,9 @@ class SessionStore(SessionBase):
                 session_key=self.session_key,
                 expires__gt=timezone.now(),
             )
-            if not self._is_current(session):
-                LOGGER.info("Session denied: superseded by a newer login")
-                self._session_key = None
-                return None
-            return session
+            if session_cache_timeout() > 0:
+                await sync_to_async(self._set_cached_session)(session)
+            return self._check_session(session)
         except (self.model.DoesNotExist, SuspiciousOperation) as exc:
             if isinstance(exc, SuspiciousOperation):
                 LOGGER.warning(str(exc))
@@ -156,6 +201,35 @@ class SessionStore(SessionBase):
         args["session_data"] = self.encode(args["session_data"])
         return self.model(**args)
 
+    def _update(self, obj):
+        """Update an existing session. The session data is only written when it was changed
+        since the session was loaded, otherwise only the fields in `Session.Keys` and the
+        expiry are updated."""
+        update_fields = [*self.model_fields, "expires"]
+        if obj.session_data != self._loaded_session_data:
+            update_fields.append("session_data")
+        using = router.db_for_write(self.model, instance=obj)
+        try:
+            with transaction.atomic(using=using):
+                obj.save(update_fields=update_fields, using=using)
+        except DatabaseError as exc:
+            raise UpdateError from exc
+        self._loaded_session_data = obj.session_data
+
+    def save(self, must_create=False):
+        if must_create or self.session_key is None or self._loaded_session_data is None:
+            # New sessions are always written in full
+            self._loaded_session_data = None
+            return super().save(must_create=must_create)
+        self._update(self.create_model_instance(self._get_session()))
+
+    async def asave(self, must_create=False):
+        if must_create or self.session_key is None or self._loaded_session_data is None:
+            self._loaded_session_data = None
+            return await super().asave(must_create=must_create)
+        obj = await self.acreate_model_instance(await self._aget_session())
+        await sync_to_async(self._update)(obj)
+
     @classmethod
     def clear_expired(cls):
         cls.get_model_class().objects.filter(expires__lt=timezone.now()).delete()
@@ -6,7 +6,7 @@ from contextvars import ContextVar
 from django.contrib.auth.signals import user_logged_in
 from django.core.cache import cache
 from django.db.models import Model
-from django.db.models.signals import post_delete, post_save, pre_save
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
 from django.dispatch import Signal, receiver
 from django.http.request import HttpRequest
 from structlog.stdlib import get_logger
@@ -15,11 +15,22 @@ from authentik.core.models import (
     Application,
     AuthenticatedSession,
     BackchannelProvider,
+    Group,
+    GroupParentageNode,
+    GroupRole,
+    PropertyMapping,
     Session,
     User,
+    UserGroup,
+    UserMembership,
+    UserRole,
+    UserSwitchingSession,
     default_token_duration,
 )
+from authentik.core.sessions import session_cache_key, session_cache_timeout
 from authentik.lib.models import ExpiringModel
+from authentik.lib.utils.cache import cache_invalidate
+from authentik.rbac.models import Role
 
 password_changed = Signal()
 """Arguments: user: User, password: str"""
@@ -95,6 +106,27 @@ def user_logged_in_session(sender, request: HttpRequest, user: User, **_):
     AuthenticatedSession.create_from_request(request, user)
 
 
+@receiver(m2m_changed, sender=UserGroup)
+@receiver(m2m_changed, sender=UserRole)
+@receiver(m2m_changed, sender=GroupRole)
+@receiver(m2m_changed, sender=GroupParentageNode)
+@receiver(post_save, sender=UserGroup)
+@receiver(post_save, sender=UserRole)
+@receiver(post_save, sender=GroupRole)
+@receiver(post_save, sender=GroupParentageNode)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=UserGroup)
+@receiver(post_delete, sender=UserRole)
+@receiver(post_delete, sender=GroupRole)
+@receiver(post_delete, sender=GroupParentageNode)
+@receiver(post_delete, sender=Group)
+@receiver(post_delete, sender=Role)
+def membership_changed(sender: type[Model], **kwargs):
+    """Invalidate user membership snapshots when groups, roles or memberships change"""
+    if kwargs.get("action", "post_").startswith("post_"):
+        UserMembership.invalidate()
+
+
 @receiver(post_save, sender=User)
 def user_deactivated_delete_sessions(sender: type[Model], instance: User, **_):
     """Delete all of a user's sessions when they are deactivated"""
@@ -112,6 +144,39 @@ def authenticated_session_delete(sender: type[Model], instance: AuthenticatedSes
     Session.objects.filter(session_key=instance.pk).delete()
 
 
+@receiver(post_save, sender=Session)
+@receiver(post_delete, sender=Session)
+@receiver(post_save, sender=AuthenticatedSession)
+@receiver(post_delete, sender=AuthenticatedSession)
+@receiver(post_save, sender=UserSwitchingSession)
+@receiver(post_save, sender=User)
+def session_post_save_cache(sender: type[Model], instance: Model, created: bool = False, **_):
+    """Remove sessions from the cache when they, their login or their user are changed"""
+    if created or session_cache_timeout() <= 0:
+        return
+    if isinstance(instance, Session):
+        session_keys = [instance.session_key]
+    elif isinstance(instance, AuthenticatedSession):
+        session_keys = [instance.session_id]
+    elif isinstance(instance, UserSwitchingSession):
+        session_keys = instance.authenticated_sessions.values_list("session_id", flat=True)
+    else:
+        session_keys = AuthenticatedSession.objects.filter(user=instance).values_list(
+            "session_id", flat=True
+        )
+    cache_invalidate(session_cache_key(session_key) for session_key in session_keys)
+
+
+@receiver(post_save)
+def property_mapping_post_save(sender: type[Model], instance: Model, **_):
+    """Drop compiled bytecode of a property mapping when it is changed"""
+    if not isinstance(instance, PropertyMapping):
+        return
+    from authentik.lib.expression.evaluator import evict_compiled
+
+    evict_compiled(instance.name)
+
+
 @receiver(pre_save)
 def backchannel_provider_pre_save(sender: type[Model], instance: Model, **_):
     """Ensure backchannel providers have is_backchannel set to true"""
@@ -2,6 +2,7 @@
 
 from datetime import datetime, timedelta
 
+from django.db.models import QuerySet
 from django.utils.timezone import now
 from django.utils.translation import gettext_lazy as _
 from django_channels_postgres.models import GroupChannel, Message
@@ -16,10 +17,23 @@ from authentik.core.models import (
 )
 from authentik.lib.models import ExpiringModel
 from authentik.lib.sync.models import Sync
-from authentik.lib.utils.db import chunked_queryset
+from authentik.lib.utils.db import chunked_delete, chunked_queryset
 from authentik.tasks.middleware import CurrentTask
+from authentik.tasks.models import Task
 
 LOGGER = get_logger()
+# Report progress every this many batches when deleting expired objects
+EXPIRY_PROGRESS_BATCHES = 100
+
+
+def _delete_expired(task: Task, objects: QuerySet) -> int:
+    """Delete expired objects in batches, and report progress for large amounts of objects"""
+    amount = 0
+    for batch, deleted in enumerate(chunked_delete(objects), start=1):
+        amount += deleted
+        if batch % EXPIRY_PROGRESS_BATCHES == 0:
+            task.info(f"Expired {amount} {objects.model._meta.verbose_name_plural} so far")
+    return amount
 
 
 @actor(description=_("Remove expired objects."))
@@ -32,17 +46,18 @@ def clean_expired_models():
             .exclude(expiring=False)
             .exclude(expiring=True, expires__gt=now())
         )
-        amount = objects.count()
-        for obj in chunked_queryset(objects):
-            obj.expire_action()
+        if cls.expire_action is ExpiringModel.expire_action:
+            # Objects are only deleted, which can be done in bulk
+            amount = _delete_expired(self, objects)
+        else:
+            amount = objects.count()
+            for obj in chunked_queryset(objects):
+                obj.expire_action()
         LOGGER.debug("Expired models", model=cls, amount=amount)
         self.info(f"Expired {amount} {cls._meta.verbose_name_plural}")
     clear_expired_cache()
     for cls in [Message, GroupChannel]:
-        objects = cls.objects.all().filter(expires__lt=now())
-        amount = objects.count()
-        for obj in chunked_queryset(objects):
-            obj.delete()
+        amount = _delete_expired(self, cls.objects.all().filter(expires__lt=now()))
         LOGGER.debug("Expired models", model=cls, amount=amount)
         self.info(f"Expired {amount} {cls._meta.verbose_name_plural}")
     for cls in Sync.__subclasses__():
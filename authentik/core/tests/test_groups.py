@@ -1,8 +1,19 @@
 """group tests"""
 
-from django.test.testcases import TestCase
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+from unittest.mock import patch
 
-from authentik.core.models import Group, User
+from django.db import connection
+from django.test.testcases import TestCase, TransactionTestCase
+
+from authentik.core.models import (
+    Group,
+    GroupAncestryNode,
+    GroupParentageNode,
+    User,
+    deferred_group_ancestry,
+)
 from authentik.lib.generators import generate_id
 
 
@@ -72,3 +83,140 @@ class TestGroups(TestCase):
         self.assertEqual(group.roles.count(), 1)
         self.assertEqual(user.roles.count(), 0)
         self.assertTrue(user.has_perm(perm))
+
+
+class TestGroupAncestry(TestCase):
+    """Test group ancestry maintenance"""
+
+    @staticmethod
+    def ancestry(*groups: Group) -> set[tuple[str, str]]:
+        """Get ancestry pairs of `groups` by name"""
+        return set(
+            GroupAncestryNode.objects.filter(descendant__in=groups).values_list(
+                "descendant__name", "ancestor__name"
+            )
+        )
+
+    def test_add(self):
+        """Test adding parents adds ancestors of parents to all descendants"""
+        first, second, third, fourth = (Group.objects.create(name=name) for name in "abcd")
+        second.parents.add(first)
+        fourth.parents.add(third)
+        third.parents.add(second)
+        self.assertEqual(
+            self.ancestry(first, second, third, fourth),
+            {
+                ("b", "a"),
+                ("c", "b"),
+                ("c", "a"),
+                ("d", "c"),
+                ("d", "b"),
+                ("d", "a"),
+            },
+        )
+
+    def test_remove(self):
+        """Test removing parents only removes ancestors which can't be reached anymore"""
+        first, second, third, fourth = (Group.objects.create(name=name) for name in "abcd")
+        # Diamond, d is below b and c, which are both below a
+        second.parents.add(first)
+        third.parents.add(first)
+        fourth.parents.add(second, third)
+        fourth.parents.remove(second)
+        self.assertEqual(
+            self.ancestry(first, second, third, fourth),
+            {("b", "a"), ("c", "a"), ("d", "c"), ("d", "a")},
+        )
+        third.parents.remove(first)
+        self.assertEqual(
+            self.ancestry(first, second, third, fourth),
+            {("b", "a"), ("d", "c")},
+        )
+
+    def test_update(self):
+        """Test moving a parentage node"""
+        first, second, third = (Group.objects.create(name=name) for name in "abc")
+        third.parents.add(second)
+        node = GroupParentageNode.objects.get(child=third)
+        node.parent = first
+        node.save()
+        self.assertEqual(self.ancestry(first, second, third), {("c", "a")})
+
+    def test_recursive(self):
+        """Test cycles"""
+        first, second = (Group.objects.create(name=name) for name in "ab")
+        first.parents.add(second)
+        second.parents.add(first)
+        self.assertEqual(
+            self.ancestry(first, second),
+            {("a", "b"), ("b", "a"), ("a", "a"), ("b", "b")},
+        )
+        second.parents.remove(first)
+        self.assertEqual(self.ancestry(first, second), {("a", "b")})
+
+    def test_deferred(self):
+        """Test ancestry is rebuilt once at the end of a deferred block"""
+        first, second, third = (Group.objects.create(name=name) for name in "abc")
+        with deferred_group_ancestry():
+            second.parents.add(first)
+            third.parents.add(second)
+            with deferred_group_ancestry():
+                third.parents.add(first)
+            self.assertEqual(self.ancestry(first, second, third), set())
+        self.assertEqual(
+            self.ancestry(first, second, third),
+            {("b", "a"), ("c", "b"), ("c", "a")},
+        )
+        # Changes after the block are maintained incrementally again
+        third.parents.remove(second)
+        self.assertEqual(self.ancestry(first, second, third), {("b", "a"), ("c", "a")})
+
+    def test_deferred_unchanged(self):
+        """Test ancestry is only rebuilt when the hierarchy changed in a deferred block"""
+        first, second = (Group.objects.create(name=name) for name in "ab")
+        second.parents.add(first)
+        with patch.object(GroupAncestryNode, "rebuild") as rebuild:
+            with deferred_group_ancestry():
+                second.parents.set([first])
+            rebuild.assert_not_called()
+            with deferred_group_ancestry():
+                second.parents.remove(first)
+            rebuild.assert_called_once()
+
+
+class TestGroupAncestryConcurrent(TransactionTestCase):
+    """Test group ancestry maintenance with concurrent transactions"""
+
+    def test_deferred_concurrent(self):
+        """Test deferred blocks which are rebuilt at the same time"""
+        first, second, third, fourth = (Group.objects.create(name=name) for name in "abcd")
+        second.parents.add(first)
+        barrier = Barrier(2, timeout=10)
+
+        def add_parent(child: Group, parent: Group):
+            try:
+                with deferred_group_ancestry():
+                    child.parents.add(parent)
+                    # Make sure both blocks are rebuilt at the same time
+                    barrier.wait()
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(2) as executor:
+            futures = [
+                executor.submit(add_parent, third, second),
+                executor.submit(add_parent, fourth, third),
+            ]
+            for future in futures:
+                future.result()
+        self.assertEqual(
+            TestGroupAncestry.ancestry(first, second, third, fourth),
+            {
+                ("b", "a"),
+                ("c", "b"),
+                ("c", "a"),
+                ("d", "c"),
+                ("d", "b"),
+                ("d", "a"),
+            },
+        )
@@ -0,0 +1,116 @@
+"""Session store tests"""
+
+from unittest.mock import patch
+
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.crypto import get_random_string
+
+from authentik.core import user_switching
+from authentik.core.models import Session
+from authentik.core.sessions import SessionStore, session_cache_key
+from authentik.core.tests.utils import create_test_session, create_test_user
+from authentik.lib.config import CONFIG
+from authentik.lib.utils.cache import cache_get
+
+
+class TestSessionStore(TestCase):
+    """Test session read cache and partial writes"""
+
+    def setUp(self):
+        self.user = create_test_user()
+        self.authenticated_session = create_test_session(self.user)
+        self.session_key = self.authenticated_session.session_id
+
+    def load(self) -> tuple[SessionStore, int]:
+        """Load the session with a new store, and return how many session queries were made"""
+        store = SessionStore(self.session_key)
+        with CaptureQueriesContext(connection) as queries:
+            store.load()
+        return store, len(
+            [
+                query
+                for query in queries.captured_queries
+                if "authentik_core_session" in query["sql"]
+            ]
+        )
+
+    def test_uncached(self):
+        """Test sessions are loaded from the database for every request by default"""
+        self.assertEqual(self.load()[1], 1)
+        self.assertEqual(self.load()[1], 1)
+
+    @CONFIG.patch("cache.timeout_sessions", 60)
+    def test_cached(self):
+        """Test sessions are cached"""
+        store, queries = self.load()
+        self.assertEqual(queries, 1)
+        self.assertEqual(store["authenticatedsession"].user, self.user)
+        store, queries = self.load()
+        self.assertEqual(queries, 0)
+        self.assertEqual(store["authenticatedsession"].user, self.user)
+
+    @CONFIG.patch("cache.timeout_sessions", 60)
+    def test_cached_invalidation(self):
+        """Test cached sessions are removed when they, their login or their user change"""
+        self.load()
+        self.user.name = "updated"
+        self.user.save()
+        store, queries = self.load()
+        self.assertEqual(queries, 1)
+        self.assertEqual(store["authenticatedsession"].user.name, "updated")
+        self.authenticated_session.delete()
+        store, _ = self.load()
+        self.assertNotIn("authenticatedsession", store)
+        self.assertIsNone(store.session_key)
+
+    @CONFIG.patch("cache.timeout_sessions", 60)
+    def test_cached_concurrent_logout(self):
+        """Test a session loaded before a concurrent logout isn't cached afterwards"""
+        set_cached_session = SessionStore._set_cached_session
+
+        def logout_then_set_cached(store: SessionStore, session: Session):
+            self.authenticated_session.delete()
+            set_cached_session(store, session)
+
+        with patch.object(SessionStore, "_set_cached_session", logout_then_set_cached):
+            self.load()
+        self.assertIsNone(cache_get(session_cache_key(self.session_key)))
+        store, queries = self.load()
+        self.assertEqual(queries, 1)
+        self.assertIsNone(store.session_key)
+
+    @CONFIG.patch("cache.timeout_sessions", 60)
+    def test_cached_superseded(self):
+        """Test a cached session cannot be used after a newer login in the same browser"""
+        token = get_random_string(user_switching.TOKEN_LENGTH)
+        target = create_test_session(create_test_user(), token)
+        self.client.cookies[settings.SESSION_COOKIE_NAME] = target.session_id
+        self.assertEqual(self.client.get(reverse("authentik_api:user-me")).status_code, 200)
+
+        create_test_session(create_test_user(), token)
+        self.client.cookies[settings.SESSION_COOKIE_NAME] = target.session_id
+        self.assertEqual(self.client.get(reverse("authentik_api:user-me")).status_code, 403)
+
+    def test_partial_update(self):
+        """Test session data is only written when it was changed"""
+        store, _ = self.load()
+        store[Session.Keys.LAST_IP] = "192.0.2.1"
+        with CaptureQueriesContext(connection) as queries:
+            store.save()
+        updates = [query["sql"] for query in queries.captured_queries if "UPDATE" in query["sql"]]
+        self.assertEqual(len(updates), 1)
+        self.assertNotIn("session_data", updates[0])
+
+        store["foo"] = "bar"
+        with CaptureQueriesContext(connection) as queries:
+            store.save()
+        updates = [query["sql"] for query in queries.captured_queries if "UPDATE" in query["sql"]]
+        self.assertIn("session_data", updates[0])
+
+        store = SessionStore(self.session_key)
+        self.assertEqual(store["foo"], "bar")
+        self.assertEqual(store[Session.Keys.LAST_IP], "192.0.2.1")
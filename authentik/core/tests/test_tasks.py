@@ -1,5 +1,6 @@
 """Test tasks"""
 
+from datetime import timedelta
 from time import mktime
 
 from django.utils.timezone import now
@@ -21,6 +22,8 @@ from authentik.core.tasks import (
 )
 from authentik.core.tests.utils import create_test_admin_user
 from authentik.lib.generators import generate_id
+from authentik.lib.utils.db import chunked_delete
+from authentik.policies.reputation.models import Reputation
 
 
 class TestTasks(APITestCase):
@@ -51,6 +54,29 @@ class TestTasks(APITestCase):
         clean_expired_models.send()
         self.assertFalse(Token.objects.filter(pk=token.pk).exists())
 
+    def test_expire_batched(self):
+        """Test expired objects are deleted in batches, and objects which are not expired
+        are kept"""
+        identifier = generate_id()
+        for idx in range(5):
+            Reputation.objects.create(
+                identifier=identifier, ip=f"192.0.2.{idx}", expires=now() - timedelta(hours=1)
+            )
+        Reputation.objects.create(identifier=identifier, ip="192.0.2.100")
+        Reputation.objects.create(
+            identifier=identifier,
+            ip="192.0.2.101",
+            expires=now() - timedelta(hours=1),
+            expiring=False,
+        )
+        objects = Reputation.objects.including_expired().filter(
+            identifier=identifier, expiring=True, expires__lt=now()
+        )
+        self.assertEqual(list(chunked_delete(objects, chunk_size=2)), [2, 2, 1])
+        self.assertEqual(
+            Reputation.objects.including_expired().filter(identifier=identifier).count(), 2
+        )
+
     def test_clean_temporary_users(self):
         """Test clean_temporary_users task"""
         username = generate_id
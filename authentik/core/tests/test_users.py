@@ -1,17 +1,21 @@
 """user tests"""
 
+from pickle import dumps, loads  # nosec
 from unittest.mock import patch
 
 from django.contrib.auth.hashers import make_password
+from django.db import connection
 from django.http import HttpRequest
 from django.test.testcases import TestCase
+from django.test.utils import CaptureQueriesContext
 
 from authentik.blueprints.v1.importer import SERIALIZER_CONTEXT_BLUEPRINT
 from authentik.core.api.users import UserSerializer
-from authentik.core.models import User
+from authentik.core.models import Group, User
 from authentik.core.signals import password_changed, password_hash_changed
 from authentik.events.models import Event
 from authentik.lib.generators import generate_id
+from authentik.rbac.models import Role
 
 
 class TestUsers(TestCase):
@@ -176,3 +180,66 @@ class TestUserSerializerPasswordHash(TestCase):
 
         self.assertTrue(serializer.is_valid(), serializer.errors)
         self.assertNotIn("password_hash", serializer.validated_data)
+
+
+class TestUserMembership(TestCase):
+    """Test user membership snapshots"""
+
+    def setUp(self):
+        self.parent = Group.objects.create(name=generate_id(), attributes={"foo": "parent"})
+        self.group = Group.objects.create(name=generate_id(), attributes={"bar": "group"})
+        self.group.parents.add(self.parent)
+        self.role = Role.objects.create(name=generate_id())
+        self.parent.roles.add(self.role)
+        self.user = User.objects.create(username=generate_id())
+        self.group.users.add(self.user)
+
+    def test_resolved_once(self):
+        """Test membership is resolved once and shared by all call sites"""
+        user = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(1):
+            self.assertFalse(user.is_superuser)
+            self.assertEqual(user.group_attributes(), {"foo": "parent", "bar": "group"})
+            self.assertTrue(self.parent.is_member(user))
+        # One query for the role primary keys, one for the roles themselves
+        with self.assertNumQueries(2):
+            self.assertEqual(list(user.all_roles()), [self.role])
+        with self.assertNumQueries(1):
+            self.assertEqual(list(user.all_roles()), [self.role])
+        with self.assertNumQueries(0):
+            self.assertFalse(user.is_superuser)
+            self.assertTrue(self.group.is_member(user))
+            user.group_attributes()
+
+    def test_permission_checks(self):
+        """Test repeated permission checks share the user's roles"""
+        self.role.assign_perms("authentik_core.view_user")
+        user = User.objects.get(pk=self.user.pk)
+        self.assertTrue(user.has_perm("authentik_core.view_user"))
+        with CaptureQueriesContext(connection) as queries:
+            self.assertFalse(user.has_perm("authentik_core.add_user", self.group))
+        # Membership is resolved already, so no group or role lookups are made
+        for query in queries.captured_queries:
+            self.assertNotIn("authentik_core_groupancestry", query["sql"])
+            self.assertNotIn("authentik_core_user_roles", query["sql"])
+
+    def test_invalidation(self):
+        """Test membership changes invalidate snapshots"""
+        user = User.objects.get(pk=self.user.pk)
+        self.assertFalse(user.is_superuser)
+        self.parent.is_superuser = True
+        self.parent.save()
+        self.assertTrue(user.is_superuser)
+        self.group.parents.remove(self.parent)
+        self.assertFalse(user.is_superuser)
+        self.assertEqual(list(user.all_roles()), [])
+        user.roles.add(self.role)
+        self.assertEqual(list(user.all_roles()), [self.role])
+        self.group.users.remove(user)
+        self.assertEqual(list(user.all_groups()), [])
+
+    def test_pickle(self):
+        """Test snapshots aren't pickled"""
+        user = User.objects.get(pk=self.user.pk)
+        self.assertFalse(user.is_superuser)
+        self.assertNotIn("_membership", loads(dumps(user)).__dict__)  # nosec
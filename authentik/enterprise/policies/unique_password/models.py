@@ -17,6 +17,8 @@ LOGGER = get_logger()
 class UniquePasswordPolicy(Policy):
     """This policy prevents users from reusing old passwords."""
 
+    object_dependent = False
+
     password_field = models.TextField(
         default="password",
         help_text=_("Field key to check, field keys defined in Prompt stages are available."),
@@ -1,7 +1,9 @@
-from asyncio import run
-from collections.abc import Coroutine
+from asyncio import AbstractEventLoop, Semaphore, gather, new_event_loop
+from collections.abc import Awaitable, Callable, Coroutine, Iterable
 from dataclasses import asdict
+from functools import cached_property
 from typing import Any
+from weakref import finalize
 
 import httpx
 from azure.core.exceptions import (
@@ -38,6 +40,10 @@ from authentik.lib.sync.outgoing.exceptions import (
     TransientSyncException,
 )
 
+# How many requests are sent to Microsoft Graph at the same time when a client sends multiple
+# independent requests, such as for group membership changes
+REQUEST_CONCURRENCY = 8
+
 
 class AuthentikRequestAdapter(GraphRequestAdapter):
     def __init__(self, auth_provider, provider: MicrosoftEntraProvider, client=None):
@@ -70,8 +76,32 @@ class MicrosoftEntraSyncClient[TModel: Model, TConnection: Model, TSchema: dict]
     def __init__(self, provider: MicrosoftEntraProvider) -> None:
         super().__init__(provider)
         self.credentials = provider.microsoft_credentials()
+        # All requests of a client are run on the same event loop, so that the HTTP client and
+        # its connections are re-used instead of being created for every request
+        self._loop = new_event_loop()
+        # Called on the event loop before it is closed
+        self._close_callbacks: list[Callable[[], Awaitable[Any]]] = [
+            self.credentials["credentials"].close
+        ]
+        # Close the loop and its connections once the client isn't used anymore. Must not
+        # reference the client itself, otherwise the client would never be garbage collected
+        self._finalizer = finalize(self, self._close, self._loop, self._close_callbacks)
         self.__prefetch_domains()
 
+    @staticmethod
+    def _close(loop: AbstractEventLoop, callbacks: list[Callable[[], Awaitable[Any]]]):
+        try:
+            for callback in callbacks:
+                loop.run_until_complete(callback())
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            loop.close()
+
+    def close(self):
+        """Close the HTTP client, credentials and event loop of this client. Called automatically
+        when the client is garbage collected."""
+        self._finalizer()
+
     def get_request_adapter(
         self, credentials: ClientSecretCredential, scopes: list[str] | None = None
     ) -> AuthentikRequestAdapter:
@@ -82,35 +112,67 @@ class MicrosoftEntraSyncClient[TModel: Model, TConnection: Model, TSchema: dict]
         else:
             auth_provider = AzureIdentityAuthenticationProvider(credentials=credentials)
 
+        http_client = GraphClientFactory.create_with_default_middleware(
+            options=options, client=KiotaClientFactory.get_default_client()
+        )
+        self._close_callbacks.append(http_client.aclose)
         return AuthentikRequestAdapter(
             auth_provider=auth_provider,
             provider=self.provider,
-            client=GraphClientFactory.create_with_default_middleware(
-                options=options, client=KiotaClientFactory.get_default_client()
-            ),
+            client=http_client,
         )
 
-    @property
+    @cached_property
     def client(self):
         return GraphServiceClient(request_adapter=self.get_request_adapter(**self.credentials))
 
-    def _request[T](self, request: Coroutine[Any, Any, T]) -> T:
-        try:
-            return run(request)
-        except ClientAuthenticationError as exc:
-            raise StopSync(exc, None, None) from exc
-        except ODataError as exc:
-            raise StopSync(exc, None, None) from exc
-        except (ServiceRequestError, ServiceResponseError) as exc:
-            raise TransientSyncException("Failed to sent request") from exc
-        except APIError as exc:
+    def _sync_exception(self, exc: Exception) -> Exception:
+        """Convert an exception raised by the Graph SDK to the matching sync exception"""
+        if isinstance(exc, ClientAuthenticationError | ODataError):
+            return StopSync(exc, None, None)
+        if isinstance(exc, ServiceRequestError | ServiceResponseError):
+            return TransientSyncException("Failed to sent request")
+        if isinstance(exc, APIError):
             if exc.response_status_code == HttpResponseNotFound.status_code:
-                raise NotFoundSyncException("Object not found") from exc
+                return NotFoundSyncException("Object not found")
             if exc.response_status_code == HttpResponseBadRequest.status_code:
-                raise BadRequestSyncException("Bad request", exc.response_headers) from exc
+                return BadRequestSyncException("Bad request", exc.response_headers)
             if exc.response_status_code == HTTP_CONFLICT:
-                raise ObjectExistsSyncException("Object exists", exc.response_headers) from exc
-            raise exc
+                return ObjectExistsSyncException("Object exists", exc.response_headers)
+        return exc
+
+    def _request[T](self, request: Coroutine[Any, Any, T]) -> T:
+        try:
+            return self._loop.run_until_complete(request)
+        except (
+            ClientAuthenticationError,
+            ServiceRequestError,
+            ServiceResponseError,
+            APIError,
+        ) as exc:
+            sync_exc = self._sync_exception(exc)
+            if sync_exc is exc:
+                raise
+            raise sync_exc from exc
+
+    def _request_all[T](self, requests: Iterable[Coroutine[Any, Any, T]]) -> list[T | Exception]:
+        """Run multiple requests concurrently, with at most `REQUEST_CONCURRENCY` requests being
+        sent at the same time. Requests which failed return their exception instead of raising
+        it, so that callers can decide which errors can be ignored."""
+
+        async def run_all() -> list[T | Exception]:
+            semaphore = Semaphore(REQUEST_CONCURRENCY)
+
+            async def run_one(request: Coroutine[Any, Any, T]) -> T:
+                async with semaphore:
+                    return await request
+
+            return await gather(*(run_one(request) for request in requests), return_exceptions=True)
+
+        return [
+            self._sync_exception(result) if isinstance(result, Exception) else result
+            for result in self._loop.run_until_complete(run_all())
+        ]
 
     def __prefetch_domains(self):
         self.domains = []
@@ -18,7 +18,6 @@ from authentik.lib.sync.outgoing.exceptions import (
     NotFoundSyncException,
     ObjectExistsSyncException,
     StopSync,
-    TransientSyncException,
 )
 from authentik.lib.sync.outgoing.models import OutgoingSyncDeleteAction
 
@@ -131,27 +130,22 @@ class MicrosoftEntraGroupClient(
             return self._patch_remove_users(group, users_set)
 
     def _patch(self, microsoft_group_id: str, direction: Direction, members: list[str]):
+        group = self.client.groups.by_group_id(microsoft_group_id)
+        requests = []
         for user in members:
-            try:
-                if direction == Direction.add:
-                    request_body = ReferenceCreate(
-                        odata_id=f"https://graph.microsoft.com/v1.0/directoryObjects/{user}",
-                    )
-                    self._request(
-                        self.client.groups.by_group_id(microsoft_group_id).members.ref.post(
-                            request_body
-                        )
-                    )
-                if direction == Direction.remove:
-                    self._request(
-                        self.client.groups.by_group_id(microsoft_group_id)
-                        .members.by_directory_object_id(user)
-                        .ref.delete()
-                    )
-            except ObjectExistsSyncException:
-                pass
-            except TransientSyncException:
-                raise
+            if direction == Direction.add:
+                request_body = ReferenceCreate(
+                    odata_id=f"https://graph.microsoft.com/v1.0/directoryObjects/{user}",
+                )
+                requests.append(group.members.ref.post(request_body))
+            if direction == Direction.remove:
+                requests.append(group.members.by_directory_object_id(user).ref.delete())
+        # Membership changes don't depend on each other, so send them concurrently
+        for result in self._request_all(requests):
+            if isinstance(result, ObjectExistsSyncException):
+                continue
+            if isinstance(result, Exception):
+                raise result
 
     def _patch_add_users(self, group: Group, users_set: set[int]):
         """Add users in users_set to group"""
@@ -4,6 +4,7 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 from azure.identity.aio import ClientSecretCredential
 from django.test import TestCase
+from kiota_abstractions.api_error import APIError
 from msgraph.generated.models.group import Group as MSGroup
 from msgraph.generated.models.group_collection_response import GroupCollectionResponse
 from msgraph.generated.models.organization import Organization
@@ -325,6 +326,56 @@ class MicrosoftEntraGroupTests(TestCase):
             )
             member_remove.assert_called_once()
 
+    def test_group_member_add_concurrent(self):
+        """Test multiple members are added, and existing members are skipped"""
+        uid = generate_id()
+        with (
+            patch(
+                "authentik.enterprise.providers.microsoft_entra.models.MicrosoftEntraProvider.microsoft_credentials",
+                MagicMock(return_value={"credentials": self.creds}),
+            ),
+            patch(
+                "msgraph.generated.organization.organization_request_builder.OrganizationRequestBuilder.get",
+                AsyncMock(
+                    return_value=OrganizationCollectionResponse(
+                        value=[
+                            Organization(verified_domains=[VerifiedDomain(name="goauthentik.io")])
+                        ]
+                    )
+                ),
+            ),
+            patch(
+                "msgraph.generated.users.users_request_builder.UsersRequestBuilder.post",
+                AsyncMock(side_effect=lambda *args, **kwargs: MSUser(id=generate_id())),
+            ),
+            patch(
+                "msgraph.generated.users.item.user_item_request_builder.UserItemRequestBuilder.patch",
+                AsyncMock(return_value=MSUser(id=generate_id())),
+            ),
+            patch(
+                "msgraph.generated.groups.groups_request_builder.GroupsRequestBuilder.post",
+                AsyncMock(return_value=MSGroup(id=uid)),
+            ),
+            patch(
+                "msgraph.generated.groups.item.members.ref.ref_request_builder.RefRequestBuilder.post",
+                AsyncMock(side_effect=[None, APIError(response_status_code=409), None]),
+            ) as member_add,
+        ):
+            users = [create_test_user() for _ in range(3)]
+            group = Group.objects.create(name=uid)
+            group.users.add(*users)
+            self.assertFalse(Event.objects.filter(action=EventAction.SYSTEM_EXCEPTION).exists())
+            self.assertEqual(member_add.call_count, 3)
+            self.assertEqual(
+                {call[0][0].odata_id for call in member_add.call_args_list},
+                {
+                    f"https://graph.microsoft.com/v1.0/directoryObjects/{microsoft_id}"
+                    for microsoft_id in MicrosoftEntraProviderUser.objects.filter(
+                        provider=self.provider,
+                    ).values_list("microsoft_id", flat=True)
+                },
+            )
+
     def test_group_create_delete_do_nothing(self):
         """Test group deletion (delete action = do nothing)"""
         self.provider.group_delete_action = OutgoingSyncDeleteAction.DO_NOTHING
@@ -1,5 +1,6 @@
 """Microsoft Entra User tests"""
 
+import gc
 from unittest.mock import AsyncMock, MagicMock, patch
 
 from azure.identity.aio import ClientSecretCredential
@@ -15,6 +16,7 @@ from rest_framework.test import APITestCase
 from authentik.blueprints.tests import apply_blueprint
 from authentik.core.models import Application, Group, User
 from authentik.core.tests.utils import create_test_admin_user
+from authentik.enterprise.providers.microsoft_entra.clients.users import MicrosoftEntraUserClient
 from authentik.enterprise.providers.microsoft_entra.models import (
     MicrosoftEntraProvider,
     MicrosoftEntraProviderMapping,
@@ -61,6 +63,34 @@ class MicrosoftEntraUserTests(APITestCase):
         )
         self.creds = ClientSecretCredential(generate_id(), generate_id(), generate_id())
 
+    def test_client_close(self):
+        """Test the event loop and HTTP client are closed with the client"""
+        with (
+            patch(
+                "authentik.enterprise.providers.microsoft_entra.models.MicrosoftEntraProvider.microsoft_credentials",
+                MagicMock(return_value={"credentials": self.creds}),
+            ),
+            patch(
+                "msgraph.generated.organization.organization_request_builder.OrganizationRequestBuilder.get",
+                AsyncMock(
+                    return_value=OrganizationCollectionResponse(
+                        value=[
+                            Organization(verified_domains=[VerifiedDomain(name="goauthentik.io")])
+                        ]
+                    )
+                ),
+            ),
+        ):
+            client = MicrosoftEntraUserClient(self.provider)
+        loop = client._loop
+        http_client = client.client.request_adapter._http_client
+        self.assertFalse(loop.is_closed())
+        self.assertFalse(http_client.is_closed)
+        del client
+        gc.collect()
+        self.assertTrue(loop.is_closed())
+        self.assertTrue(http_client.is_closed)
+
     def test_user_create(self):
         """Test user creation"""
         uid = generate_id()
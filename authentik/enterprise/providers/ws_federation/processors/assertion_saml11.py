@@ -3,22 +3,15 @@
 from hashlib import sha256
 from types import GeneratorType
 
-import xmlsec
 from lxml.etree import Element, SubElement, _Element  # nosec
 from structlog.stdlib import get_logger
 
-from authentik.common.saml.constants import (
-    DIGEST_ALGORITHM_TRANSLATION_MAP,
-    NS_SIGNATURE,
-    SIGN_ALGORITHM_TRANSFORM_MAP,
-)
+from authentik.common.saml.constants import NS_SIGNATURE
 from authentik.core.expression.exceptions import PropertyMappingExpressionException
 from authentik.events.models import Event, EventAction
 from authentik.events.signals import get_login_event
-from authentik.lib.xml import remove_xml_newlines
 from authentik.providers.saml.models import SAMLPropertyMapping
 from authentik.providers.saml.processors.assertion import AssertionProcessor
-from authentik.sources.saml.exceptions import InvalidSignature
 from authentik.stages.password.stage import PLAN_CONTEXT_METHOD
 
 LOGGER = get_logger()
@@ -36,6 +29,8 @@ WSFED_ATTRIBUTE_NAMESPACE = "http://schemas.xmlsoap.org/claims"
 class SAML11AssertionProcessor(AssertionProcessor):
     """SAML 1.1 assertion builder, overriding the SAML 2.0 methods that differ."""
 
+    id_attribute = "AssertionID"
+
     def get_name_id(self) -> _Element:
         # same value/format resolution as SAML 2.0, wrapped as NameIdentifier instead of NameID
         name_id = super().get_name_id()
@@ -170,49 +165,6 @@ class SAML11AssertionProcessor(AssertionProcessor):
 
         # unlike SAML 2.0, ds:Signature must be the last child of Assertion
         if self.provider.signing_kp and self.provider.sign_assertion:
-            sign_algorithm_transform = SIGN_ALGORITHM_TRANSFORM_MAP.get(
-                self.provider.signature_algorithm, xmlsec.constants.TransformRsaSha1
-            )
-            signature = xmlsec.template.create(
-                assertion,
-                xmlsec.constants.TransformExclC14N,
-                sign_algorithm_transform,
-                ns=xmlsec.constants.DSigNs,
-            )
-            assertion.append(signature)
+            assertion.append(self.get_signature(self._assertion_id))
 
         return assertion
-
-    def _sign(self, element: _Element):
-        # same as AssertionProcessor._sign, but referencing AssertionID instead of ID
-        digest_algorithm_transform = DIGEST_ALGORITHM_TRANSLATION_MAP.get(
-            self.provider.digest_algorithm, xmlsec.constants.TransformSha1
-        )
-        xmlsec.tree.add_ids(element, ["AssertionID"])
-        signature_node = xmlsec.tree.find_node(element, xmlsec.constants.NodeSignature)
-        ref = xmlsec.template.add_reference(
-            signature_node,
-            digest_algorithm_transform,
-            uri="#" + element.attrib["AssertionID"],
-        )
-        xmlsec.template.add_transform(ref, xmlsec.constants.TransformEnveloped)
-        xmlsec.template.add_transform(ref, xmlsec.constants.TransformExclC14N)
-        key_info = xmlsec.template.ensure_key_info(signature_node)
-        xmlsec.template.add_x509_data(key_info)
-
-        ctx = xmlsec.SignatureContext()
-
-        key = xmlsec.Key.from_memory(
-            self.provider.signing_kp.key_data,
-            xmlsec.constants.KeyDataFormatPem,
-            None,
-        )
-        key.load_cert_from_memory(
-            self.provider.signing_kp.certificate_data,
-            xmlsec.constants.KeyDataFormatCertPem,
-        )
-        ctx.key = key
-        try:
-            ctx.sign(remove_xml_newlines(element, signature_node))
-        except xmlsec.Error as exc:
-            raise InvalidSignature() from exc
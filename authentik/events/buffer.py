@@ -0,0 +1,160 @@
+"""Write-behind buffer for events created during requests
+
+When `events.buffer.batch_size` is set, events created with `Event.from_http(buffered=True)`
+are queued in memory once the current transaction commits, and written with a single
+`bulk_create` per tenant once `batch_size` events are queued, or after
+`events.buffer.flush_interval` seconds. Notification rules are dispatched once per written batch.
+If a batch can't be written, its events are written one by one, so that only the events which
+fail are lost. The queue is bounded by `events.buffer.max_size`; when it is full, the request
+adding an event writes the queued events itself before continuing. Queued events are written
+when the process exits.
+"""
+
+import atexit
+import os
+from collections import defaultdict
+from threading import Condition, Lock, Thread
+
+from django.db import DatabaseError, close_old_connections, connection, transaction
+from structlog.stdlib import get_logger
+
+from authentik.events.models import Event
+from authentik.lib.config import CONFIG
+from authentik.tenants.models import Tenant
+
+LOGGER = get_logger()
+
+
+class EventBuffer:
+    """Per-process queue of events waiting to be written"""
+
+    def __init__(self):
+        self._events: list[tuple[Tenant, Event]] = []
+        self._condition = Condition()
+        self._flush_lock = Lock()
+        self._pid: int | None = None
+        self._thread: Thread | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.batch_size > 0
+
+    @property
+    def batch_size(self) -> int:
+        return CONFIG.get_int("events.buffer.batch_size", 0)
+
+    @property
+    def flush_interval(self) -> float:
+        return float(CONFIG.get("events.buffer.flush_interval", 1))
+
+    @property
+    def max_size(self) -> int:
+        return CONFIG.get_int("events.buffer.max_size", 10000)
+
+    def _ensure_worker(self):
+        """Start the flush thread and the exit handler, once per process. Events queued
+        before a fork are written by the parent process, and dropped in the child."""
+        if self._pid == os.getpid():
+            return
+        if self._pid is None:
+            atexit.register(self.flush)
+        self._pid = os.getpid()
+        self._events = []
+        self._thread = None
+        if self.flush_interval > 0:
+            self._thread = Thread(target=self._run, name="authentik-event-buffer", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: len(self._events) >= self.batch_size, timeout=self.flush_interval
+                )
+            try:
+                self.flush()
+            finally:
+                close_old_connections()
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def add(self, event: Event) -> bool:
+        """Queue `event`. Returns False if buffering is disabled, in which case the event
+        must be saved by the caller."""
+        batch_size = self.batch_size
+        if batch_size <= 0:
+            return False
+        LOGGER.info(
+            "Created Event",
+            action=event.action,
+            context=event.context,
+            client_ip=event.client_ip,
+            user=event.user,
+        )
+        tenant = connection.tenant
+        with self._condition:
+            self._ensure_worker()
+            full = len(self._events) >= self.max_size
+            if not full:
+                self._events.append((tenant, event))
+                if len(self._events) >= batch_size:
+                    self._condition.notify()
+        if full:
+            # Backpressure, the flush thread can't keep up
+            LOGGER.warning("Event buffer is full, writing events")
+            self.flush()
+            with self._condition:
+                self._events.append((tenant, event))
+        elif self._thread is None and len(self._events) >= batch_size:
+            self.flush()
+        return True
+
+    def flush(self):
+        """Write all queued events"""
+        from authentik.events.tasks import event_trigger_dispatch_batch
+
+        with self._flush_lock:
+            with self._condition:
+                events, self._events = self._events, []
+            if not events:
+                return
+            tenants: dict[str, Tenant] = {}
+            by_tenant: dict[str, list[Event]] = defaultdict(list)
+            for tenant, event in events:
+                tenants[tenant.schema_name] = tenant
+                by_tenant[tenant.schema_name].append(event)
+            for schema_name, tenant_events in by_tenant.items():
+                with tenants[schema_name]:
+                    try:
+                        with transaction.atomic():
+                            Event.objects.bulk_create(
+                                tenant_events, batch_size=self.batch_size or None
+                            )
+                    except DatabaseError as exc:
+                        LOGGER.warning(
+                            "Failed to write events, writing them one by one",
+                            exc=exc,
+                            events=len(tenant_events),
+                        )
+                        self._write_each(tenant_events)
+                        continue
+                    event_trigger_dispatch_batch.send([event.event_uuid for event in tenant_events])
+
+    def _write_each(self, events: list[Event]):
+        """Write `events` one by one, skipping the ones that can't be written. Notification
+        rules are dispatched for each written event by its `post_save` signal."""
+        for event in events:
+            try:
+                with transaction.atomic():
+                    event.save(force_insert=True)
+            except DatabaseError as exc:
+                LOGGER.warning(
+                    "Failed to write event",
+                    exc=exc,
+                    event_uuid=event.event_uuid,
+                    action=event.action,
+                )
+
+
+EVENT_BUFFER = EventBuffer()
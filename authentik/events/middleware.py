@@ -91,7 +91,7 @@ class EventNewThread(Thread):
         self.kwargs = kwargs
 
     def run(self):
-        Event.new(self.action, **self.kwargs).from_http(self.request, user=self.user)
+        Event.new(self.action, **self.kwargs).from_http(self.request, user=self.user, buffered=True)
 
 
 class AuditMiddleware:
@@ -3,14 +3,14 @@
 from collections.abc import Generator
 from datetime import timedelta
 from difflib import get_close_matches
-from functools import lru_cache
+from functools import lru_cache, partial
 from inspect import currentframe
 from typing import Any
 from uuid import uuid4
 
 from channels.layers import get_channel_layer
 from django.apps import apps
-from django.db import models
+from django.db import models, transaction
 from django.db.models import Q
 from django.http import HttpRequest
 from django.http.request import QueryDict
@@ -205,10 +205,14 @@ class Event(SerializerModel, ExpiringModel):
         self.user = get_user(user)
         return self
 
-    def from_http(self, request: HttpRequest, user: User | None = None) -> Event:
+    def from_http(
+        self, request: HttpRequest, user: User | None = None, buffered: bool = False
+    ) -> Event:
         """Add data from a Django-HttpRequest, allowing the creation of
         Events independently from requests.
-        `user` arguments optionally overrides user from requests."""
+        `user` arguments optionally overrides user from requests.
+        With `buffered`, the event may be written later through the write-behind buffer,
+        which should only be used when nothing relies on the event existing right away."""
         if request:
             from authentik.flows.views.executor import QS_QUERY
 
@@ -263,9 +267,22 @@ class Event(SerializerModel, ExpiringModel):
         # If there's no app set, we get it from the requests too
         if not self.app:
             self.app = Event._get_app_from_request(request)
-        self.save()
+        if buffered:
+            self.save_buffered()
+        else:
+            self.save()
         return self
 
+    def save_buffered(self):
+        """Save this event through the write-behind buffer if enabled, otherwise directly.
+        Like a direct save, the event is discarded if the current transaction is rolled back."""
+        from authentik.events.buffer import EVENT_BUFFER
+
+        if EVENT_BUFFER.enabled:
+            transaction.on_commit(partial(EVENT_BUFFER.add, self))
+        else:
+            self.save()
+
     @staticmethod
     def log_deprecation(
         identifier: str, message: str, cause: str | None = None, expiry_days=30, **kwargs
@@ -29,6 +29,16 @@ def event_trigger_dispatch(event_uuid: UUID):
         event_trigger_handler.send_with_options(args=(event_uuid, trigger.name), rel_obj=trigger)
 
 
+@actor(description=_("Dispatch new event notifications for a batch of events."))
+def event_trigger_dispatch_batch(event_uuids: list[UUID]):
+    triggers = list(NotificationRule.objects.all())
+    for event_uuid in event_uuids:
+        for trigger in triggers:
+            event_trigger_handler.send_with_options(
+                args=(event_uuid, trigger.name), rel_obj=trigger
+            )
+
+
 @actor(
     description=_(
         "Check if policies attached to NotificationRule match event "
@@ -0,0 +1,94 @@
+"""Event buffer tests"""
+
+from unittest.mock import patch
+
+from django.test import RequestFactory, TestCase
+
+from authentik.events.buffer import EventBuffer
+from authentik.events.models import Event
+from authentik.lib.config import CONFIG
+from authentik.lib.generators import generate_id
+
+
+class TestEventBuffer(TestCase):
+    """Event buffer tests"""
+
+    def setUp(self):
+        self.buffer = EventBuffer()
+        self.action = generate_id()
+
+    def _event(self) -> Event:
+        event = Event.new(self.action)
+        event.client_ip = "127.0.0.1"
+        return event
+
+    def test_disabled(self):
+        """Test events aren't queued by default"""
+        self.assertFalse(self.buffer.add(self._event()))
+        self.assertEqual(len(self.buffer), 0)
+
+    @CONFIG.patch("events.buffer.batch_size", 2)
+    @CONFIG.patch("events.buffer.flush_interval", 0)
+    def test_batch(self):
+        """Test events are written once a batch is full"""
+        with patch("authentik.events.tasks.event_trigger_dispatch_batch.send") as dispatch:
+            first = self._event()
+            self.assertTrue(self.buffer.add(first))
+            self.assertFalse(Event.objects.filter(action__endswith=self.action).exists())
+            second = self._event()
+            self.assertTrue(self.buffer.add(second))
+        self.assertEqual(Event.objects.filter(action__endswith=self.action).count(), 2)
+        self.assertEqual(len(self.buffer), 0)
+        dispatch.assert_called_once_with([first.event_uuid, second.event_uuid])
+
+    @CONFIG.patch("events.buffer.batch_size", 10)
+    @CONFIG.patch("events.buffer.flush_interval", 0)
+    @CONFIG.patch("events.buffer.max_size", 2)
+    def test_backpressure(self):
+        """Test queued events are written when the buffer is full"""
+        with patch("authentik.events.tasks.event_trigger_dispatch_batch.send"):
+            for _ in range(3):
+                self.buffer.add(self._event())
+        self.assertEqual(Event.objects.filter(action__endswith=self.action).count(), 2)
+        self.assertEqual(len(self.buffer), 1)
+        with patch("authentik.events.tasks.event_trigger_dispatch_batch.send"):
+            self.buffer.flush()
+        self.assertEqual(Event.objects.filter(action__endswith=self.action).count(), 3)
+
+    @CONFIG.patch("events.buffer.batch_size", 10)
+    @CONFIG.patch("events.buffer.flush_interval", 0)
+    def test_from_http(self):
+        """Test events created from requests are only queued when requested"""
+        request = RequestFactory().get("/")
+        with patch("authentik.events.buffer.EVENT_BUFFER", self.buffer):
+            Event.new(self.action).from_http(request)
+            self.assertEqual(len(self.buffer), 0)
+            self.assertTrue(Event.objects.filter(action__endswith=self.action).exists())
+            Event.objects.filter(action__endswith=self.action).delete()
+            with self.captureOnCommitCallbacks(execute=True):
+                Event.new(self.action).from_http(request, buffered=True)
+                # Only queued once the transaction has been committed
+                self.assertEqual(len(self.buffer), 0)
+        self.assertEqual(len(self.buffer), 1)
+        self.assertFalse(Event.objects.filter(action__endswith=self.action).exists())
+        with patch("authentik.events.tasks.event_trigger_dispatch_batch.send"):
+            self.buffer.flush()
+        self.assertTrue(Event.objects.filter(action__endswith=self.action).exists())
+
+    @CONFIG.patch("events.buffer.batch_size", 10)
+    @CONFIG.patch("events.buffer.flush_interval", 0)
+    def test_flush_fallback(self):
+        """Test events are written one by one when the batch can't be written"""
+        existing = self._event()
+        existing.save()
+        duplicate = self._event()
+        duplicate.event_uuid = existing.event_uuid
+        valid = self._event()
+        with patch("authentik.events.tasks.event_trigger_dispatch_batch.send") as dispatch:
+            self.buffer.add(duplicate)
+            self.buffer.add(valid)
+            self.buffer.flush()
+        dispatch.assert_not_called()
+        self.assertTrue(Event.objects.filter(pk=valid.pk).exists())
+        self.assertEqual(Event.objects.filter(action__endswith=self.action).count(), 2)
+        self.assertEqual(len(self.buffer), 0)
@@ -1,7 +1,7 @@
 """authentik flows app config"""
 
 from django.utils.translation import gettext_lazy as _
-from prometheus_client import Gauge, Histogram
+from prometheus_client import Counter, Gauge, Histogram
 
 from authentik.blueprints.apps import ManagedAppConfig
 from authentik.lib.utils.reflection import all_subclasses
@@ -22,6 +22,12 @@ HIST_FLOWS_PLAN_TIME = Histogram(
     "Duration to build a plan for a flow",
     ["flow_slug"],
 )
+COUNTER_FLOWS_PLAN_CACHE = Counter(
+    "authentik_flows_plan_cache",
+    "Flow plan cache lookups, by whether a plan shared by all users, a plan of the user, "
+    "or no plan was found",
+    ["flow_slug", "result"],
+)
 
 
 class ContinuousLogin(Flag[bool], key="flows_continuous_login"):
@@ -2,6 +2,7 @@
 
 from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Any
+from uuid import UUID
 
 from django.core.cache import cache
 from django.http import HttpRequest, HttpResponse
@@ -12,7 +13,7 @@ from structlog.stdlib import BoundLogger, get_logger
 
 from authentik.core.models import User
 from authentik.events.models import cleanse_dict
-from authentik.flows.apps import HIST_FLOWS_PLAN_TIME
+from authentik.flows.apps import COUNTER_FLOWS_PLAN_CACHE, HIST_FLOWS_PLAN_TIME
 from authentik.flows.exceptions import EmptyFlowException, FlowNonApplicableException
 from authentik.flows.markers import ReevaluateMarker, StageMarker
 from authentik.flows.models import (
@@ -23,10 +24,12 @@ from authentik.flows.models import (
     Stage,
     in_memory_stage,
 )
+from authentik.flows.registry import REGISTRY
 from authentik.lib.config import CONFIG
 from authentik.lib.utils.urls import redirect_with_qs
 from authentik.outposts.models import Outpost
 from authentik.policies.engine import PolicyEngine
+from authentik.policies.index import INDEX
 from authentik.policies.types import PolicyResult
 from authentik.root.middleware import ClientIPMiddleware
 
@@ -56,13 +59,36 @@ CACHE_PREFIX = "goauthentik.io/flows/planner/"
 
 
 def cache_key(flow: Flow, user: User | None = None) -> str:
-    """Generate Cache key for flow"""
+    """Generate Cache key for flow. Without a user, the key is used for plans which are
+    the same for every user."""
     prefix = CACHE_PREFIX + str(flow.pk)
     if user:
         prefix += f"#{user.pk}"
     return prefix
 
 
+def _binding_ref(binding: FlowStageBinding) -> UUID | FlowStageBinding:
+    """Reference a binding by its primary key if it can be restored from the database"""
+    if binding._state.adding:
+        return binding
+    stage = binding._state.fields_cache.get("stage")
+    if stage is not None and stage._state.adding:
+        return binding
+    return binding.pk
+
+
+def _marker_ref(marker: StageMarker) -> StageMarker | UUID | None:
+    """Compact form of the most common markers, `None` for a plain `StageMarker` and the
+    binding's primary key for a `ReevaluateMarker`"""
+    if marker.__class__ is StageMarker:
+        return None
+    if marker.__class__ is ReevaluateMarker and isinstance(marker.binding, FlowStageBinding):
+        ref = _binding_ref(marker.binding)
+        if isinstance(ref, UUID):
+            return ref
+    return marker
+
+
 @dataclass(slots=True)
 class FlowPlan:
     """This data-class is the output of a FlowPlanner. It holds a flat list
@@ -74,6 +100,50 @@ class FlowPlan:
     context: dict[str, Any] = field(default_factory=dict)
     markers: list[StageMarker] = field(default_factory=list)
 
+    # Set by the planner when no policies were evaluated while planning, so the plan can be
+    # shared between users
+    user_independent: bool = False
+
+    def __getstate__(self) -> dict[str, Any]:
+        """Plans are stored in the session and the flow plan cache, so bindings that exist in
+        the database are only stored by their primary key, and restored from the
+        `StageBindingRegistry` when unpickling."""
+        return {
+            "flow_pk": self.flow_pk,
+            "bindings": [_binding_ref(binding) for binding in self.bindings],
+            "context": self.context,
+            "markers": [_marker_ref(marker) for marker in self.markers],
+            "user_independent": self.user_independent,
+        }
+
+    def __setstate__(self, state: dict[str, Any] | tuple):
+        if isinstance(state, tuple):
+            # Plans pickled before bindings were stored by reference
+            state = state[1]
+        self.flow_pk = state["flow_pk"]
+        self.context = state["context"]
+        self.user_independent = state.get("user_independent", False)
+        refs = [ref for ref in [*state["bindings"], *state["markers"]] if isinstance(ref, UUID)]
+        restored = REGISTRY.get_many(refs) if refs else {}
+        self.bindings = []
+        self.markers = []
+        for binding_ref, marker_ref in zip(state["bindings"], state["markers"], strict=True):
+            binding = binding_ref
+            if isinstance(binding_ref, UUID):
+                binding = restored.get(binding_ref)
+            marker = marker_ref
+            if marker_ref is None:
+                marker = StageMarker()
+            elif isinstance(marker_ref, UUID):
+                marker_binding = restored.get(marker_ref)
+                marker = ReevaluateMarker(binding=marker_binding) if marker_binding else None
+            if binding is None or marker is None:
+                # The binding was deleted while the plan was stored
+                LOGGER.info("f(plan_inst): dropping removed stage binding from plan")
+                continue
+            self.bindings.append(binding)
+            self.markers.append(marker)
+
     def append_stage(self, stage: Stage, marker: StageMarker | None = None):
         """Append `stage` to the end of the plan, optionally with stage marker"""
         return self.append(FlowStageBinding(stage=stage), marker)
@@ -289,14 +359,11 @@ class FlowPlanner:
             if not result.passing:
                 raise FlowNonApplicableException(result)
             # User is passing so far, check if we have a cached plan
-            cached_plan_key = cache_key(self.flow, user)
-            cached_plan = cache.get(cached_plan_key, None)
-            if self.flow.designation not in [FlowDesignation.STAGE_CONFIGURATION]:
-                if cached_plan and self.use_cache:
-                    self._logger.debug(
-                        "f(plan): taking plan from cache",
-                        key=cached_plan_key,
-                    )
+            if self.use_cache and self.flow.designation not in [
+                FlowDesignation.STAGE_CONFIGURATION
+            ]:
+                cached_plan = self._cached_plan(user)
+                if cached_plan:
                     # Reset the context as this isn't factored into caching
                     cached_plan.context = context
                     return cached_plan
@@ -305,11 +372,26 @@ class FlowPlanner:
             )
             plan = self._build_plan(user, request, context)
             if self.use_cache:
-                cache.set(cache_key(self.flow, user), plan, CACHE_TIMEOUT)
+                key = cache_key(self.flow, None if plan.user_independent else user)
+                cache.set(key, plan, CACHE_TIMEOUT)
             if not plan.bindings and not self.allow_empty_flows:
                 raise EmptyFlowException()
             return plan
 
+    def _cached_plan(self, user: User) -> FlowPlan | None:
+        """Get a cached plan for `user`, either one shared by all users or one built
+        specifically for `user`"""
+        shared_key = cache_key(self.flow)
+        user_key = cache_key(self.flow, user)
+        cached = cache.get_many([shared_key, user_key])
+        for key, scope in ((shared_key, "shared"), (user_key, "user")):
+            if key in cached:
+                self._logger.debug("f(plan): taking plan from cache", key=key)
+                COUNTER_FLOWS_PLAN_CACHE.labels(flow_slug=self.flow.slug, result=scope).inc()
+                return cached[key]
+        COUNTER_FLOWS_PLAN_CACHE.labels(flow_slug=self.flow.slug, result="miss").inc()
+        return None
+
     def _build_plan(
         self,
         user: User,
@@ -330,7 +412,7 @@ class FlowPlanner:
             span.set_data("user", user)
             span.set_data("request", request)
 
-            plan = FlowPlan(flow_pk=self.flow.pk.hex)
+            plan = FlowPlan(flow_pk=self.flow.pk.hex, user_independent=True)
             if default_context:
                 plan.context = default_context
             # Check Flow policies
@@ -342,7 +424,9 @@ class FlowPlanner:
                 binding: FlowStageBinding
                 stage = [stage for stage in stages if stage.pk == binding.stage_id][0]
                 marker = StageMarker()
-                if binding.evaluate_on_plan:
+                if binding.evaluate_on_plan and INDEX.bindings_for(binding):
+                    # Any policy, group or user binding makes the plan depend on the user
+                    plan.user_independent = False
                     self._logger.debug(
                         "f(plan): evaluating on plan",
                         stage=stage,
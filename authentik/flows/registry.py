@@ -0,0 +1,81 @@
+"""Per-process registry of flow stage bindings"""
+
+from copy import deepcopy
+from threading import Lock
+from uuid import UUID, uuid4
+
+from cachetools import LRUCache
+from django.core.cache import cache
+from django.db import connection
+from structlog.stdlib import get_logger
+
+from authentik.flows.models import FlowStageBinding, Stage
+
+LOGGER = get_logger()
+# Not below the flow planner prefix, as those keys are counted and cleared by prefix
+REGISTRY_VERSION_KEY = "goauthentik.io/flows/registry/version"
+REGISTRY_SIZE = 4096
+
+
+class StageBindingRegistry:
+    """Map FlowStageBinding primary keys to bindings with their stage resolved to its subclass.
+
+    Used to restore flow plans, which only store the primary keys of their bindings. Entries
+    are kept in memory for each process; any change to a flow, stage or stage binding replaces
+    the version stored in the cache, which drops all entries in every process. Callers receive
+    copies, so bindings can be modified as if they were loaded from the database."""
+
+    def __init__(self, size: int = REGISTRY_SIZE):
+        self._entries: LRUCache[tuple[str, UUID], tuple[str, FlowStageBinding]] = LRUCache(
+            maxsize=size
+        )
+        self._lock = Lock()
+
+    @staticmethod
+    def version() -> str:
+        """Get the current registry version, shared by all processes"""
+        version = cache.get(REGISTRY_VERSION_KEY)
+        if version is None:
+            cache.add(REGISTRY_VERSION_KEY, uuid4().hex, None)
+            version = cache.get(REGISTRY_VERSION_KEY)
+        return version
+
+    @staticmethod
+    def invalidate():
+        """Invalidate the registry of all processes"""
+        cache.set(REGISTRY_VERSION_KEY, uuid4().hex, None)
+
+    @staticmethod
+    def _load(pks: list[UUID]) -> dict[UUID, FlowStageBinding]:
+        bindings = list(FlowStageBinding.objects.filter(pk__in=pks).select_related("target"))
+        stages = {
+            stage.pk: stage
+            for stage in Stage.objects.filter(
+                pk__in={binding.stage_id for binding in bindings}
+            ).select_subclasses()
+        }
+        for binding in bindings:
+            binding.stage = stages[binding.stage_id]
+        return {binding.pk: binding for binding in bindings}
+
+    def get_many(self, pks: list[UUID]) -> dict[UUID, FlowStageBinding]:
+        """Get the bindings for `pks`. Bindings which don't exist anymore are omitted."""
+        version = self.version()
+        found: dict[UUID, FlowStageBinding] = {}
+        with self._lock:
+            for pk in pks:
+                entry = self._entries.get((connection.schema_name, pk))
+                if entry is not None and entry[0] == version:
+                    found[pk] = entry[1]
+        missing = [pk for pk in pks if pk not in found]
+        if missing:
+            loaded = self._load(missing)
+            LOGGER.debug("Loaded stage bindings", bindings=len(loaded))
+            with self._lock:
+                for pk, binding in loaded.items():
+                    self._entries[(connection.schema_name, pk)] = (version, binding)
+            found.update(loaded)
+        return {pk: deepcopy(binding) for pk, binding in found.items()}
+
+
+REGISTRY = StageBindingRegistry()
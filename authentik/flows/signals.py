@@ -34,6 +34,11 @@ def invalidate_flow_cache(sender, instance, **_):
     """Invalidate flow cache when flow is updated"""
     from authentik.flows.models import Flow, FlowStageBinding, Stage
     from authentik.flows.planner import cache_key
+    from authentik.flows.registry import StageBindingRegistry
+    from authentik.policies.models import PolicyBinding
+
+    if isinstance(instance, Flow | FlowStageBinding | Stage):
+        StageBindingRegistry.invalidate()
 
     if isinstance(instance, Flow):
         total = delete_cache_prefix(f"{cache_key(instance)}*")
@@ -47,3 +52,14 @@ def invalidate_flow_cache(sender, instance, **_):
             prefix = cache_key(binding.target)
             total += delete_cache_prefix(f"{prefix}*")
         LOGGER.debug("Invalidating Flow cache from Stage", stage=instance, len=total)
+    if isinstance(instance, PolicyBinding):
+        # Plans built without evaluating policies are shared between users, and need to be
+        # rebuilt when a binding is added to one of their stages
+        binding = (
+            FlowStageBinding.objects.filter(policybindingmodel_ptr_id=instance.target_id)
+            .select_related("target")
+            .first()
+        )
+        if binding:
+            total = delete_cache_prefix(f"{cache_key(binding.target)}*")
+            LOGGER.debug("Invalidating Flow cache from PolicyBinding", binding=instance, len=total)
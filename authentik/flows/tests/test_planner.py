@@ -1,5 +1,6 @@
 """flow planner tests"""
 
+import pickle  # nosec
 from unittest.mock import MagicMock, Mock, PropertyMock, patch
 
 from django.core.cache import cache
@@ -28,6 +29,7 @@ from authentik.flows.planner import (
     PLAN_CONTEXT_IS_REDIRECTED,
     PLAN_CONTEXT_IS_RESTORED,
     PLAN_CONTEXT_PENDING_USER,
+    FlowPlan,
     FlowPlanner,
     cache_key,
 )
@@ -178,7 +180,7 @@ class TestFlowPlanner(TestCase):
         planner = FlowPlanner(flow)
         planner.plan(request)
         self.assertEqual(CACHE_MOCK.set.call_count, 1)  # Ensure nothing is written to cache
-        self.assertEqual(CACHE_MOCK.get.call_count, 2)  # Get is called twice
+        self.assertEqual(CACHE_MOCK.get_many.call_count, 2)  # Lookup is done twice
 
     def test_planner_default_context(self):
         """Test planner with default_context"""
@@ -194,8 +196,60 @@ class TestFlowPlanner(TestCase):
         request.user = user
         planner = FlowPlanner(flow)
         planner.plan(request, default_context={PLAN_CONTEXT_PENDING_USER: user})
-        key = cache_key(flow, user)
-        self.assertTrue(cache.get(key) is not None)
+        # No policies are evaluated during planning, so the plan is shared by all users
+        self.assertIsNotNone(cache.get(cache_key(flow)))
+        self.assertIsNone(cache.get(cache_key(flow, user)))
+
+    def test_planner_cache_user_dependent(self):
+        """Test plans are cached per user when policies are evaluated during planning"""
+        flow = create_test_flow()
+        binding = FlowStageBinding.objects.create(
+            target=flow,
+            stage=DummyStage.objects.create(name=generate_id()),
+            order=0,
+            evaluate_on_plan=True,
+        )
+        PolicyBinding.objects.create(
+            policy=DummyPolicy.objects.create(
+                name=generate_id(), result=True, wait_min=0, wait_max=1
+            ),
+            target=binding,
+            order=0,
+        )
+
+        user = User.objects.create(username=generate_id())
+        request = self.request_factory.get(
+            reverse("authentik_api:flow-executor", kwargs={"flow_slug": flow.slug}),
+        )
+        request.user = user
+        plan = FlowPlanner(flow).plan(request)
+        self.assertFalse(plan.user_independent)
+        self.assertIsNone(cache.get(cache_key(flow)))
+        self.assertIsNotNone(cache.get(cache_key(flow, user)))
+
+    def test_planner_cache_invalidated_by_policy_binding(self):
+        """Test shared plans are invalidated when a binding is added to a stage"""
+        flow = create_test_flow()
+        binding = FlowStageBinding.objects.create(
+            target=flow,
+            stage=DummyStage.objects.create(name=generate_id()),
+            order=0,
+            evaluate_on_plan=True,
+        )
+        request = self.request_factory.get(
+            reverse("authentik_api:flow-executor", kwargs={"flow_slug": flow.slug}),
+        )
+        request.user = User.objects.create(username=generate_id())
+        self.assertTrue(FlowPlanner(flow).plan(request).user_independent)
+        self.assertIsNotNone(cache.get(cache_key(flow)))
+        PolicyBinding.objects.create(
+            policy=DummyPolicy.objects.create(
+                name=generate_id(), result=True, wait_min=0, wait_max=1
+            ),
+            target=binding,
+            order=0,
+        )
+        self.assertIsNone(cache.get(cache_key(flow)))
 
     def test_planner_marker_reevaluate(self):
         """Test that the planner creates the proper marker"""
@@ -254,6 +308,40 @@ class TestFlowPlanner(TestCase):
             self.assertIsInstance(plan.markers[0], StageMarker)
             self.assertIsInstance(plan.markers[1], ReevaluateMarker)
 
+    def test_plan_pickle_compact(self):
+        """Test bindings from the database are pickled by reference and restored"""
+        flow = create_test_flow()
+        stage = DummyStage.objects.create(name=generate_id())
+        binding = FlowStageBinding.objects.create(target=flow, stage=stage, order=0)
+        binding2 = FlowStageBinding.objects.create(
+            target=flow, stage=DummyStage.objects.create(name=generate_id()), order=1
+        )
+        plan = FlowPlan(flow_pk=flow.pk.hex)
+        plan.append(binding)
+        plan.append(binding2, ReevaluateMarker(binding=binding2))
+        plan.append_stage(in_memory_stage(StageView))
+        # Make sure the stages are loaded, as they would be while executing the flow
+        self.assertEqual(binding.stage, stage)
+        _ = binding2.stage
+
+        pickled = pickle.dumps(plan)
+        self.assertLess(len(pickled), len(pickle.dumps(plan.bindings[:2])))
+        restored: FlowPlan = pickle.loads(pickled)  # nosec
+        self.assertEqual(restored.bindings[:2], [binding, binding2])
+        self.assertIsInstance(restored.bindings[0].stage, DummyStage)
+        self.assertEqual(restored.markers[0].__class__, StageMarker)
+        self.assertIsInstance(restored.markers[1], ReevaluateMarker)
+        self.assertEqual(restored.markers[1].binding, binding2)
+        self.assertTrue(restored.bindings[2].stage.is_in_memory)
+        self.assertEqual(restored.bindings[2].stage.view, StageView)
+
+        # Bindings deleted while the plan was stored are dropped
+        binding2.delete()
+        restored = pickle.loads(pickled)  # nosec
+        self.assertEqual(len(restored.bindings), 2)
+        self.assertEqual(len(restored.markers), 2)
+        self.assertEqual(restored.bindings[0], binding)
+
     def test_to_redirect(self):
         """Test to_redirect and skipping the flow executor"""
         flow = create_test_flow()
@@ -255,7 +255,7 @@ class FlowExecutorView(APIView):
             Event.new(
                 action=EventAction.SYSTEM_EXCEPTION,
                 message="System exception during flow execution.",
-            ).with_exception(exc).from_http(self.request)
+            ).with_exception(exc).from_http(self.request, buffered=True)
         challenge = FlowErrorChallenge(self.request, exc)
         challenge.is_valid(raise_exception=True)
         return to_stage_response(self.request, HttpChallengeResponse(challenge))
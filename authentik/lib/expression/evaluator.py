@@ -2,13 +2,15 @@
 
 import re
 import socket
+from hashlib import sha256
 from ipaddress import ip_address, ip_network
 from smtplib import SMTPException
 from textwrap import indent
+from threading import Lock
 from types import CodeType
 from typing import TYPE_CHECKING, Any
 
-from cachetools import TLRUCache, cached
+from cachetools import LRUCache, TLRUCache, cached
 from django.core.exceptions import FieldError
 from django.db.models import Model
 from django.http import HttpRequest
@@ -44,11 +46,38 @@ LOGGER = get_logger()
 
 ARG_SANITIZE = re.compile(r"[:.-]")
 
+# Compiled expressions shared by all evaluators in this process. Entries are keyed by a digest
+# of the wrapped source and the filename, so an edited expression never reuses stale bytecode
+COMPILE_CACHE_SIZE = 1024
+_compile_cache = LRUCache(maxsize=COMPILE_CACHE_SIZE)
+_compile_cache_lock = Lock()
+
 
 def sanitize_arg(arg_name: str) -> str:
     return re.sub(ARG_SANITIZE, "_", slugify(arg_name))
 
 
+def compile_cached(source: str, filename: str) -> CodeType:
+    """Compile `source`, re-using bytecode previously compiled from the same source"""
+    key = (sha256(source.encode()).hexdigest(), filename)
+    with _compile_cache_lock:
+        code = _compile_cache.get(key)
+    if code is not None:
+        return code
+    # Compile outside the lock; a concurrent compile of the same source is harmless
+    code = compile(source, filename, "exec")
+    with _compile_cache_lock:
+        _compile_cache[key] = code
+    return code
+
+
+def evict_compiled(filename: str):
+    """Drop all bytecode compiled under `filename`, used when the owning object is saved"""
+    with _compile_cache_lock:
+        for key in [key for key in _compile_cache.keys() if key[1] == filename]:
+            _compile_cache.pop(key, None)
+
+
 class BaseEvaluator:
     """Validate and evaluate python-based expressions"""
 
@@ -339,7 +368,7 @@ class BaseEvaluator:
     def compile(self, expression: str) -> CodeType:
         """Parse expression. Raises SyntaxError or ValueError if the syntax is incorrect."""
         expression = self.wrap_expression(expression)
-        return compile(expression, self._filename, "exec")
+        return compile_cached(expression, self._filename)
 
     def evaluate(self, expression_source: str) -> Any:
         """Parse and evaluate expression. If the syntax is incorrect, a SyntaxError is raised.
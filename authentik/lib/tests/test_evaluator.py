@@ -374,3 +374,23 @@ class TestEvaluator(TestCase):
             res, {"zgetattrgetattr__import__os_popenid_tmptest_read": "bar", "aa": "baz"}
         )
         self.assertFalse(Path("/tmp/test").exists())
+
+    def test_compile_cache(self):
+        """Test compiled expressions are shared across evaluators"""
+        expression = f"return '{generate_id()}'"
+        first = BaseEvaluator(generate_id())
+        second = BaseEvaluator(first._filename)
+        self.assertIs(first.compile(expression), second.compile(expression))
+        self.assertIsNot(first.compile(expression), second.compile("return 'foo'"))
+        self.assertIsNot(first.compile(expression), BaseEvaluator().compile(expression))
+
+    def test_compile_cache_evict(self):
+        """Test compiled expressions are evicted when the owning object is saved"""
+        mapping = ScopeMapping.objects.create(
+            name=generate_id(), scope_name=generate_id(), expression="return 'foo'"
+        )
+        evaluator = BaseEvaluator(mapping.name)
+        compiled = evaluator.compile(mapping.expression)
+        mapping.save()
+        self.assertIsNot(compiled, evaluator.compile(mapping.expression))
+        self.assertEqual(evaluator.evaluate(mapping.expression), "foo")
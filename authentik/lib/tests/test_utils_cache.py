@@ -0,0 +1,40 @@
+"""Test cache utils"""
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from authentik.lib.generators import generate_id
+from authentik.lib.utils.cache import (
+    CACHE_TOMBSTONE,
+    cache_get,
+    cache_invalidate,
+    cache_populate,
+)
+
+
+class TestCacheUtils(TestCase):
+    """Test cache-utils"""
+
+    def setUp(self):
+        self.key = f"goauthentik.io/tests/{generate_id()}"
+
+    def test_populate(self):
+        """Test values are cached when the entry wasn't invalidated"""
+        self.assertTrue(cache_populate(self.key, "foo", 60))
+        self.assertEqual(cache_get(self.key), "foo")
+
+    def test_invalidate(self):
+        """Test invalidated entries are a miss, and aren't populated again"""
+        cache_populate(self.key, "foo", 60)
+        cache_invalidate([self.key])
+        self.assertEqual(cache.get(self.key), CACHE_TOMBSTONE)
+        self.assertIsNone(cache_get(self.key))
+        self.assertFalse(cache_populate(self.key, "foo", 60))
+        self.assertIsNone(cache_get(self.key))
+
+    def test_invalidate_on_commit(self):
+        """Test entries are invalidated again when the transaction commits"""
+        with self.captureOnCommitCallbacks(execute=True):
+            cache_invalidate([self.key])
+            cache.set(self.key, "foo")
+        self.assertIsNone(cache_get(self.key))
@@ -0,0 +1,45 @@
+"""Cache utilities"""
+
+from collections.abc import Iterable
+from functools import partial
+from typing import Any
+
+from django.core.cache import cache
+from django.db import transaction
+
+# Written in place of invalidated entries, so that readers which loaded a value from the database
+# before it was changed can't cache the old value again afterwards
+CACHE_TOMBSTONE = "goauthentik.io/lib/cache/tombstone"
+# How long an invalidated entry can't be populated again, in seconds. Needs to cover the time
+# between a reader loading a value from the database and writing it to the cache
+CACHE_TOMBSTONE_TIMEOUT = 10
+
+
+def cache_get(key: str) -> Any | None:
+    """Get a cached value, treating invalidated entries as a miss"""
+    value = cache.get(key)
+    if isinstance(value, str) and value == CACHE_TOMBSTONE:
+        return None
+    return value
+
+
+def cache_populate(key: str, value: Any, timeout: float) -> bool:
+    """Cache a value loaded from the database, unless the entry was invalidated since or
+    another reader cached it first"""
+    return cache.add(key, value, timeout)
+
+
+def _write_tombstones(keys: list[str]):
+    cache.set_many(dict.fromkeys(keys, CACHE_TOMBSTONE), CACHE_TOMBSTONE_TIMEOUT)
+
+
+def cache_invalidate(keys: Iterable[str]):
+    """Invalidate cached entries, so they are loaded from the database again. Tombstones are
+    written now, and again when the current transaction commits, as readers can load the old
+    value from the database until then."""
+    keys = list(keys)
+    if not keys:
+        return
+    _write_tombstones(keys)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(partial(_write_tombstones, keys))
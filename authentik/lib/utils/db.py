@@ -3,7 +3,7 @@
 import gc
 from collections.abc import Generator
 
-from django.db import reset_queries
+from django.db import reset_queries, transaction
 from django.db.models import Model, QuerySet
 
 
@@ -37,3 +37,25 @@ def chunked_queryset[T: Model](queryset: QuerySet[T], chunk_size: int = 1_000) -
         reset_queries()
         gc.collect()
         yield from chunk.iterator(chunk_size=chunk_size)
+
+
+def chunked_delete(queryset: QuerySet, chunk_size: int = 1_000) -> Generator[int]:
+    """Delete all objects in `queryset` in batches of at most `chunk_size` objects, and yield
+    how many objects were deleted for every batch.
+
+    Batches are selected by primary key ranges instead of offsets, and each batch is deleted
+    in its own transaction to keep transactions short when deleting large amounts of objects.
+    Deletion signals and cascades are handled by Django like for `QuerySet.delete()`. Objects
+    which stop matching `queryset` while they are being deleted are kept."""
+    label = queryset.model._meta.label
+    pks = queryset.order_by("pk").values_list("pk", flat=True)
+    last_pk = None
+    while True:
+        batch = list((pks if last_pk is None else pks.filter(pk__gt=last_pk))[:chunk_size])
+        if not batch:
+            return
+        last_pk = batch[-1]
+        with transaction.atomic(using=queryset.db):
+            _, deleted = queryset.filter(pk__in=batch).delete()
+        reset_queries()
+        yield deleted.get(label, 0)
@@ -4,7 +4,7 @@ Every system policy should be its own Django app under the `policies` app.
 For example: The 'dummy' policy is available at `authentik.policies.dummy`.
 """
 
-from prometheus_client import Gauge, Histogram
+from prometheus_client import Counter, Gauge, Histogram
 
 from authentik.blueprints.apps import ManagedAppConfig
 
@@ -29,6 +29,21 @@ HIST_POLICIES_EXECUTION_TIME = Histogram(
         "mode",
     ],
 )
+HIST_POLICIES_EXECUTOR_WAIT_TIME = Histogram(
+    "authentik_policies_executor_wait_time_seconds",
+    "Time from submitting a binding to the execution backend until its result is available",
+    ["backend"],
+)
+COUNTER_POLICIES_EXECUTOR_TIMEOUTS = Counter(
+    "authentik_policies_executor_timeouts",
+    "Policy executions which exceeded their binding's timeout",
+    ["backend"],
+)
+GAUGE_POLICIES_EXECUTOR_THREADS = Gauge(
+    "authentik_policies_executor_threads",
+    "Policy execution threads which are busy, or still running a binding which timed out",
+    ["state"],
+)
 
 
 class AuthentikPoliciesConfig(ManagedAppConfig):
@@ -18,6 +18,8 @@ class DummyPolicy(Policy):
     """Policy used for debugging the PolicyEngine. Returns a fixed result,
     but takes a random time to process."""
 
+    object_dependent = False
+
     __debug_only__ = True
 
     result = models.BooleanField(default=False)
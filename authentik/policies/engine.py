@@ -3,26 +3,28 @@
 from collections import defaultdict
 from collections.abc import Iterable
 from copy import copy
-from multiprocessing import Pipe, current_process
-from multiprocessing.connection import Connection
+from threading import Lock
+from typing import Any
 
+from cachetools import LRUCache
 from django.core.cache import cache
-from django.db.models import Count, Q, QuerySet
+from django.db.models import Q, QuerySet
 from django.http import HttpRequest
 from django.utils.timezone import now
 from sentry_sdk import start_span
 from structlog.stdlib import BoundLogger, get_logger
 
 from authentik.core.models import Actor, ActorPolicyInheritance, Group, User, UserTypes
+from authentik.lib.config import CONFIG
 from authentik.lib.utils.reflection import class_to_path
 from authentik.policies.apps import HIST_POLICIES_ENGINE_TOTAL_TIME, HIST_POLICIES_EXECUTION_TIME
 from authentik.policies.exceptions import PolicyEngineException
+from authentik.policies.executor import PolicyTask, get_policy_executor
+from authentik.policies.index import INDEX
 from authentik.policies.models import Policy, PolicyBinding, PolicyBindingModel, PolicyEngineMode
-from authentik.policies.process import PolicyProcess, cache_key
+from authentik.policies.process import cache_key
 from authentik.policies.types import PolicyRequest, PolicyResult
 
-CURRENT_PROCESS = current_process()
-
 # Actors are always service accounts, so a cheap type check keeps the hot policy path free of an
 # extra query for ordinary (human) users.
 _ACTOR_USER_TYPES = frozenset({UserTypes.SERVICE_ACCOUNT, UserTypes.INTERNAL_SERVICE_ACCOUNT})
@@ -45,6 +47,36 @@ def _get_mirror_parent(user: User) -> User | None:
     return None
 
 
+class PolicyCostEstimator:
+    """Track an exponentially weighted moving average of the execution time of each policy,
+    fed by the same observations as `HIST_POLICIES_EXECUTION_TIME`"""
+
+    # Weight of the latest observation
+    alpha = 0.2
+
+    def __init__(self, size: int = 4096):
+        self._costs: LRUCache[str, float] = LRUCache(maxsize=size)
+        self._lock = Lock()
+
+    def observe(self, binding: PolicyBinding, seconds: float):
+        """Record an execution time of the binding's policy"""
+        key = binding.policy_id.hex
+        with self._lock:
+            previous = self._costs.get(key)
+            self._costs[key] = (
+                seconds if previous is None else previous + self.alpha * (seconds - previous)
+            )
+
+    def estimate(self, binding: PolicyBinding) -> float:
+        """Estimated execution time of the binding's policy. Policies that haven't been
+        observed yet are estimated at no cost, so they run early and get measured."""
+        with self._lock:
+            return self._costs.get(binding.policy_id.hex, 0.0)
+
+
+POLICY_COSTS = PolicyCostEstimator()
+
+
 def effective_policy_user(user: User) -> User:
     """Follow MIRROR actors up to the identity whose policy result they mirror."""
     seen = {user.pk}
@@ -54,21 +86,6 @@ def effective_policy_user(user: User) -> User:
     return user
 
 
-class PolicyProcessInfo:
-    """Dataclass to hold all information and communication channels to a process"""
-
-    process: PolicyProcess
-    connection: Connection
-    result: PolicyResult | None
-    binding: PolicyBinding
-
-    def __init__(self, process: PolicyProcess, connection: Connection, binding: PolicyBinding):
-        self.process = process
-        self.connection = connection
-        self.binding = binding
-        self.result = None
-
-
 class _PolicyEngineBase:
     """State and evaluation helpers shared between `PolicyEngine` (single user) and
     `FilterPolicyEngine` (queryset of users).
@@ -83,6 +100,8 @@ class _PolicyEngineBase:
     # Allow objects with no policies attached to pass
     empty_result: bool
     use_cache: bool
+    # Stop evaluating as soon as the overall result is decided
+    short_circuit: bool
 
     def _init_defaults(self, pbm: PolicyBindingModel):
         self.logger = get_logger().bind()
@@ -91,15 +110,11 @@ class _PolicyEngineBase:
         # objects with no policies attached will pass.
         self.empty_result = True
         self.use_cache = True
+        self.short_circuit = CONFIG.get_bool("policies.short_circuit", False)
 
     @staticmethod
-    def _bindings_for(pbm: PolicyBindingModel) -> QuerySet[PolicyBinding]:
-        # purposefully not selecting policy as a related field due to inheritance
-        return (
-            PolicyBinding.objects.filter(target=pbm, enabled=True)
-            .select_related("user", "group")
-            .order_by("order")
-        )
+    def _bindings_for(pbm: PolicyBindingModel) -> list[PolicyBinding]:
+        return INDEX.bindings_for(pbm)
 
     @staticmethod
     def _check_policy_type(binding: PolicyBinding):
@@ -152,7 +167,8 @@ class _PolicyEngineBase:
         """Evaluate `policy_bindings` (bindings with a real Policy attached) against a
         single PolicyRequest."""
         results: list[PolicyResult | None] = [None] * len(policy_bindings)
-        pending: list[tuple[int, PolicyProcessInfo]] = []
+        pending: list[tuple[int, PolicyTask]] = []
+        executor = get_policy_executor()
         for idx, binding in enumerate(policy_bindings):
             self._check_policy_type(binding)
             cached = self._cached_result(binding, request, prefetched_cache)
@@ -160,32 +176,71 @@ class _PolicyEngineBase:
                 results[idx] = cached
                 continue
             self.logger.debug("P_ENG: Evaluating policy", binding=binding, request=request)
-            our_end, task_end = Pipe(False)
-            task = PolicyProcess(binding, request, task_end)
-            task.daemon = False
-            self.logger.debug("P_ENG: Starting Process", binding=binding, request=request)
-            if not CURRENT_PROCESS._config.get("daemon"):
-                task.run()
-            else:
-                task.start()
-            pending.append(
-                (idx, PolicyProcessInfo(process=task, connection=our_end, binding=binding))
-            )
-        for idx, proc_info in pending:
-            if proc_info.process.is_alive():
-                proc_info.process.join(proc_info.binding.timeout)
-            result = proc_info.connection.recv()
-            if result is not None and result._exec_time:
-                HIST_POLICIES_EXECUTION_TIME.labels(
-                    binding_order=proc_info.binding.order,
-                    binding_target_type=proc_info.binding.target_type,
-                    binding_target_name=proc_info.binding.target_name,
-                    object_type=class_to_path(request.obj.__class__) if request.obj else "",
-                    mode="execute_process",
-                ).observe(result._exec_time)
-            results[idx] = result
+            pending.append((idx, executor.submit(binding, request)))
+        for idx, task in pending:
+            results[idx] = self._task_result(task, request)
         return results
 
+    @staticmethod
+    def _task_result(task: PolicyTask, request: PolicyRequest) -> PolicyResult | None:
+        """Wait for the result of `task` and record its execution time"""
+        result = task.result()
+        if result is not None and result._exec_time:
+            HIST_POLICIES_EXECUTION_TIME.labels(
+                binding_order=task.binding.order,
+                binding_target_type=task.binding.target_type,
+                binding_target_name=task.binding.target_name,
+                object_type=class_to_path(request.obj.__class__) if request.obj else "",
+                mode=f"execute_{task.backend}",
+            ).observe(result._exec_time)
+            POLICY_COSTS.observe(task.binding, result._exec_time)
+        return result
+
+    def _evaluate_until_decided(
+        self,
+        policy_bindings: list[PolicyBinding],
+        request: PolicyRequest,
+        prefetched_cache: dict[str, PolicyResult] | None = None,
+    ) -> list[PolicyResult]:
+        """Evaluate `policy_bindings` one at a time, cheapest first, until a result decides
+        the outcome: a passing result with MODE_ANY, or a failing result with MODE_ALL.
+
+        Cached results are considered first as they're free. Only the results that were
+        evaluated are returned, in binding order, so messages keep their order."""
+        deciding = self.mode == PolicyEngineMode.MODE_ANY
+        results: dict[int, PolicyResult] = {}
+        pending: list[tuple[int, PolicyBinding]] = []
+        for idx, binding in enumerate(policy_bindings):
+            self._check_policy_type(binding)
+            cached = self._cached_result(binding, request, prefetched_cache)
+            if cached is None:
+                pending.append((idx, binding))
+                continue
+            results[idx] = cached
+            if cached.passing == deciding:
+                return [results[idx] for idx in sorted(results)]
+        # Stable sort, so bindings without a known cost stay in order
+        pending.sort(key=lambda item: POLICY_COSTS.estimate(item[1]))
+        executor = get_policy_executor()
+        for evaluated, (idx, binding) in enumerate(pending, start=1):
+            self.logger.debug("P_ENG: Evaluating policy", binding=binding, request=request)
+            result = self._task_result(executor.submit(binding, request), request)
+            results[idx] = result
+            if result is not None and result.passing == deciding:
+                self.logger.debug(
+                    "P_ENG: Result decided",
+                    binding=binding,
+                    skipped=len(pending) - evaluated,
+                )
+                break
+        return [results[idx] for idx in sorted(results)]
+
+    def _is_decided(self, result: PolicyResult | None) -> bool:
+        """Check if `result` alone decides the overall result"""
+        if result is None:
+            return False
+        return result.passing == (self.mode == PolicyEngineMode.MODE_ANY)
+
     @staticmethod
     def _combine_results(
         mode: PolicyEngineMode, empty_result: bool, all_results: list[PolicyResult]
@@ -224,40 +279,37 @@ class PolicyEngine[T: PolicyBindingModel](_PolicyEngineBase):
         self.__dynamic_results: list[PolicyResult] = []
         self.__static_result: PolicyResult | None = None
 
-    def bindings(self) -> QuerySet[PolicyBinding] | Iterable[PolicyBinding]:
-        """Make sure all Policies are their respective classes"""
+    def bindings(self) -> list[PolicyBinding] | Iterable[PolicyBinding]:
+        """Get enabled bindings, with all Policies being their respective classes"""
         return self._bindings_for(self.__pbm)
 
-    def compute_static_bindings(self, bindings: QuerySet[PolicyBinding]):
+    def compute_static_bindings(self, bindings: list[PolicyBinding]):
         """Check static bindings if possible"""
-        aggrs = {
-            "total": Count(
-                "pk", filter=Q(Q(group__isnull=False) | Q(user__isnull=False), policy=None)
-            ),
-        }
-        if self.request.user.pk:
-            all_groups = self.request.user.all_groups()
-            aggrs["passing"] = Count(
-                "pk",
-                filter=Q(
-                    Q(
-                        Q(user=self.request.user) | Q(group__in=all_groups),
-                        negate=False,
-                    )
-                    | Q(
-                        Q(~Q(user=self.request.user), user__isnull=False)
-                        | Q(~Q(group__in=all_groups), group__isnull=False),
-                        negate=True,
-                    ),
-                    Q(expiring=False) | Q(expiring=True, expires__gte=now()),
-                    enabled=True,
-                ),
-            )
-        matched_bindings = bindings.aggregate(**aggrs)
-        passing = False
-        if matched_bindings["total"] == 0 and matched_bindings.get("passing", 0) == 0:
+        static_bindings = [
+            binding
+            for binding in bindings
+            if binding.policy_id is None and (binding.group_id or binding.user_id)
+        ]
+        if not static_bindings:
             # If we didn't find any static bindings, do nothing
             return
+        matched_bindings = {"total": len(static_bindings)}
+        if self.request.user.pk:
+            user_group_pks = set()
+            if any(binding.group_id for binding in static_bindings):
+                user_group_pks = self.request.user.membership.group_pks
+            current = now()
+            matched_bindings["passing"] = 0
+            for binding in static_bindings:
+                if binding.expiring and binding.expires < current:
+                    continue
+                if binding.user_id:
+                    match = binding.user_id == self.request.user.pk
+                else:
+                    match = binding.group_id in user_group_pks
+                if match != binding.negate:
+                    matched_bindings["passing"] += 1
+        passing = False
         self.logger.debug("P_ENG: Found static bindings", **matched_bindings)
         if self.mode == PolicyEngineMode.MODE_ANY:
             if matched_bindings.get("passing", 0) > 0:
@@ -288,12 +340,17 @@ class PolicyEngine[T: PolicyBindingModel](_PolicyEngineBase):
             span.set_data("request", self.request)
             bindings = self.bindings()
             policy_bindings = bindings
-            if isinstance(bindings, QuerySet):
+            if isinstance(bindings, list):
                 self.compute_static_bindings(bindings)
-                policy_bindings = [x for x in bindings if x.policy]
-            self.__dynamic_results = self._evaluate_dynamic_bindings(
-                list(policy_bindings), self.request
-            )
+                policy_bindings = [x for x in bindings if x.policy_id is not None]
+            if not self.short_circuit or self.request.debug:
+                self.__dynamic_results = self._evaluate_dynamic_bindings(
+                    list(policy_bindings), self.request
+                )
+            elif not self._is_decided(self.__static_result):
+                self.__dynamic_results = self._evaluate_until_decided(
+                    list(policy_bindings), self.request
+                )
             return self
 
     @property
@@ -322,7 +379,7 @@ class FilterPolicyEngine[T: PolicyBindingModel](_PolicyEngineBase):
         self.__http_request = request
         self.__result: QuerySet[User] | None = None
 
-    def bindings(self) -> QuerySet[PolicyBinding]:
+    def bindings(self) -> list[PolicyBinding]:
         """Get enabled bindings for the bound PBM"""
         return self._bindings_for(self.__pbm)
 
@@ -573,12 +630,8 @@ class ListPolicyEngine[T: PolicyBindingModel](_PolicyEngineBase):
                 return self
 
             # The user is fixed here (unlike FilterPolicyEngine, which varies the
-            # user), so static bindings are resolved with one all_groups() lookup
-            user_group_pks = (
-                set(self.__user.all_groups().values_list("pk", flat=True))
-                if self.__user.pk
-                else set()
-            )
+            # user), so static bindings are resolved with the user's group membership
+            user_group_pks = self.__user.membership.group_pks if self.__user.pk else frozenset()
 
             static_results: dict = {}
             dynamic_by_target: dict = {}
@@ -619,17 +672,13 @@ class ListPolicyEngine[T: PolicyBindingModel](_PolicyEngineBase):
             if self.__http_request:
                 request.set_http_request(self.__http_request)
             prefetched_cache = self._prefetch_cache(request, all_dynamic_bindings)
+            dynamic_results = self._evaluate_batch(
+                dynamic_by_target, obj_by_pk, request, prefetched_cache
+            )
 
             for pk in bindings_by_target:
                 mode = obj_by_pk[pk].policy_engine_mode
-                all_results = []
-                if pk in dynamic_by_target:
-                    request.obj = obj_by_pk[pk]
-                    all_results.extend(
-                        self._evaluate_dynamic_bindings(
-                            dynamic_by_target[pk], copy(request), prefetched_cache
-                        )
-                    )
+                all_results = list(dynamic_results.get(pk, []))
                 if pk in static_results:
                     all_results.append(static_results[pk])
                 if self._combine_results(mode, self.empty_result, all_results).passing:
@@ -638,6 +687,59 @@ class ListPolicyEngine[T: PolicyBindingModel](_PolicyEngineBase):
             self.__result = self.__objs.filter(pk__in=passing_pks)
             return self
 
+    @staticmethod
+    def _shared_key(binding: PolicyBinding) -> tuple | None:
+        """Key under which the result of `binding` can be shared with bindings of the same
+        policy attached to other objects, if any"""
+        policy = binding.policy
+        # Executions are logged per binding, so those can't be shared
+        if policy.object_dependent or policy.execution_logging:
+            return None
+        return (binding.policy_id, binding.negate, binding.timeout, binding.failure_result)
+
+    def _evaluate_batch(
+        self,
+        dynamic_by_target: dict[Any, list[PolicyBinding]],
+        obj_by_pk: dict[Any, T],
+        request: PolicyRequest,
+        prefetched_cache: dict[str, PolicyResult],
+    ) -> dict[Any, list[PolicyResult]]:
+        """Evaluate the dynamic bindings of every object in one pass.
+
+        All uncached bindings are submitted before waiting on any of them, and bindings of
+        the same policy on different objects are evaluated once when the policy's result
+        can't depend on the object."""
+        results: dict[Any, list[PolicyResult | None]] = {
+            pk: [None] * len(bindings) for pk, bindings in dynamic_by_target.items()
+        }
+        shared: dict[tuple, PolicyTask] = {}
+        pending: list[tuple[Any, int, PolicyTask, PolicyRequest]] = []
+        executor = get_policy_executor()
+        for pk, bindings in dynamic_by_target.items():
+            target_request = copy(request)
+            target_request.obj = obj_by_pk[pk]
+            for idx, binding in enumerate(bindings):
+                cached = self._cached_result(binding, target_request, prefetched_cache)
+                if cached is not None:
+                    results[pk][idx] = cached
+                    continue
+                key = self._shared_key(binding)
+                task = shared.get(key) if key else None
+                if task is None:
+                    self.logger.debug(
+                        "P_ENG: Evaluating policy", binding=binding, request=target_request
+                    )
+                    task = executor.submit(binding, target_request)
+                    if key:
+                        shared[key] = task
+                pending.append((pk, idx, task, target_request))
+        finished: dict[int, PolicyResult | None] = {}
+        for pk, idx, task, target_request in pending:
+            if id(task) not in finished:
+                finished[id(task)] = self._task_result(task, target_request)
+            results[pk][idx] = finished[id(task)]
+        return results
+
     def _static_binding_result(self, binding: PolicyBinding, user_group_pks: set) -> PolicyResult:
         """Evaluate a single static (group/user) binding against the fixed user"""
         if binding.user_id:
@@ -19,6 +19,8 @@ LOGGER = get_logger()
 class EventMatcherPolicy(Policy):
     """Passes when Event matches selected criteria."""
 
+    object_dependent = False
+
     query = models.TextField(
         null=True,
         default=None,
@@ -0,0 +1,251 @@
+"""Policy execution backends
+
+The policy engine hands every non-cached binding to an executor, which decides where the
+binding is evaluated. Two backends are available, selected via `policies.execution_backend`:
+
+- `process`: Evaluate each binding in a forked `PolicyProcess` (or inline when the current
+  process can't fork, for example in gunicorn workers). This is the historic behaviour.
+- `thread`: Evaluate bindings on a long-lived, per-process thread pool. Workers are reused
+  across requests, so there is no fork or pipe setup cost per binding, and the binding's
+  timeout is enforced from when a worker starts evaluating it. Threads can't be interrupted,
+  so a worker still evaluating a binding which timed out is considered stuck, and replaced by
+  a new worker. When no worker is free, the binding is evaluated by the `process` backend.
+"""
+
+from contextvars import Context, copy_context
+from functools import cache
+from multiprocessing import Pipe, current_process
+from multiprocessing.connection import Connection
+from queue import SimpleQueue
+from threading import Event, Lock, Thread
+from time import perf_counter
+
+from django.db import close_old_connections, connection
+from structlog.stdlib import get_logger
+
+from authentik.lib.config import CONFIG
+from authentik.policies.apps import (
+    COUNTER_POLICIES_EXECUTOR_TIMEOUTS,
+    GAUGE_POLICIES_EXECUTOR_THREADS,
+    HIST_POLICIES_EXECUTOR_WAIT_TIME,
+)
+from authentik.policies.models import PolicyBinding
+from authentik.policies.process import PolicyProcess
+from authentik.policies.types import PolicyRequest, PolicyResult
+
+LOGGER = get_logger()
+CURRENT_PROCESS = current_process()
+
+BACKEND_PROCESS = "process"
+BACKEND_THREAD = "thread"
+
+
+class PolicyTask:
+    """Handle to a single binding being evaluated by an executor"""
+
+    backend: str
+    binding: PolicyBinding
+
+    def __init__(self, backend: str, binding: PolicyBinding):
+        self.backend = backend
+        self.binding = binding
+        self._start = perf_counter()
+
+    def _wait(self) -> PolicyResult | None:
+        raise NotImplementedError
+
+    def result(self) -> PolicyResult | None:
+        """Wait for the result of this binding"""
+        try:
+            return self._wait()
+        finally:
+            HIST_POLICIES_EXECUTOR_WAIT_TIME.labels(backend=self.backend).observe(
+                perf_counter() - self._start
+            )
+
+
+class ProcessPolicyTask(PolicyTask):
+    """Binding evaluated in a `PolicyProcess`, with the result sent back through a pipe"""
+
+    def __init__(self, binding: PolicyBinding, process: PolicyProcess, connection: Connection):
+        super().__init__(BACKEND_PROCESS, binding)
+        self.process = process
+        self.connection = connection
+
+    def _wait(self) -> PolicyResult | None:
+        if self.process.is_alive():
+            self.process.join(self.binding.timeout)
+        return self.connection.recv()
+
+
+class ThreadPolicyTask(PolicyTask):
+    """Binding evaluated on the shared thread pool"""
+
+    def __init__(
+        self,
+        executor: ThreadPolicyExecutor,
+        binding: PolicyBinding,
+        process: PolicyProcess,
+        context: Context,
+    ):
+        super().__init__(BACKEND_THREAD, binding)
+        self.executor = executor
+        self.process = process
+        self.context = context
+        self.tenant = getattr(connection, "tenant", None)
+        self.done = False
+        self.timed_out = False
+        self._started = Event()
+        self._started_at = 0.0
+        self._finished = Event()
+        self._result: PolicyResult | None = None
+
+    def run(self):
+        """Evaluate the binding, called on a worker thread"""
+        self._started_at = perf_counter()
+        self._started.set()
+        # Propagate context variables (audit user overrides, sentry scope, etc) to the worker
+        self._result = self.context.run(_evaluate_in_thread, self.process, self.tenant)
+        self._finished.set()
+
+    def _wait(self) -> PolicyResult | None:
+        # The timeout only starts once a worker picked up the binding
+        self._started.wait()
+        remaining = self.binding.timeout - (perf_counter() - self._started_at)
+        if self._finished.wait(max(remaining, 0)) or not self.executor.time_out(self):
+            return self._result
+        # The worker thread can't be interrupted, however its result will be discarded
+        COUNTER_POLICIES_EXECUTOR_TIMEOUTS.labels(backend=self.backend).inc()
+        LOGGER.warning(
+            "P_ENG: Policy execution timed out",
+            binding=self.binding,
+            timeout=self.binding.timeout,
+        )
+        return PolicyResult(self.binding.failure_result, "Policy execution timed out")
+
+
+class PolicyExecutor:
+    """Base executor, submits bindings for evaluation"""
+
+    backend: str
+
+    def submit(self, binding: PolicyBinding, request: PolicyRequest) -> PolicyTask:
+        """Start evaluating `binding` against `request`"""
+        raise NotImplementedError
+
+
+class ProcessPolicyExecutor(PolicyExecutor):
+    """Evaluate each binding in its own forked process"""
+
+    backend = BACKEND_PROCESS
+
+    def submit(self, binding: PolicyBinding, request: PolicyRequest) -> PolicyTask:
+        our_end, task_end = Pipe(False)
+        task = PolicyProcess(binding, request, task_end)
+        task.daemon = False
+        LOGGER.debug("P_ENG: Starting Process", binding=binding, request=request)
+        if not CURRENT_PROCESS._config.get("daemon"):
+            task.run()
+        else:
+            task.start()
+        return ProcessPolicyTask(binding, task, our_end)
+
+
+def _evaluate_in_thread(task: PolicyProcess, tenant) -> PolicyResult:
+    """Run a policy on a pool thread. Pool threads have their own database connection, so
+    the tenant of the submitting thread is activated first, and the connection is released
+    afterwards according to the configured connection max age."""
+    if tenant is not None:
+        connection.set_tenant(tenant)
+    try:
+        return task.evaluate()
+    finally:
+        close_old_connections()
+
+
+class ThreadPolicyExecutor(PolicyExecutor):
+    """Evaluate bindings on a long-lived thread pool shared by all requests of this process.
+
+    Up to `max_workers` threads evaluate bindings, not counting stuck threads, which are still
+    evaluating a binding that timed out. Bindings are only handed to a free thread, so they
+    never wait in a queue; when there is none, they are evaluated by the process backend."""
+
+    backend = BACKEND_THREAD
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._lock = Lock()
+        self._queue: SimpleQueue[ThreadPolicyTask] = SimpleQueue()
+        self._threads = 0
+        self._idle = 0
+        self._stuck = 0
+        self._fallback = ProcessPolicyExecutor()
+
+    def _update_metrics(self):
+        GAUGE_POLICIES_EXECUTOR_THREADS.labels(state="busy").set(self._threads - self._idle)
+        GAUGE_POLICIES_EXECUTOR_THREADS.labels(state="stuck").set(self._stuck)
+
+    def _work(self):
+        while True:
+            task = self._queue.get()
+            task.run()
+            with self._lock:
+                task.done = True
+                if task.timed_out:
+                    self._stuck -= 1
+                # Stop threads which were started to replace this one while it was stuck
+                stop = self._threads - self._stuck > self.max_workers
+                if stop:
+                    self._threads -= 1
+                else:
+                    self._idle += 1
+                self._update_metrics()
+            if stop:
+                return
+
+    def time_out(self, task: ThreadPolicyTask) -> bool:
+        """Mark the thread evaluating `task` as stuck, unless it finished in the meantime"""
+        with self._lock:
+            if task.done:
+                return False
+            task.timed_out = True
+            self._stuck += 1
+            self._update_metrics()
+            return True
+
+    def submit(self, binding: PolicyBinding, request: PolicyRequest) -> PolicyTask:
+        task = ThreadPolicyTask(
+            self, binding, PolicyProcess(binding, request, None), copy_context()
+        )
+        with self._lock:
+            available = True
+            if self._idle > 0:
+                self._idle -= 1
+            elif self._threads - self._stuck < self.max_workers:
+                self._threads += 1
+                Thread(target=self._work, name="authentik-policy", daemon=True).start()
+            else:
+                available = False
+            self._update_metrics()
+        if not available:
+            LOGGER.debug("P_ENG: No policy thread available, using process backend")
+            return self._fallback.submit(binding, request)
+        self._queue.put(task)
+        return task
+
+
+@cache
+def _executor_for(backend: str, pool_size: int) -> PolicyExecutor:
+    if backend == BACKEND_THREAD:
+        return ThreadPolicyExecutor(pool_size)
+    if backend != BACKEND_PROCESS:
+        LOGGER.warning("Unknown policy execution backend, falling back", backend=backend)
+    return ProcessPolicyExecutor()
+
+
+def get_policy_executor() -> PolicyExecutor:
+    """Get the executor configured for this process, created on first use"""
+    return _executor_for(
+        CONFIG.get("policies.execution_backend", BACKEND_PROCESS),
+        CONFIG.get_int("policies.thread_pool_size", 8),
+    )
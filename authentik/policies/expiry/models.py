@@ -18,6 +18,8 @@ class PasswordExpiryPolicy(Policy):
     """If password change date is more than x days in the past, invalidate the user's password
     and show a notice"""
 
+    object_dependent = False
+
     deny_only = models.BooleanField(default=False)
     days = models.IntegerField()
 
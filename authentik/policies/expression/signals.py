@@ -0,0 +1,13 @@
+"""authentik expression policy signals"""
+
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from authentik.lib.expression.evaluator import evict_compiled
+from authentik.policies.expression.models import ExpressionPolicy
+
+
+@receiver(post_save, sender=ExpressionPolicy)
+def expression_policy_post_save(sender: type[ExpressionPolicy], instance: ExpressionPolicy, **_):
+    """Drop compiled bytecode of an expression policy when it is changed"""
+    evict_compiled(instance.name)
@@ -24,6 +24,8 @@ class GeoIPPolicy(Policy):
     """Ensure the user satisfies requirements of geography or network topology, based on IP
     address."""
 
+    object_dependent = False
+
     asns = ArrayField(models.IntegerField(), blank=True, default=list)
     countries = CountryField(multiple=True, blank=True)
 
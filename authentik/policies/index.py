@@ -0,0 +1,83 @@
+"""Per-process index of policy bindings"""
+
+from threading import Lock
+from uuid import uuid4
+
+from cachetools import LRUCache
+from django.core.cache import cache
+from django.db import connection
+from structlog.stdlib import get_logger
+
+from authentik.policies.models import Policy, PolicyBinding, PolicyBindingModel
+
+LOGGER = get_logger()
+# Not below the policy result prefix, as those keys are counted and cleared by prefix
+INDEX_VERSION_KEY = "goauthentik.io/policies_index/version"
+INDEX_SIZE = 4096
+
+
+class PolicyBindingIndex:
+    """Map PolicyBindingModels to their enabled bindings, ordered and with each binding's
+    policy resolved to its subclass.
+
+    The index is kept in memory for each process, and is shared between threads and
+    requests. Any change to a binding or policy replaces the version stored in the cache,
+    which drops all entries built for a previous version in every process. Bindings returned
+    from the index must not be modified."""
+
+    def __init__(self, size: int = INDEX_SIZE):
+        self._entries: LRUCache[tuple[str, str], tuple[str, list[PolicyBinding]]] = LRUCache(
+            maxsize=size
+        )
+        self._lock = Lock()
+
+    @staticmethod
+    def version() -> str:
+        """Get the current index version, shared by all processes"""
+        version = cache.get(INDEX_VERSION_KEY)
+        if version is None:
+            cache.add(INDEX_VERSION_KEY, uuid4().hex, None)
+            version = cache.get(INDEX_VERSION_KEY)
+        return version
+
+    @staticmethod
+    def invalidate():
+        """Invalidate the index of all processes"""
+        cache.set(INDEX_VERSION_KEY, uuid4().hex, None)
+
+    @staticmethod
+    def _load(pbm: PolicyBindingModel) -> list[PolicyBinding]:
+        bindings = list(
+            PolicyBinding.objects.filter(target=pbm, enabled=True)
+            .select_related("user", "group")
+            .order_by("order")
+        )
+        # Single query to lookup all policies needed in their respective type,
+        # instead of dynamically fetching the concrete type for every binding
+        policy_ids = {binding.policy_id for binding in bindings if binding.policy_id is not None}
+        if policy_ids:
+            policies = {
+                policy.pk: policy
+                for policy in Policy.objects.filter(pk__in=policy_ids).select_subclasses()
+            }
+            for binding in bindings:
+                if binding.policy_id is not None:
+                    binding.policy = policies[binding.policy_id]
+        return bindings
+
+    def bindings_for(self, pbm: PolicyBindingModel) -> list[PolicyBinding]:
+        """Get enabled bindings of `pbm`, ordered by their order"""
+        key = (connection.schema_name, pbm.pbm_uuid.hex)
+        version = self.version()
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        bindings = self._load(pbm)
+        LOGGER.debug("P_ENG: Indexed bindings", pbm=pbm, bindings=len(bindings))
+        with self._lock:
+            self._entries[key] = (version, bindings)
+        return bindings
+
+
+INDEX = PolicyBindingIndex()
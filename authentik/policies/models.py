@@ -192,6 +192,11 @@ class Policy(SerializerModel, CreatedUpdatedModel):
 
     objects = InheritanceAutoManager()
 
+    # Whether the result can depend on the object the policy is bound to (`PolicyRequest.obj`).
+    # Results of policies that don't are shared between bindings to different objects when
+    # evaluating a list of objects at once.
+    object_dependent = True
+
     @property
     def component(self) -> str:
         """Return component used to edit this object"""
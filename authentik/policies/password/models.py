@@ -23,6 +23,8 @@ RE_DIGITS = re.compile("[0-9]")
 class PasswordPolicy(Policy):
     """Policy to make sure passwords have certain properties"""
 
+    object_dependent = False
+
     password_field = models.TextField(
         default="password",
         help_text=_("Field key to check, field keys defined in Prompt stages are available."),
@@ -130,9 +130,8 @@ class PolicyProcess(PROCESS_CLASS):
             span.set_data("request", self.request)
             return self.execute()
 
-    def run(self):  # pragma: no cover
-        """Task wrapper to run policy checking"""
-        result = None
+    def evaluate(self) -> PolicyResult:
+        """Run policy checking and record the execution time, never raises"""
         try:
             start = perf_counter()
             result = self.profiling_wrapper()
@@ -141,5 +140,12 @@ class PolicyProcess(PROCESS_CLASS):
         except Exception as exc:  # noqa
             LOGGER.warning("Policy failed to run", exc=exc)
             result = PolicyResult(False, str(exc))
+        return result
+
+    def run(self):  # pragma: no cover
+        """Task wrapper to run policy checking"""
+        result = None
+        try:
+            result = self.evaluate()
         finally:
             self.connection.send(result)
@@ -28,6 +28,8 @@ def reputation_expiry():
 class ReputationPolicy(Policy):
     """Return true if request IP/target username's score is below a certain threshold"""
 
+    object_dependent = False
+
     check_ip = models.BooleanField(default=True)
     check_username = models.BooleanField(default=True)
     threshold = models.IntegerField(default=-5)
@@ -2,13 +2,14 @@
 
 from django.core.cache import cache
 from django.db import connection
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from structlog.stdlib import get_logger
 
 from authentik.core.api.applications import user_app_cache_key
 from authentik.core.models import Group, User
 from authentik.policies.apps import GAUGE_POLICIES_CACHED
+from authentik.policies.index import PolicyBindingIndex
 from authentik.policies.models import Policy, PolicyBinding, PolicyBindingModel
 from authentik.policies.types import CACHE_PREFIX
 from authentik.root.monitoring import monitoring_set
@@ -52,3 +53,13 @@ def invalidate_policy_cache(sender, instance, update_fields=None, **_):
     # Also delete user application cache
     keys = cache.keys(user_app_cache_key("*")) or []
     cache.delete_many(keys)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_policy_binding_index(sender, instance, **_):
+    """Invalidate the binding index when a binding or policy is changed. Policy subclasses are
+    matched here as well, as the index holds the resolved subclass instances."""
+    if not isinstance(instance, PolicyBinding | Policy):
+        return
+    PolicyBindingIndex.invalidate()
@@ -10,6 +10,7 @@ from django.utils.timezone import now
 
 from authentik.core.models import Group
 from authentik.core.tests.utils import create_test_user
+from authentik.lib.config import CONFIG
 from authentik.lib.generators import generate_id
 from authentik.policies.dummy.models import DummyPolicy
 from authentik.policies.engine import PolicyEngine
@@ -109,6 +110,63 @@ class TestPolicyEngine(TestCase):
         self.assertEqual(result.passing, True)
         self.assertEqual(result.messages, ())
 
+    @CONFIG.patch("policies.short_circuit", True)
+    def test_engine_short_circuit_any(self):
+        """Ensure evaluation stops after the first passing binding with OR mode"""
+        pbm = PolicyBindingModel.objects.create(policy_engine_mode=PolicyEngineMode.MODE_ANY)
+        PolicyBinding.objects.create(target=pbm, policy=self.policy_true, order=0)
+        PolicyBinding.objects.create(target=pbm, policy=self.policy_false, order=1)
+        engine = PolicyEngine(pbm, self.user)
+        result = engine.build().result
+        self.assertEqual(result.passing, True)
+        self.assertEqual(result.messages, ("dummy",))
+        self.assertEqual(len(result.source_results), 1)
+
+    @CONFIG.patch("policies.short_circuit", True)
+    def test_engine_short_circuit_all(self):
+        """Ensure evaluation stops after the first failing binding with AND mode"""
+        pbm = PolicyBindingModel.objects.create(policy_engine_mode=PolicyEngineMode.MODE_ALL)
+        PolicyBinding.objects.create(target=pbm, policy=self.policy_false, order=0)
+        PolicyBinding.objects.create(target=pbm, policy=self.policy_true, order=1)
+        engine = PolicyEngine(pbm, self.user)
+        result = engine.build().result
+        self.assertEqual(result.passing, False)
+        self.assertEqual(len(result.source_results), 1)
+
+    @CONFIG.patch("policies.short_circuit", True)
+    def test_engine_short_circuit_undecided(self):
+        """Ensure all bindings are evaluated when no result decides early"""
+        pbm = PolicyBindingModel.objects.create(policy_engine_mode=PolicyEngineMode.MODE_ALL)
+        PolicyBinding.objects.create(target=pbm, policy=self.policy_true, order=0)
+        PolicyBinding.objects.create(target=pbm, policy=self.policy_true, order=1)
+        engine = PolicyEngine(pbm, self.user)
+        result = engine.build().result
+        self.assertEqual(result.passing, True)
+        self.assertEqual(result.messages, ("dummy", "dummy"))
+
+    @CONFIG.patch("policies.short_circuit", True)
+    def test_engine_short_circuit_static(self):
+        """Ensure policies aren't evaluated when a static binding decides the result"""
+        pbm = PolicyBindingModel.objects.create(policy_engine_mode=PolicyEngineMode.MODE_ANY)
+        PolicyBinding.objects.create(target=pbm, group=self.group_member, order=0)
+        PolicyBinding.objects.create(target=pbm, policy=self.policy_false, order=1)
+        engine = PolicyEngine(pbm, self.user)
+        result = engine.build().result
+        self.assertEqual(result.passing, True)
+        self.assertEqual(result.messages, ())
+
+    @CONFIG.patch("policies.short_circuit", True)
+    def test_engine_short_circuit_debug(self):
+        """Ensure all bindings are evaluated for policy tests"""
+        pbm = PolicyBindingModel.objects.create(policy_engine_mode=PolicyEngineMode.MODE_ANY)
+        PolicyBinding.objects.create(target=pbm, policy=self.policy_true, order=0)
+        PolicyBinding.objects.create(target=pbm, policy=self.policy_false, order=1)
+        engine = PolicyEngine(pbm, self.user)
+        engine.request.debug = True
+        result = engine.build().result
+        self.assertEqual(result.passing, True)
+        self.assertEqual(len(result.source_results), 2)
+
     def test_engine_negate(self):
         """Test negate flag"""
         pbm = PolicyBindingModel.objects.create()
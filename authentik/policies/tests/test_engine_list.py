@@ -14,8 +14,10 @@ from authentik.core.tests.utils import create_test_user
 from authentik.lib.generators import generate_id
 from authentik.policies.dummy.models import DummyPolicy
 from authentik.policies.engine import ListPolicyEngine, PolicyEngine
+from authentik.policies.expression.models import ExpressionPolicy
 from authentik.policies.models import PolicyBinding, PolicyBindingModel, PolicyEngineMode
 from authentik.policies.tests.test_process import clear_policy_cache
+from authentik.policies.types import PolicyResult
 
 
 class TestListPolicyEngine(TestCase):
@@ -117,6 +119,33 @@ class TestListPolicyEngine(TestCase):
             {self.obj_a.pk, self.obj_c.pk},
         )
 
+    def test_list_engine_shared_policy_evaluated_once(self):
+        """A policy whose result can't depend on the object is evaluated once, even
+        when it's bound to every object."""
+        for obj in [self.obj_a, self.obj_b, self.obj_c]:
+            PolicyBinding.objects.create(target=obj, policy=self.policy_true, order=0)
+        with patch(
+            "authentik.policies.dummy.models.DummyPolicy.passes",
+            return_value=PolicyResult(True),
+        ) as mock_passes:
+            engine = ListPolicyEngine(self.objs, self.user)
+            result = set(engine.build().result.values_list("pk", flat=True))
+        self.assertEqual(result, {self.obj_a.pk, self.obj_b.pk, self.obj_c.pk})
+        self.assertEqual(mock_passes.call_count, 1)
+
+    def test_list_engine_object_dependent_policy_not_shared(self):
+        """A policy which can read the object is evaluated for every object"""
+        policy = ExpressionPolicy.objects.create(
+            name=generate_id(), expression=f"return str(request.obj.pk) == '{self.obj_a.pk}'"
+        )
+        for obj in [self.obj_a, self.obj_b, self.obj_c]:
+            PolicyBinding.objects.create(target=obj, policy=policy, order=0)
+        engine = ListPolicyEngine(self.objs, self.user)
+        self.assertEqual(
+            set(engine.build().result.values_list("pk", flat=True)),
+            {self.obj_a.pk},
+        )
+
     def test_list_engine_mode_all_static_prefilter_skips_dynamic(self):
         """MODE_ALL: a failing static binding must skip dynamic evaluation for that
         object entirely."""
@@ -0,0 +1,120 @@
+"""policy executor tests"""
+
+from django.test import TestCase
+from prometheus_client import REGISTRY
+
+from authentik.core.tests.utils import create_test_user
+from authentik.lib.config import CONFIG
+from authentik.lib.generators import generate_id
+from authentik.policies.dummy.models import DummyPolicy
+from authentik.policies.engine import PolicyEngine
+from authentik.policies.executor import (
+    BACKEND_PROCESS,
+    BACKEND_THREAD,
+    ProcessPolicyExecutor,
+    ProcessPolicyTask,
+    ThreadPolicyExecutor,
+    ThreadPolicyTask,
+    get_policy_executor,
+)
+from authentik.policies.models import PolicyBinding, PolicyBindingModel
+from authentik.policies.tests.test_process import clear_policy_cache
+from authentik.policies.types import PolicyRequest
+
+
+class TestPolicyExecutor(TestCase):
+    """Policy executor tests"""
+
+    def setUp(self):
+        clear_policy_cache()
+        self.user = create_test_user()
+
+    def _request(self) -> PolicyRequest:
+        request = PolicyRequest(self.user)
+        # Don't cache results or create events, as those would happen on another connection
+        request.debug = True
+        return request
+
+    def test_default_backend(self):
+        """Test default backend"""
+        executor = get_policy_executor()
+        self.assertIsInstance(executor, ProcessPolicyExecutor)
+        self.assertEqual(executor.backend, BACKEND_PROCESS)
+
+    @CONFIG.patch("policies.execution_backend", BACKEND_THREAD)
+    def test_thread_backend_reused(self):
+        """Test thread backend is created once and reused"""
+        executor = get_policy_executor()
+        self.assertIsInstance(executor, ThreadPolicyExecutor)
+        self.assertIs(executor, get_policy_executor())
+
+    def test_process(self):
+        """Test process backend"""
+        policy = DummyPolicy.objects.create(name=generate_id(), result=True, wait_min=0, wait_max=1)
+        binding = PolicyBinding(policy=policy, order=0)
+        result = ProcessPolicyExecutor().submit(binding, self._request()).result()
+        self.assertTrue(result.passing)
+        self.assertEqual(result.messages, ("dummy",))
+
+    def test_thread(self):
+        """Test thread backend"""
+        policy = DummyPolicy.objects.create(name=generate_id(), result=True, wait_min=0, wait_max=1)
+        binding = PolicyBinding(policy=policy, order=0)
+        result = ThreadPolicyExecutor(2).submit(binding, self._request()).result()
+        self.assertTrue(result.passing)
+        self.assertEqual(result.messages, ("dummy",))
+
+    def test_thread_negate(self):
+        """Test thread backend with negated binding"""
+        policy = DummyPolicy.objects.create(name=generate_id(), result=True, wait_min=0, wait_max=1)
+        binding = PolicyBinding(policy=policy, order=0, negate=True)
+        result = ThreadPolicyExecutor(2).submit(binding, self._request()).result()
+        self.assertFalse(result.passing)
+
+    def test_thread_timeout(self):
+        """Test thread backend enforces binding timeout"""
+        policy = DummyPolicy.objects.create(
+            name=generate_id(), result=False, wait_min=2, wait_max=3
+        )
+        binding = PolicyBinding(policy=policy, order=0, timeout=1, failure_result=True)
+        result = ThreadPolicyExecutor(2).submit(binding, self._request()).result()
+        self.assertTrue(result.passing)
+        self.assertEqual(result.messages, ("Policy execution timed out",))
+
+    def test_thread_stuck(self):
+        """Test stuck threads are replaced, and the process backend is used when no thread
+        is free"""
+        executor = ThreadPolicyExecutor(1)
+        slow = DummyPolicy.objects.create(name=generate_id(), result=True, wait_min=2, wait_max=3)
+        fast = DummyPolicy.objects.create(name=generate_id(), result=True, wait_min=0, wait_max=1)
+        stuck = executor.submit(PolicyBinding(policy=slow, order=0, timeout=1), self._request())
+        self.assertEqual(stuck.result().messages, ("Policy execution timed out",))
+        self.assertEqual(
+            REGISTRY.get_sample_value("authentik_policies_executor_threads", {"state": "stuck"}),
+            1,
+        )
+        # The stuck thread doesn't count against the pool size
+        busy = executor.submit(PolicyBinding(policy=slow, order=0, timeout=5), self._request())
+        self.assertIsInstance(busy, ThreadPolicyTask)
+        fallback = executor.submit(PolicyBinding(policy=fast, order=0), self._request())
+        self.assertIsInstance(fallback, ProcessPolicyTask)
+        self.assertTrue(fallback.result().passing)
+        self.assertTrue(busy.result().passing)
+
+    @CONFIG.patch("policies.execution_backend", BACKEND_THREAD)
+    def test_engine_thread(self):
+        """Test engine with the thread backend"""
+        pbm = PolicyBindingModel.objects.create()
+        PolicyBinding.objects.create(
+            target=pbm,
+            policy=DummyPolicy.objects.create(
+                name=generate_id(), result=True, wait_min=0, wait_max=1
+            ),
+            order=0,
+        )
+        engine = PolicyEngine(pbm, self.user)
+        engine.use_cache = False
+        engine.request.debug = True
+        result = engine.build().result
+        self.assertTrue(result.passing)
+        self.assertEqual(result.messages, ("dummy",))
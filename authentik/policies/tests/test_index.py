@@ -0,0 +1,65 @@
+"""policy binding index tests"""
+
+from django.db import connections
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from authentik.core.models import Group
+from authentik.core.tests.utils import create_test_user
+from authentik.lib.generators import generate_id
+from authentik.policies.dummy.models import DummyPolicy
+from authentik.policies.engine import PolicyEngine
+from authentik.policies.expression.models import ExpressionPolicy
+from authentik.policies.index import INDEX
+from authentik.policies.models import PolicyBinding, PolicyBindingModel
+from authentik.policies.tests.test_process import clear_policy_cache
+
+
+class TestPolicyBindingIndex(TestCase):
+    """Policy binding index tests"""
+
+    def setUp(self):
+        clear_policy_cache()
+        self.user = create_test_user()
+        self.pbm = PolicyBindingModel.objects.create()
+        self.policy = DummyPolicy.objects.create(
+            name=generate_id(), result=True, wait_min=0, wait_max=1
+        )
+        self.group = Group.objects.create(name=generate_id())
+        self.group.users.add(self.user)
+        PolicyBinding.objects.create(target=self.pbm, policy=self.policy, order=1)
+        PolicyBinding.objects.create(target=self.pbm, group=self.group, order=0)
+        PolicyBinding.objects.create(target=self.pbm, user=self.user, order=2, enabled=False)
+
+    def test_bindings(self):
+        """Test bindings are ordered, enabled and have their policy resolved"""
+        bindings = INDEX.bindings_for(self.pbm)
+        self.assertEqual([binding.order for binding in bindings], [0, 1])
+        self.assertIsInstance(bindings[1].policy, DummyPolicy)
+
+    def test_cached(self):
+        """Test no binding queries are made once indexed"""
+        INDEX.bindings_for(self.pbm)
+        with CaptureQueriesContext(connections["default"]) as ctx:
+            bindings = INDEX.bindings_for(self.pbm)
+            bindings[1].policy  # noqa: B018
+        self.assertFalse(
+            [query for query in ctx.captured_queries if "authentik_policies_" in query["sql"]]
+        )
+
+    def test_invalidate_binding(self):
+        """Test index is invalidated when a binding changes"""
+        self.assertEqual(len(INDEX.bindings_for(self.pbm)), 2)
+        PolicyBinding.objects.create(target=self.pbm, user=self.user, order=3)
+        self.assertEqual(len(INDEX.bindings_for(self.pbm)), 3)
+        PolicyBinding.objects.filter(target=self.pbm, order=3).delete()
+        self.assertEqual(len(INDEX.bindings_for(self.pbm)), 2)
+
+    def test_invalidate_policy(self):
+        """Test index is invalidated when a policy subclass changes"""
+        policy = ExpressionPolicy.objects.create(name=generate_id(), expression="return True")
+        PolicyBinding.objects.create(target=self.pbm, policy=policy, order=3)
+        self.assertTrue(PolicyEngine(self.pbm, self.user).build().passing)
+        policy.expression = "return False"
+        policy.save()
+        self.assertEqual(INDEX.bindings_for(self.pbm)[2].policy.expression, "return False")
@@ -83,6 +83,7 @@ class OAuth2ProviderSerializer(ProviderSerializer):
             "access_token_validity",
             "refresh_token_validity",
             "refresh_token_threshold",
+            "introspection_cache_validity",
             "include_claims_in_id_token",
             "signing_key",
             "encryption_key",
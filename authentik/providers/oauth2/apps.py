@@ -1,7 +1,15 @@
 """authentik oauth provider app config"""
 
+from prometheus_client import Counter
+
 from authentik.blueprints.apps import ManagedAppConfig
 
+COUNTER_OAUTH2_INTROSPECTION_CACHE = Counter(
+    "authentik_providers_oauth2_introspection_cache",
+    "Token introspection cache lookups, by whether a cached response was found",
+    ["provider", "result"],
+)
+
 
 class AuthentikProviderOAuth2Config(ManagedAppConfig):
     """authentik oauth provider app config"""
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.15 on 2026-10-18 12:00
+
+import authentik.lib.utils.time
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authentik_providers_oauth2", "0037_accesstoken_actor_authorizationcode_actor_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="oauth2provider",
+            name="introspection_cache_validity",
+            field=models.TextField(
+                default="seconds=0",
+                help_text="Cache token introspection responses for requests from this provider for up to this duration. Revoked tokens are removed from the cache immediately. When set to seconds=0, responses are not cached. (Format: hours=1;minutes=2;seconds=3).",
+                validators=[authentik.lib.utils.time.timedelta_string_validator],
+            ),
+        ),
+    ]
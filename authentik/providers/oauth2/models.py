@@ -4,7 +4,7 @@ import base64
 import binascii
 import json
 from dataclasses import asdict, dataclass
-from functools import cached_property
+from functools import cached_property, lru_cache
 from hashlib import sha256
 from typing import TYPE_CHECKING, Any
 from urllib.parse import urlparse, urlunparse
@@ -159,6 +159,12 @@ class ResponseTypes(models.TextChoices):
     CODE_ID_TOKEN_TOKEN = "code id_token token", _("code id_token token (Hybrid Flow)")
 
 
+@lru_cache(maxsize=128)
+def _load_jwk(certificate_data: str) -> JWK:
+    """Load the public key of a PEM certificate as JWK, parsed once per certificate"""
+    return JWK.from_pem(certificate_data.encode())
+
+
 class JWTAlgorithms(models.TextChoices):
     """Algorithm used to sign the JWT Token"""
 
@@ -303,6 +309,16 @@ class OAuth2Provider(WebfingerProvider, Provider):
             "(Format: hours=1;minutes=2;seconds=3)."
         ),
     )
+    introspection_cache_validity = models.TextField(
+        default="seconds=0",
+        validators=[timedelta_string_validator],
+        help_text=_(
+            "Cache token introspection responses for requests from this provider for up "
+            "to this duration. Revoked tokens are removed from the cache immediately. "
+            "When set to seconds=0, responses are not cached. "
+            "(Format: hours=1;minutes=2;seconds=3)."
+        ),
+    )
 
     sub_mode = models.TextField(
         choices=SubModes.choices,
@@ -467,7 +483,7 @@ class OAuth2Provider(WebfingerProvider, Provider):
 
     def encrypt(self, raw: str) -> str:
         """Encrypt JWT"""
-        key = JWK.from_pem(self.encryption_key.certificate_data.encode())
+        key = _load_jwk(self.encryption_key.certificate_data)
         jwe = JWE(
             raw,
             json_encode(
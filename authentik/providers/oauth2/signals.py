@@ -1,5 +1,5 @@
 from django.core.cache import cache
-from django.db.models.signals import post_save, pre_delete
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import receiver
 from structlog.stdlib import get_logger
 
@@ -7,19 +7,25 @@ from authentik.common.oauth.constants import (
     OAUTH2_BINDING,
     PLAN_CONTEXT_OIDC_LOGOUT_IFRAME_SESSIONS,
 )
-from authentik.core.models import AuthenticatedSession, ProviderPropertyMapping, User
+from authentik.core.models import Application, AuthenticatedSession, ProviderPropertyMapping, User
 from authentik.core.signals import deactivation_token_cleanup_inhibited
+from authentik.crypto.models import CertificateKeyPair
 from authentik.flows.models import in_memory_stage
+from authentik.lib.config import CONFIG
+from authentik.lib.utils.cache import cache_invalidate
 from authentik.providers.iframe_logout import IframeLogoutStageView
 from authentik.providers.oauth2.models import (
     AccessToken,
     DeviceToken,
     OAuth2LogoutMethod,
+    OAuth2Provider,
     RefreshToken,
     ScopeMapping,
 )
 from authentik.providers.oauth2.tasks import backchannel_logout_notification_dispatch
-from authentik.providers.oauth2.utils import build_frontchannel_logout_url
+from authentik.providers.oauth2.utils import access_token_cache_key, build_frontchannel_logout_url
+from authentik.providers.oauth2.views.introspection import introspection_cache_key
+from authentik.providers.oauth2.views.jwks import JWKS_CACHE_PREFIX
 from authentik.providers.oauth2.views.provider import claims_cache_key
 from authentik.stages.user_logout.models import UserLogoutStage
 from authentik.stages.user_logout.stage import flow_pre_user_logout
@@ -141,3 +147,34 @@ def scope_mapping_post_save_cache(sender, instance: ScopeMapping | ProviderPrope
     if isinstance(instance, ProviderPropertyMapping):
         keys.append(claims_cache_key(instance.provider))
     cache.delete_many(keys)
+
+
+@receiver(post_save, sender=Application)
+@receiver(post_delete, sender=Application)
+@receiver(post_save, sender=OAuth2Provider)
+@receiver(post_delete, sender=OAuth2Provider)
+@receiver(post_save, sender=CertificateKeyPair)
+@receiver(post_delete, sender=CertificateKeyPair)
+def jwks_post_save_cache(sender, **_):
+    """Clear cached JWKS documents when providers, their applications or keys change"""
+    cache.delete_many(cache.keys(f"{JWKS_CACHE_PREFIX}*"))
+
+
+@receiver(post_save, sender=AccessToken)
+@receiver(post_delete, sender=AccessToken)
+@receiver(post_save, sender=RefreshToken)
+@receiver(post_delete, sender=RefreshToken)
+def token_post_save_cache(sender, instance: AccessToken | RefreshToken, created: bool = False, **_):
+    """Remove revoked and deleted tokens from the cache"""
+    if created:
+        return
+    # Tokens can be introspected by their provider and by providers federating with it
+    provider_pks = {instance.provider_id} | set(
+        OAuth2Provider.objects.filter(pk=instance.provider_id)
+        .exclude(jwt_federation_providers=None)
+        .values_list("jwt_federation_providers", flat=True)
+    )
+    keys = [introspection_cache_key(instance.token, provider_pk) for provider_pk in provider_pks]
+    if isinstance(instance, AccessToken) and CONFIG.get_int("cache.timeout_access_tokens", 0) > 0:
+        keys.append(access_token_cache_key(instance.token))
+    cache_invalidate(keys)
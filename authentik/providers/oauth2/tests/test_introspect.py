@@ -3,7 +3,10 @@
 import json
 from base64 import b64encode
 from dataclasses import asdict
+from unittest.mock import patch
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
@@ -11,6 +14,7 @@ from authentik.common.oauth.constants import ACR_AUTHENTIK_DEFAULT
 from authentik.core.models import Application
 from authentik.core.tests.utils import create_test_admin_user, create_test_cert, create_test_flow
 from authentik.lib.generators import generate_id
+from authentik.lib.utils.cache import cache_populate
 from authentik.providers.oauth2.id_token import IDToken
 from authentik.providers.oauth2.models import (
     AccessToken,
@@ -243,3 +247,93 @@ class TesOAuth2Introspection(OAuthTestCase):
                 "scope": " ".join(token.scope),
             },
         )
+
+    def _introspect(self, token: str) -> tuple[dict, int]:
+        """Introspect `token` and return the response and how many token queries were made"""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.post(
+                reverse("authentik_providers_oauth2:token-introspection"),
+                HTTP_AUTHORIZATION=f"Basic {self.auth}",
+                data={"token": token},
+            )
+        self.assertEqual(res.status_code, 200)
+        return json.loads(res.content.decode()), len(
+            [
+                query
+                for query in queries.captured_queries
+                if "authentik_providers_oauth2_accesstoken" in query["sql"]
+            ]
+        )
+
+    def test_introspect_cached(self):
+        """Test introspection responses are cached and removed when the token is revoked"""
+        self.provider.introspection_cache_validity = "minutes=5"
+        self.provider.save()
+        token = AccessToken.objects.create(
+            provider=self.provider,
+            user=self.user,
+            token=generate_id(),
+            auth_time=timezone.now(),
+            _scope="openid user profile",
+            _id_token=json.dumps(
+                asdict(
+                    IDToken("foo", "bar"),
+                )
+            ),
+        )
+        response, queries = self._introspect(token.token)
+        self.assertTrue(response["active"])
+        self.assertEqual(queries, 1)
+        self.assertEqual(self._introspect(token.token), (response, 0))
+
+        res = self.client.post(
+            reverse("authentik_providers_oauth2:token-revoke"),
+            HTTP_AUTHORIZATION=f"Basic {self.auth}",
+            data={"token": token.token},
+        )
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(self._introspect(token.token), ({"active": False}, 1))
+
+    def test_introspect_cached_concurrent_revoke(self):
+        """Test a response for a token revoked while it was introspected isn't cached"""
+        self.provider.introspection_cache_validity = "minutes=5"
+        self.provider.save()
+        token = AccessToken.objects.create(
+            provider=self.provider,
+            user=self.user,
+            token=generate_id(),
+            auth_time=timezone.now(),
+            _scope="openid user profile",
+            _id_token=json.dumps(
+                asdict(
+                    IDToken("foo", "bar"),
+                )
+            ),
+        )
+
+        def revoke_then_populate(*args):
+            AccessToken.objects.get(pk=token.pk).delete()
+            return cache_populate(*args)
+
+        with patch(
+            "authentik.providers.oauth2.views.introspection.cache_populate", revoke_then_populate
+        ):
+            self.assertTrue(self._introspect(token.token)[0]["active"])
+        self.assertEqual(self._introspect(token.token), ({"active": False}, 1))
+
+    def test_introspect_cache_disabled(self):
+        """Test introspection responses are not cached by default"""
+        token = AccessToken.objects.create(
+            provider=self.provider,
+            user=self.user,
+            token=generate_id(),
+            auth_time=timezone.now(),
+            _scope="openid user profile",
+            _id_token=json.dumps(
+                asdict(
+                    IDToken("foo", "bar"),
+                )
+            ),
+        )
+        self.assertEqual(self._introspect(token.token)[1], 1)
+        self.assertEqual(self._introspect(token.token)[1], 1)
@@ -2,6 +2,7 @@
 
 import base64
 import json
+from unittest.mock import patch
 
 from cryptography.hazmat.backends import default_backend
 from cryptography.x509 import load_der_x509_certificate
@@ -15,6 +16,7 @@ from authentik.crypto.models import CertificateKeyPair
 from authentik.lib.generators import generate_id
 from authentik.providers.oauth2.models import OAuth2Provider, RedirectURI, RedirectURIMatchingMode
 from authentik.providers.oauth2.tests.utils import OAuthTestCase
+from authentik.providers.oauth2.views.jwks import JWKSView
 
 TEST_CORDS_CERT = """
 -----BEGIN CERTIFICATE-----
@@ -187,3 +189,22 @@ class TestJWKS(OAuthTestCase):
         body = json.loads(response.content.decode())
         self.assertEqual(len(body["keys"]), 1)
         PyJWKSet.from_dict(body)
+
+    def test_cached(self):
+        """Test JWKS document is cached until the provider changes"""
+        provider = OAuth2Provider.objects.create(
+            name=generate_id(),
+            client_id=generate_id(),
+            authorization_flow=create_test_flow(),
+            redirect_uris=[RedirectURI(RedirectURIMatchingMode.STRICT, "http://local.invalid")],
+            signing_key=create_test_cert(),
+        )
+        app = Application.objects.create(name=generate_id(), slug=generate_id(), provider=provider)
+        url = reverse("authentik_providers_oauth2:jwks", kwargs={"application_slug": app.slug})
+        first = self.client.get(url).json()
+        with patch.object(JWKSView, "get_document") as get_document:
+            self.assertEqual(self.client.get(url).json(), first)
+            get_document.assert_not_called()
+        provider.encryption_key = create_test_cert()
+        provider.save()
+        self.assertEqual(len(self.client.get(url).json()["keys"]), 2)
@@ -2,7 +2,11 @@
 
 import json
 from dataclasses import asdict
+from datetime import timedelta
+from unittest.mock import patch
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
@@ -10,7 +14,9 @@ from authentik.blueprints.tests import apply_blueprint
 from authentik.core.models import Application
 from authentik.core.tests.utils import create_test_admin_user, create_test_cert, create_test_flow
 from authentik.events.models import Event, EventAction
+from authentik.lib.config import CONFIG
 from authentik.lib.generators import generate_id
+from authentik.lib.utils.cache import cache_get, cache_populate
 from authentik.providers.oauth2.id_token import IDToken
 from authentik.providers.oauth2.models import (
     AccessToken,
@@ -20,6 +26,7 @@ from authentik.providers.oauth2.models import (
     ScopeMapping,
 )
 from authentik.providers.oauth2.tests.utils import OAuthTestCase
+from authentik.providers.oauth2.utils import access_token_cache_key
 
 
 class TestUserinfo(OAuthTestCase):
@@ -104,3 +111,64 @@ class TestUserinfo(OAuthTestCase):
             events.first().context["message"],
             "Failed to evaluate property-mapping: 'test'",
         )
+
+    def _userinfo_token_queries(self) -> tuple[int, int]:
+        """Get userinfo and return the status code and how many access token queries were made"""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(
+                reverse("authentik_providers_oauth2:userinfo"),
+                HTTP_AUTHORIZATION=f"Bearer {self.token.token}",
+            )
+        return res.status_code, len(
+            [
+                query
+                for query in queries.captured_queries
+                if "authentik_providers_oauth2_accesstoken" in query["sql"]
+            ]
+        )
+
+    @CONFIG.patch("cache.timeout_access_tokens", 60)
+    def test_userinfo_cached(self):
+        """test access tokens are cached"""
+        self.assertEqual(self._userinfo_token_queries(), (200, 1))
+        self.assertIsNotNone(cache_get(access_token_cache_key(self.token.token)))
+        self.assertEqual(self._userinfo_token_queries(), (200, 0))
+
+    @CONFIG.patch("cache.timeout_access_tokens", 60)
+    def test_userinfo_cached_revoked(self):
+        """test revoked and deleted access tokens are removed from the cache"""
+        self.assertEqual(self._userinfo_token_queries(), (200, 1))
+        self.token.revoked = True
+        self.token.save()
+        self.assertIsNone(cache_get(access_token_cache_key(self.token.token)))
+        self.assertEqual(self._userinfo_token_queries(), (401, 1))
+        self.token.delete()
+        self.assertEqual(self._userinfo_token_queries(), (401, 1))
+
+    @CONFIG.patch("cache.timeout_access_tokens", 60)
+    def test_userinfo_cached_concurrent_revoke(self):
+        """test a token loaded before it was revoked concurrently isn't cached afterwards"""
+
+        def revoke_then_populate(*args):
+            AccessToken.objects.get(pk=self.token.pk).delete()
+            return cache_populate(*args)
+
+        with patch("authentik.providers.oauth2.utils.cache_populate", revoke_then_populate):
+            self.assertEqual(self._userinfo_token_queries()[0], 200)
+        self.assertIsNone(cache_get(access_token_cache_key(self.token.token)))
+        self.assertEqual(self._userinfo_token_queries(), (401, 1))
+
+    @CONFIG.patch("cache.timeout_access_tokens", 60)
+    def test_userinfo_cached_expired(self):
+        """test expired access tokens are rejected without a query"""
+        self.assertEqual(self._userinfo_token_queries(), (200, 1))
+        with patch(
+            "authentik.lib.models.now",
+            return_value=self.token.expires + timedelta(seconds=1),
+        ):
+            self.assertEqual(self._userinfo_token_queries()[0], 401)
+
+    def test_userinfo_uncached(self):
+        """test access tokens are queried for every request by default"""
+        self.assertEqual(self._userinfo_token_queries(), (200, 1))
+        self.assertEqual(self._userinfo_token_queries(), (200, 1))
@@ -17,12 +17,15 @@ from structlog.stdlib import get_logger
 
 from authentik.core.middleware import CTX_AUTH_VIA, KEY_USER
 from authentik.events.models import Event, EventAction
+from authentik.lib.config import CONFIG
+from authentik.lib.utils.cache import cache_get, cache_populate
 from authentik.lib.utils.time import timedelta_from_string
 from authentik.providers.oauth2.errors import BearerTokenError
 from authentik.providers.oauth2.id_token import hash_session_key
 from authentik.providers.oauth2.models import AccessToken, OAuth2Provider
 
 LOGGER = get_logger()
+ACCESS_TOKEN_CACHE_PREFIX = "goauthentik.io/providers/oauth2/access_token/"
 
 
 class TokenResponse(JsonResponse):
@@ -135,6 +138,34 @@ def extract_client_auth(request: HttpRequest) -> tuple[str, str]:
     return (client_id, client_secret)
 
 
+def access_token_cache_key(access_token: str) -> str:
+    """Cache key for a validated access token"""
+    return f"{ACCESS_TOKEN_CACHE_PREFIX}{sha256(access_token.encode()).hexdigest()}"
+
+
+def get_access_token(access_token: str) -> AccessToken | None:
+    """Get the access token matching `access_token`.
+
+    When `cache.timeout_access_tokens` is set, valid tokens are cached by a hash of the token
+    until they expire or the timeout passes, and removed from the cache when they are revoked
+    or deleted. With the local cache enabled, tokens are then validated without a query."""
+    timeout = CONFIG.get_int("cache.timeout_access_tokens", 0)
+    if timeout <= 0:
+        return AccessToken.objects.filter(token=access_token).first()
+    key = access_token_cache_key(access_token)
+    token = cache_get(key)
+    if token is not None:
+        return token
+    token = AccessToken.objects.filter(token=access_token).first()
+    if not token or token.is_expired or token.revoked:
+        return token
+    if token.expires:
+        timeout = min(timeout, int((token.expires - now()).total_seconds()))
+    if timeout > 0:
+        cache_populate(key, token, timeout)
+    return token
+
+
 def protected_resource_view(scopes: list[str]):
     """View decorator. The client accesses protected resources by presenting the
     access token to the resource server.
@@ -153,7 +184,7 @@ def protected_resource_view(scopes: list[str]):
                     LOGGER.debug("No token passed")
                     raise BearerTokenError("invalid_token")
 
-                token = AccessToken.objects.filter(token=access_token).first()
+                token = get_access_token(access_token)
                 if not token:
                     LOGGER.debug("Token does not exist", access_token=access_token)
                     raise BearerTokenError("invalid_token")
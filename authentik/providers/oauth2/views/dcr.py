@@ -19,6 +19,7 @@ from authentik.core.apps import AppAccessWithoutBindings
 from authentik.core.models import Application, User
 from authentik.lib.generators import generate_id
 from authentik.policies.engine import PolicyEngine
+from authentik.policies.index import PolicyBindingIndex
 from authentik.policies.models import PolicyBinding
 from authentik.providers.oauth2.models import (
     AccessToken,
@@ -186,6 +187,8 @@ class DynamicClientRegistrationView(View):
                 )
             )
         PolicyBinding.objects.bulk_create(new_bindings)
+        # bulk_create doesn't send post_save
+        PolicyBindingIndex.invalidate()
 
         LOGGER.info(
             "DCR: registered new client",
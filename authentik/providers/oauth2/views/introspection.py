@@ -1,20 +1,32 @@
 """authentik OAuth2 Token Introspection Views"""
 
 from dataclasses import dataclass, field
+from hashlib import sha256
+from typing import Any
 
 from django.db.models import Q
 from django.http import HttpRequest, HttpResponse
 from django.utils.decorators import method_decorator
+from django.utils.timezone import now
 from django.views import View
 from django.views.decorators.csrf import csrf_exempt
 from structlog.stdlib import get_logger
 
+from authentik.lib.utils.cache import cache_get, cache_populate
+from authentik.lib.utils.time import timedelta_from_string
+from authentik.providers.oauth2.apps import COUNTER_OAUTH2_INTROSPECTION_CACHE
 from authentik.providers.oauth2.errors import TokenIntrospectionError
 from authentik.providers.oauth2.id_token import IDToken
 from authentik.providers.oauth2.models import AccessToken, ClientType, OAuth2Provider, RefreshToken
 from authentik.providers.oauth2.utils import TokenResponse, authenticate_provider
 
 LOGGER = get_logger()
+INTROSPECTION_CACHE_PREFIX = "goauthentik.io/providers/oauth2/introspection/"
+
+
+def introspection_cache_key(raw_token: str, provider_pk: int) -> str:
+    """Cache key for the introspection response of a token for the provider introspecting it"""
+    return f"{INTROSPECTION_CACHE_PREFIX}{sha256(raw_token.encode()).hexdigest()}/{provider_pk}"
 
 
 @dataclass(slots=True)
@@ -38,9 +50,8 @@ class TokenIntrospectionParams:
             raise TokenIntrospectionError()
 
     @staticmethod
-    def from_request(request: HttpRequest) -> TokenIntrospectionParams:
-        """Extract required Parameters from HTTP Request"""
-        raw_token = request.POST.get("token")
+    def authenticate(request: HttpRequest) -> OAuth2Provider:
+        """Authenticate the provider making the introspection request"""
         provider = authenticate_provider(request)
         if not provider:
             LOGGER.info("Failed to authenticate introspection request")
@@ -48,6 +59,16 @@ class TokenIntrospectionParams:
         if provider.client_type != ClientType.CONFIDENTIAL:
             LOGGER.info("Introspection request from public provider, denying.")
             raise TokenIntrospectionError
+        return provider
+
+    @staticmethod
+    def from_request(
+        request: HttpRequest, provider: OAuth2Provider | None = None
+    ) -> TokenIntrospectionParams:
+        """Extract required Parameters from HTTP Request"""
+        raw_token = request.POST.get("token")
+        if not provider:
+            provider = TokenIntrospectionParams.authenticate(request)
 
         query = Q(
             Q(provider=provider) | Q(provider__jwt_federation_providers__in=[provider]),
@@ -73,17 +94,50 @@ class TokenIntrospectionView(View):
     params: TokenIntrospectionParams
     provider: OAuth2Provider
 
+    def get_response(self) -> dict[str, Any]:
+        """Build the introspection response for the token"""
+        response = {}
+        if self.params.id_token:
+            response.update(self.params.id_token.to_dict())
+            response.pop("cnf", None)
+        response["active"] = not self.params.token.is_expired and not self.params.token.revoked
+        response["scope"] = " ".join(self.params.token.scope)
+        response["client_id"] = self.params.provider.client_id
+        return response
+
+    def get_cached(self, raw_token: str) -> dict[str, Any] | None:
+        """Get the cached introspection response for the token and calling provider"""
+        response = cache_get(introspection_cache_key(raw_token, self.provider.pk))
+        COUNTER_OAUTH2_INTROSPECTION_CACHE.labels(
+            provider=self.provider.name, result="hit" if response else "miss"
+        ).inc()
+        return response
+
+    def set_cached(self, raw_token: str, response: dict[str, Any], timeout: int):
+        """Cache the introspection response for the token and calling provider, for at most
+        `timeout` seconds and at most until the token expires"""
+        if self.params.token.expires:
+            timeout = min(timeout, int((self.params.token.expires - now()).total_seconds()))
+        if timeout <= 0:
+            return
+        cache_populate(introspection_cache_key(raw_token, self.provider.pk), response, timeout)
+
     def post(self, request: HttpRequest) -> HttpResponse:
         """Introspection handler"""
         try:
-            self.params = TokenIntrospectionParams.from_request(request)
-            response = {}
-            if self.params.id_token:
-                response.update(self.params.id_token.to_dict())
-                response.pop("cnf", None)
-            response["active"] = not self.params.token.is_expired and not self.params.token.revoked
-            response["scope"] = " ".join(self.params.token.scope)
-            response["client_id"] = self.params.provider.client_id
+            self.provider = TokenIntrospectionParams.authenticate(request)
+            raw_token = request.POST.get("token", "")
+            timeout = int(
+                timedelta_from_string(self.provider.introspection_cache_validity).total_seconds()
+            )
+            if timeout > 0:
+                response = self.get_cached(raw_token)
+                if response:
+                    return TokenResponse(response)
+            self.params = TokenIntrospectionParams.from_request(request, self.provider)
+            response = self.get_response()
+            if timeout > 0 and response["active"]:
+                self.set_cached(raw_token, response, timeout)
             return TokenResponse(response)
         except TokenIntrospectionError:
             return TokenResponse({"active": False})
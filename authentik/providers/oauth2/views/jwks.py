@@ -19,6 +19,7 @@ from cryptography.hazmat.primitives.asymmetric.rsa import RSAPrivateKey, RSAPubl
 from cryptography.hazmat.primitives.asymmetric.types import PrivateKeyTypes
 from cryptography.hazmat.primitives.serialization import Encoding
 from cryptography.x509 import Certificate
+from django.core.cache import cache
 from django.http import Http404, HttpRequest, HttpResponse, JsonResponse
 from django.views import View
 from jwt.utils import base64url_encode
@@ -27,6 +28,9 @@ from authentik.core.models import Application
 from authentik.crypto.models import CertificateKeyPair
 from authentik.providers.oauth2.models import JWTAlgorithms, OAuth2Provider
 
+JWKS_CACHE_PREFIX = "goauthentik.io/providers/oauth2/jwks/"
+JWKS_CACHE_TIMEOUT = 60 * 60
+
 # See https://notes.salrahman.com/generate-es256-es384-es512-private-keys/
 # and _CURVE_TYPES in the same file as the below curve files
 ec_crv_map = {
@@ -41,6 +45,11 @@ min_length_map = {
 }
 
 
+def jwks_cache_key(application_slug: str) -> str:
+    """Cache key of the JWKS document of an application"""
+    return f"{JWKS_CACHE_PREFIX}{application_slug}"
+
+
 # https://github.com/jpadilla/pyjwt/issues/709
 def bytes_from_int(val: int, min_length: int = 0) -> bytes:
     """Custom bytes_from_int that accepts a minimum length"""
@@ -121,7 +130,8 @@ class JWKSView(View):
             return key_data
         cert = key.certificate
 
-        key_data = _jwks_from_private_key(private_key, cert, key.kid, use)
+        # Copy, as the cached data is shared
+        key_data = dict(_jwks_from_private_key(private_key, cert, key.kid, use))
 
         if use == "sig":
             key_data["alg"] = JWTAlgorithms.from_private_key(private_key)
@@ -152,13 +162,28 @@ class JWKSView(View):
         if encryption_key := provider.encryption_key:
             yield JWKSView.get_jwk_for_key(encryption_key, "enc")
 
-    def get(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
-        """Show JWK Key data for Provider"""
+    def get_document(self) -> dict:
+        """Build the JWKS document"""
         response_data = {}
         for jwk in self.get_keys():
             if jwk:
                 response_data.setdefault("keys", [])
                 response_data["keys"].append(jwk)
+        return response_data
+
+    def get(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        """Show JWK Key data for Provider"""
+        application_slug = self.kwargs.get("application_slug")
+        if application_slug:
+            # The document only changes when the provider or its keys change,
+            # see authentik.providers.oauth2.signals
+            key = jwks_cache_key(application_slug)
+            response_data = cache.get(key)
+            if response_data is None:
+                response_data = self.get_document()
+                cache.set(key, response_data, JWKS_CACHE_TIMEOUT)
+        else:
+            response_data = self.get_document()
 
         response = JsonResponse(response_data)
         response["Access-Control-Allow-Origin"] = "*"
@@ -0,0 +1,58 @@
+"""Benchmark SAML response generation"""
+
+from time import perf_counter
+
+from django.db import transaction
+
+from authentik.core.models import Application
+from authentik.core.tests.utils import (
+    RequestFactory,
+    create_test_admin_user,
+    create_test_cert,
+    create_test_flow,
+)
+from authentik.lib.generators import generate_id
+from authentik.providers.saml.models import SAMLPropertyMapping, SAMLProvider
+from authentik.providers.saml.processors.assertion import AssertionProcessor
+from authentik.providers.saml.processors.authn_request_parser import AuthNRequest
+from authentik.tenants.management import TenantCommand
+
+
+class Command(TenantCommand):
+    """Benchmark building SAML responses in a single process, for signed and for signed and
+    encrypted assertions. All changes are rolled back."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--iterations", type=int, default=1000, help="How many responses should be built."
+        )
+
+    def benchmark(self, provider: SAMLProvider, iterations: int) -> float:
+        """Build `iterations` responses and return how many responses were built per second"""
+        request = RequestFactory().get("/", user=create_test_admin_user())
+        start = perf_counter()
+        for _ in range(iterations):
+            AssertionProcessor(provider, request, AuthNRequest()).build_response()
+        return iterations / (perf_counter() - start)
+
+    def handle_per_tenant(self, **options):
+        iterations = options["iterations"]
+        with transaction.atomic():
+            kp = create_test_cert()
+            provider = SAMLProvider.objects.create(
+                name=generate_id(),
+                authorization_flow=create_test_flow(),
+                acs_url="http://localhost",
+                signing_kp=kp,
+                sign_assertion=True,
+                sign_response=True,
+            )
+            provider.property_mappings.set(SAMLPropertyMapping.objects.all())
+            Application.objects.create(name=generate_id(), slug=generate_id(), provider=provider)
+            signed = self.benchmark(provider, iterations)
+            provider.encryption_kp = kp
+            provider.save()
+            encrypted = self.benchmark(provider, iterations)
+            transaction.set_rollback(True)
+        self.stdout.write(f"Signed: {signed:.1f} responses/s")
+        self.stdout.write(f"Signed and encrypted: {encrypted:.1f} responses/s")
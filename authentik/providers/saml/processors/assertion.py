@@ -13,7 +13,6 @@ from lxml.etree import Element, SubElement, _Element  # nosec
 from structlog.stdlib import get_logger
 
 from authentik.common.saml.constants import (
-    DIGEST_ALGORITHM_TRANSLATION_MAP,
     NS_MAP,
     NS_SAML_ASSERTION,
     NS_SAML_PROTOCOL,
@@ -23,13 +22,16 @@ from authentik.common.saml.constants import (
     SAML_NAME_ID_FORMAT_UNSPECIFIED,
     SAML_NAME_ID_FORMAT_WINDOWS,
     SAML_NAME_ID_FORMAT_X509,
-    SIGN_ALGORITHM_TRANSFORM_MAP,
+)
+from authentik.common.saml.keys import (
+    get_encryption_key,
+    get_signature_template,
+    get_signing_key,
 )
 from authentik.core.expression.exceptions import PropertyMappingExpressionException
 from authentik.events.models import Event, EventAction
 from authentik.events.signals import get_login_event
 from authentik.lib.utils.time import timedelta_from_string
-from authentik.lib.xml import remove_xml_newlines
 from authentik.providers.saml.models import SAMLPropertyMapping, SAMLProvider
 from authentik.providers.saml.processors.authn_request_parser import AuthNRequest
 from authentik.providers.saml.utils import get_random_id
@@ -52,6 +54,9 @@ class AssertionProcessor:
     http_request: HttpRequest
     auth_n_request: AuthNRequest
 
+    # Attribute referenced by signatures
+    id_attribute = "ID"
+
     _issue_instant: str
     _assertion_id: str
     _response_id: str
@@ -327,16 +332,7 @@ class AssertionProcessor:
         assertion.append(self.get_issuer())
 
         if self.provider.signing_kp and self.provider.sign_assertion:
-            sign_algorithm_transform = SIGN_ALGORITHM_TRANSFORM_MAP.get(
-                self.provider.signature_algorithm, xmlsec.constants.TransformRsaSha1
-            )
-            signature = xmlsec.template.create(
-                assertion,
-                xmlsec.constants.TransformExclC14N,
-                sign_algorithm_transform,
-                ns=xmlsec.constants.DSigNs,
-            )
-            assertion.append(signature)
+            assertion.append(self.get_signature(self._assertion_id))
 
         assertion.append(self.get_assertion_subject())
         assertion.append(self.get_assertion_conditions())
@@ -358,16 +354,7 @@ class AssertionProcessor:
         response.append(self.get_issuer())
 
         if self.provider.signing_kp and self.provider.sign_response:
-            sign_algorithm_transform = SIGN_ALGORITHM_TRANSFORM_MAP.get(
-                self.provider.signature_algorithm, xmlsec.constants.TransformRsaSha1
-            )
-            signature = xmlsec.template.create(
-                response,
-                xmlsec.constants.TransformExclC14N,
-                sign_algorithm_transform,
-                ns=xmlsec.constants.DSigNs,
-            )
-            response.append(signature)
+            response.append(self.get_signature(self._response_id))
 
         status = SubElement(response, f"{{{NS_SAML_PROTOCOL}}}Status")
         status_code = SubElement(status, f"{{{NS_SAML_PROTOCOL}}}StatusCode")
@@ -376,37 +363,23 @@ class AssertionProcessor:
         response.append(self.get_assertion())
         return response
 
-    def _sign(self, element: _Element):
-        """Sign an XML element based on the providers' configured signing settings"""
-        digest_algorithm_transform = DIGEST_ALGORITHM_TRANSLATION_MAP.get(
-            self.provider.digest_algorithm, xmlsec.constants.TransformSha1
+    def get_signature(self, element_id: str) -> _Element:
+        """Get a signature template for the element with the ID `element_id`, based on the
+        providers' configured signing settings"""
+        return get_signature_template(
+            self.provider.signature_algorithm, self.provider.digest_algorithm, element_id
         )
-        xmlsec.tree.add_ids(element, ["ID"])
+
+    def _sign(self, element: _Element):
+        """Sign an XML element with the signature added by `get_signature`"""
+        xmlsec.tree.add_ids(element, [self.id_attribute])
         signature_node = xmlsec.tree.find_node(element, xmlsec.constants.NodeSignature)
-        ref = xmlsec.template.add_reference(
-            signature_node,
-            digest_algorithm_transform,
-            uri="#" + element.attrib["ID"],
-        )
-        xmlsec.template.add_transform(ref, xmlsec.constants.TransformEnveloped)
-        xmlsec.template.add_transform(ref, xmlsec.constants.TransformExclC14N)
-        key_info = xmlsec.template.ensure_key_info(signature_node)
-        xmlsec.template.add_x509_data(key_info)
 
         ctx = xmlsec.SignatureContext()
 
-        key = xmlsec.Key.from_memory(
-            self.provider.signing_kp.key_data,
-            xmlsec.constants.KeyDataFormatPem,
-            None,
-        )
-        key.load_cert_from_memory(
-            self.provider.signing_kp.certificate_data,
-            xmlsec.constants.KeyDataFormatCertPem,
-        )
-        ctx.key = key
+        ctx.key = get_signing_key(self.provider.signing_kp)
         try:
-            ctx.sign(remove_xml_newlines(element, signature_node))
+            ctx.sign(signature_node)
         except xmlsec.Error as exc:
             raise InvalidSignature() from exc
 
@@ -420,12 +393,7 @@ class AssertionProcessor:
         parent.remove(element)
 
         manager = xmlsec.KeysManager()
-        key = xmlsec.Key.from_memory(
-            self.provider.encryption_kp.certificate_data,
-            xmlsec.constants.KeyDataFormatCertPem,
-        )
-
-        manager.add_key(key)
+        manager.add_key(get_encryption_key(self.provider.encryption_kp))
         encryption_context = xmlsec.EncryptionContext(manager)
         encryption_context.key = xmlsec.Key.generate(
             xmlsec.constants.KeyDataAes, 128, xmlsec.constants.KeyDataTypeSession
@@ -16,6 +16,7 @@ from authentik.common.saml.constants import (
     SAML_NAME_ID_FORMAT_EMAIL,
     SIGN_ALGORITHM_TRANSFORM_MAP,
 )
+from authentik.common.saml.keys import get_signing_key
 from authentik.core.models import User
 from authentik.lib.xml import remove_xml_newlines
 from authentik.providers.saml.models import SAMLProvider
@@ -186,16 +187,7 @@ class LogoutRequestProcessor:
 
         ctx = xmlsec.SignatureContext()
 
-        key = xmlsec.Key.from_memory(
-            self.provider.signing_kp.key_data,
-            xmlsec.constants.KeyDataFormatPem,
-            None,
-        )
-        key.load_cert_from_memory(
-            self.provider.signing_kp.certificate_data,
-            xmlsec.constants.KeyDataFormatCertPem,
-        )
-        ctx.key = key
+        ctx.key = get_signing_key(self.provider.signing_kp)
         ctx.sign(remove_xml_newlines(element, signature_node))
 
     def _build_signable_query_string(self, params: dict) -> str:
@@ -217,13 +209,7 @@ class LogoutRequestProcessor:
             self.provider.signature_algorithm, xmlsec.constants.TransformRsaSha256
         )
 
-        key = xmlsec.Key.from_memory(
-            self.provider.signing_kp.key_data,
-            xmlsec.constants.KeyDataFormatPem,
-            None,
-        )
-
         ctx = xmlsec.SignatureContext()
-        ctx.key = key
+        ctx.key = get_signing_key(self.provider.signing_kp, with_certificate=False)
 
         return ctx.sign_binary(query_string.encode("utf-8"), signature_algorithm_transform)
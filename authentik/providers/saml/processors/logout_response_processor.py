@@ -15,6 +15,7 @@ from authentik.common.saml.constants import (
     NS_SAML_PROTOCOL,
     SIGN_ALGORITHM_TRANSFORM_MAP,
 )
+from authentik.common.saml.keys import get_signing_key
 from authentik.providers.saml.models import SAMLProvider
 from authentik.providers.saml.processors.logout_request_parser import LogoutRequest
 from authentik.providers.saml.utils import get_random_id
@@ -168,13 +169,7 @@ class LogoutResponseProcessor:
         xmlsec.template.add_x509_data(key_info)
 
         ctx = xmlsec.SignatureContext()
-        ctx.key = xmlsec.Key.from_memory(
-            self.provider.signing_kp.key_data,  # Use key_data for the private key
-            xmlsec.constants.KeyDataFormatPem,
-        )
-        ctx.key.load_cert_from_memory(
-            self.provider.signing_kp.certificate_data, xmlsec.constants.KeyDataFormatPem
-        )
+        ctx.key = get_signing_key(self.provider.signing_kp)
         ctx.sign(signature_node)
 
     def _build_signable_query_string(self, params: dict) -> str:
@@ -196,13 +191,7 @@ class LogoutResponseProcessor:
             self.provider.signature_algorithm, xmlsec.constants.TransformRsaSha256
         )
 
-        key = xmlsec.Key.from_memory(
-            self.provider.signing_kp.key_data,
-            xmlsec.constants.KeyDataFormatPem,
-            None,
-        )
-
         ctx = xmlsec.SignatureContext()
-        ctx.key = key
+        ctx.key = get_signing_key(self.provider.signing_kp, with_certificate=False)
 
         return ctx.sign_binary(query_string.encode("utf-8"), signature_algorithm_transform)
@@ -22,6 +22,7 @@ from authentik.common.saml.constants import (
     SAML_NAME_ID_FORMAT_X509,
     SIGN_ALGORITHM_TRANSFORM_MAP,
 )
+from authentik.common.saml.keys import get_signing_key
 from authentik.lib.xml import remove_xml_newlines
 from authentik.providers.saml.models import SAMLProvider
 from authentik.providers.saml.utils.encoding import strip_pem_header
@@ -143,16 +144,7 @@ class MetadataProcessor:
 
         ctx = xmlsec.SignatureContext()
 
-        key = xmlsec.Key.from_memory(
-            self.provider.signing_kp.key_data,
-            xmlsec.constants.KeyDataFormatPem,
-            None,
-        )
-        key.load_cert_from_memory(
-            self.provider.signing_kp.certificate_data,
-            xmlsec.constants.KeyDataFormatCertPem,
-        )
-        ctx.key = key
+        ctx.key = get_signing_key(self.provider.signing_kp)
         ctx.sign(remove_xml_newlines(assertion, signature_node))
 
     def add_children(self, entity_descriptor: _Element):
@@ -0,0 +1,59 @@
+"""SAML signing key and template tests"""
+
+from django.test import TestCase
+
+from authentik.common.saml.constants import NS_SIGNATURE, RSA_SHA256, SHA256
+from authentik.common.saml.keys import (
+    get_encryption_key,
+    get_signature_template,
+    get_signing_key,
+)
+from authentik.core.tests.utils import create_test_cert
+
+
+class TestSigningKeys(TestCase):
+    """Test shared xmlsec keys"""
+
+    def test_shared(self):
+        """Test keys are parsed once per key pair"""
+        kp = create_test_cert()
+        key = get_signing_key(kp)
+        self.assertIs(get_signing_key(kp), key)
+        self.assertIsNot(get_signing_key(kp, with_certificate=False), key)
+
+    def test_changed(self):
+        """Test changing a key pair's key results in a new key"""
+        kp = create_test_cert()
+        key = get_signing_key(kp)
+        other = create_test_cert()
+        kp.key_data = other.key_data
+        kp.certificate_data = other.certificate_data
+        kp.save()
+        self.assertIsNot(get_signing_key(kp), key)
+
+    def test_encryption_key_shared(self):
+        """Test encryption keys are parsed once per certificate"""
+        kp = create_test_cert()
+        self.assertIs(get_encryption_key(kp), get_encryption_key(kp))
+
+
+class TestSignatureTemplates(TestCase):
+    """Test shared signature templates"""
+
+    def test_reference(self):
+        """Test templates are copied and reference the given ID"""
+        first = get_signature_template(RSA_SHA256, SHA256, "first")
+        second = get_signature_template(RSA_SHA256, SHA256, "second")
+        self.assertIsNot(first, second)
+        path = f"{{{NS_SIGNATURE}}}SignedInfo/{{{NS_SIGNATURE}}}Reference"
+        self.assertEqual(first.find(path).attrib["URI"], "#first")
+        self.assertEqual(second.find(path).attrib["URI"], "#second")
+        self.assertEqual(
+            first.find(f"{{{NS_SIGNATURE}}}SignedInfo/{{{NS_SIGNATURE}}}SignatureMethod").attrib[
+                "Algorithm"
+            ],
+            RSA_SHA256,
+        )
+        self.assertIsNotNone(
+            first.find(f"{{{NS_SIGNATURE}}}KeyInfo/{{{NS_SIGNATURE}}}X509Data"),
+        )
@@ -90,12 +90,30 @@ class ObjectFilter(ObjectPermissionsFilter):
         # assigned
         if getattr(request.user, "type", None) == UserTypes.INTERNAL_SERVICE_ACCOUNT:
             return queryset
-        if not queryset.exists():
+        if not self.has_object_permissions(request, queryset, permission):
             # User doesn't have direct permission to all objects
             # and also no object permissions assigned (directly or via role)
             raise PermissionDenied()
         return queryset
 
+    def has_object_permissions(self, request: Request, queryset: QuerySet, permission: str) -> bool:
+        """Check if the user has `permission` on any object of the model of `queryset`.
+
+        Only looks at the permissions assigned to the user's roles, instead of running the
+        filtered queryset an additional time"""
+        from guardian.models import RoleObjectPermission
+        from guardian.utils import get_anonymous_user, get_content_type
+
+        user = request.user
+        if user.is_anonymous:
+            user = get_anonymous_user()
+        _, codename = permission.split(".", 1)
+        return RoleObjectPermission.objects.filter(
+            role__in=user.all_roles(),
+            content_type=get_content_type(queryset.model),
+            permission__codename=codename,
+        ).exists()
+
 
 class SecretKeyFilter(DjangoFilterBackend):
     """Allow access to all objects when authenticated with secret key as token.
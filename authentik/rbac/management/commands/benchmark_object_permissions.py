@@ -0,0 +1,102 @@
+"""Benchmark listing objects with object permissions"""
+
+from time import perf_counter
+
+from django.contrib.auth.models import Permission
+from django.db import transaction
+from guardian.models import RoleObjectPermission
+from guardian.utils import get_content_type
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+
+from authentik.core.models import Group, User
+from authentik.lib.generators import generate_id
+from authentik.rbac.filters import ObjectFilter, ObjectPermissionsFilter
+from authentik.rbac.models import Role
+from authentik.tenants.management import TenantCommand
+
+PERMISSION = "authentik_core.view_user"
+
+
+class Command(TenantCommand):
+    """Benchmark filtering users by object permissions like the `/api/v3/core/users/` list
+    endpoint does, for a user which only has object permissions. Compares checking the filtered
+    queryset for any object with checking the user's object permissions. All changes are
+    rolled back."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--users", type=int, default=100000, help="How many users should be created."
+        )
+        parser.add_argument(
+            "--grants",
+            type=int,
+            default=5000,
+            help="On how many users the viewing user has object permissions.",
+        )
+        parser.add_argument(
+            "--page-size", type=int, default=20, help="How many objects are listed per page."
+        )
+        parser.add_argument(
+            "--iterations", type=int, default=10, help="How often each list is measured."
+        )
+
+    def setup(self, users: int, grants: int) -> User:
+        """Create `users` users, and a user with object permissions on `grants` of them"""
+        prefix = generate_id()
+        created = User.objects.bulk_create(
+            [User(username=f"{prefix}-{idx}") for idx in range(users)], batch_size=1000
+        )
+        role = Role.objects.create(name=prefix)
+        app_label, codename = PERMISSION.split(".")
+        permission = Permission.objects.get(content_type__app_label=app_label, codename=codename)
+        RoleObjectPermission.objects.bulk_create(
+            [
+                RoleObjectPermission(
+                    role=role,
+                    permission=permission,
+                    content_type=get_content_type(User),
+                    object_pk=str(user.pk),
+                )
+                for user in created[:grants]
+            ],
+            batch_size=1000,
+        )
+        viewer = User.objects.create(username=f"{prefix}-viewer")
+        group = Group.objects.create(name=prefix)
+        group.roles.add(role)
+        group.users.add(viewer)
+        return viewer
+
+    def list_page(self, request: Request, page_size: int, legacy: bool) -> float:
+        """Filter users for `request` and fetch the first page with its count, and return the
+        time taken. With `legacy`, check the filtered queryset for any object, as done before
+        object permissions were checked directly."""
+        object_filter = ObjectFilter()
+        queryset = User.objects.order_by("pk")
+        start = perf_counter()
+        if legacy:
+            queryset = ObjectPermissionsFilter.filter_queryset(
+                object_filter, request, queryset, APIView()
+            )
+            queryset.exists()
+        else:
+            queryset = object_filter.filter_queryset(request, queryset, APIView())
+        queryset.count()
+        list(queryset[:page_size])
+        return perf_counter() - start
+
+    def handle_per_tenant(self, **options):
+        users, grants = options["users"], options["grants"]
+        page_size, iterations = options["page_size"], options["iterations"]
+        with transaction.atomic():
+            request = Request(APIRequestFactory().get("/api/v3/core/users/"))
+            request.user = self.setup(users, grants)
+            for label, legacy in (("Filtered queryset", True), ("Object permissions", False)):
+                durations = [self.list_page(request, page_size, legacy) for _ in range(iterations)]
+                self.stdout.write(
+                    f"{label}: {users} users, {grants} grants, "
+                    f"{sum(durations) / iterations * 1000:.1f}ms per list"
+                )
+            transaction.set_rollback(True)
@@ -1,5 +1,7 @@
 """RBAC role tests"""
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APITestCase
 
@@ -90,6 +92,26 @@ class TestAPIPerms(APITestCase):
             },
         )
 
+    def test_list_object_perm_no_exists(self):
+        """Test list with object permissions doesn't check the filtered queryset separately"""
+        self.client.force_login(self.user)
+        inv = Invitation.objects.create(name=generate_id(), created_by=self.superuser)
+        self.role.assign_perms("authentik_stages_invitation.view_invitation", obj=inv)
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(reverse("authentik_api:invitation-list"))
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()["pagination"]["count"], 1)
+        for query in queries.captured_queries:
+            if "permission_subquery" in query["sql"]:
+                self.assertNotIn('SELECT 1 AS "a"', query["sql"])
+
+    def test_list_object_perm_other_model(self):
+        """Test list denied with object permissions on another model only"""
+        self.client.force_login(self.user)
+        self.role.assign_perms("authentik_core.view_group", obj=self.group)
+        res = self.client.get(reverse("authentik_api:invitation-list"))
+        self.assertEqual(res.status_code, 403)
+
     def test_list_denied(self):
         """Test list without adding permission"""
         self.client.force_login(self.user)
@@ -0,0 +1,66 @@
+"""Permission cache tests"""
+
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from guardian.conf import settings as guardian_settings
+from guardian.core import ObjectPermissionChecker
+
+from authentik.core.models import Group, User
+from authentik.core.tests.utils import create_test_user
+from authentik.lib.generators import generate_id
+from authentik.rbac.models import Role
+
+
+class TestPermissionCache(TestCase):
+    """Test permissions shared between ObjectPermissionChecker instances"""
+
+    def setUp(self):
+        self.user = create_test_user()
+        self.group = Group.objects.create(name=generate_id())
+        self.group.users.add(self.user)
+        self.role = Role.objects.create(name=generate_id())
+        self.group.roles.add(self.role)
+
+    def perms(self, obj=None) -> tuple[set[str], int]:
+        """Get permissions of the user with a new checker, and how many queries on permissions
+        were made"""
+        user = User.objects.get(pk=self.user.pk)
+        with CaptureQueriesContext(connection) as queries:
+            perms = ObjectPermissionChecker(user).get_perms(obj)
+        return perms, len(
+            [query for query in queries.captured_queries if "auth_permission" in query["sql"]]
+        )
+
+    def test_shared(self):
+        """Test permissions are resolved once for all checkers"""
+        self.role.assign_perms("authentik_core.view_group", self.group)
+        self.assertEqual(self.perms(self.group), ({"authentik_core.view_group"}, 1))
+        self.assertEqual(self.perms(self.group), ({"authentik_core.view_group"}, 0))
+
+    def test_invalidated_by_permissions(self):
+        """Test assigning and removing permissions invalidates the cache"""
+        self.assertEqual(self.perms()[0], set())
+        self.role.assign_perms("authentik_core.view_user")
+        self.assertEqual(self.perms()[0], {"authentik_core.view_user"})
+        self.role.remove_perms("authentik_core.view_user")
+        self.assertEqual(self.perms()[0], set())
+
+    def test_membership(self):
+        """Test permissions are keyed by role set, so membership changes apply immediately"""
+        other = Role.objects.create(name=generate_id())
+        other.assign_perms("authentik_core.view_user")
+        self.assertEqual(self.perms()[0], set())
+        self.user.roles.add(other)
+        self.assertEqual(self.perms()[0], {"authentik_core.view_user"})
+        self.group.users.remove(self.user)
+        self.user.roles.remove(other)
+        self.assertEqual(self.perms()[0], set())
+
+    def test_disabled(self):
+        """Test permissions are queried by every checker when the cache is disabled"""
+        with patch.object(guardian_settings, "PERMISSION_CACHE_TTL", 0):
+            self.assertEqual(self.perms(), (set(), 1))
+            self.assertEqual(self.perms(), (set(), 1))
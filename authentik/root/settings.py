@@ -157,6 +157,7 @@ PUBLIC_SCHEMA_NAME = CONFIG.get("postgresql.default_schema")
 
 GUARDIAN_GROUP_MODEL = "authentik_core.Group"
 GUARDIAN_ROLE_MODEL = "authentik_rbac.Role"
+GUARDIAN_PERMISSION_CACHE_TTL = CONFIG.get_int("cache.timeout_permissions", 300)
 
 SPECTACULAR_SETTINGS = {
     "TITLE": "authentik",
@@ -271,6 +272,17 @@ CACHES = {
         "BACKEND": "django_postgres_cache.backend.DatabaseCache",
         "KEY_FUNCTION": "django_tenants.cache.make_key",
         "REVERSE_KEY_FUNCTION": "django_tenants.cache.reverse_key",
+        "OPTIONS": {
+            "COMPRESS_MIN_LENGTH": CONFIG.get_int("cache.compress_min_length", 0),
+            "LEGACY_VALUE": CONFIG.get_bool("cache.legacy_value", True),
+            # Per-process in-memory cache in front of the database, kept coherent
+            # through LISTEN/NOTIFY, so it must listen on the direct connection
+            "LOCAL_MAX_ENTRIES": CONFIG.get_int("cache.local.max_entries", 0),
+            "LOCAL_TIMEOUT": CONFIG.get_int("cache.local.timeout", 5),
+            "LISTEN_DB_ALIAS": (
+                DIRECT_DB_ALIAS if postgresql_direct_db_enabled(CONFIG) else "default"
+            ),
+        },
     },
     # In-process cache for DRF throttle counters. Per-worker rather than
     # cluster-wide, so the per-IP ceiling is ``throttle.default`` × (pods × workers)
@@ -104,6 +104,10 @@ class LDAPSourceSerializer(SourceSerializer):
             "delete_not_found_objects",
             "sync_outgoing_trigger_mode",
             "sync_group_hierarchy",
+            "incremental_sync",
+            "full_sync_interval",
+            "last_sync",
+            "last_full_sync",
         ]
         extra_kwargs = {"bind_password": {"write_only": True}}
 
@@ -143,6 +147,7 @@ class LDAPSourceViewSet(UsedByMixin, ModelViewSet):
         "lookup_groups_from_user",
         "delete_not_found_objects",
         "sync_group_hierarchy",
+        "incremental_sync",
     ]
     search_fields = ["name", "slug"]
     ordering = ["name"]
@@ -0,0 +1,69 @@
+"""Benchmark LDAP group membership sync"""
+
+from time import perf_counter
+
+from django.db import transaction
+
+from authentik.core.models import Group, User
+from authentik.lib.generators import generate_id
+from authentik.sources.ldap.models import (
+    LDAP_DISTINGUISHED_NAME,
+    GroupLDAPSourceConnection,
+    LDAPSource,
+)
+from authentik.sources.ldap.sync.membership import MembershipLDAPSynchronizer
+from authentik.tasks.models import Task
+from authentik.tenants.management import TenantCommand
+
+
+class Command(TenantCommand):
+    """Benchmark synchronizing the membership of a large LDAP group, without connecting to an
+    LDAP server. All changes are rolled back."""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--members", type=int, default=50000, help="How many members the group has."
+        )
+
+    def handle_per_tenant(self, **options):
+        members = options["members"]
+        with transaction.atomic():
+            # Disabled, so that no synchronization is started for the source
+            source = LDAPSource.objects.create(
+                name=generate_id(),
+                slug=generate_id(),
+                base_dn="dc=goauthentik,dc=io",
+                enabled=False,
+            )
+            group = Group.objects.create(name=generate_id())
+            GroupLDAPSourceConnection.objects.create(
+                source=source, group=group, identifier=group.name
+            )
+            dns = [f"cn={generate_id()},ou=users,dc=goauthentik,dc=io" for _ in range(members)]
+            User.objects.bulk_create(
+                [User(username=dn, attributes={LDAP_DISTINGUISHED_NAME: dn}) for dn in dns],
+                batch_size=1000,
+            )
+            sync = MembershipLDAPSynchronizer(source, Task())
+            for label, group_members in (
+                ("Initial", dns),
+                ("Unchanged", dns),
+                ("Half removed", dns[: members // 2]),
+            ):
+                page = [
+                    {
+                        "dn": f"cn={group.name},ou=groups,dc=goauthentik,dc=io",
+                        "attributes": {
+                            source.object_uniqueness_field: group.name,
+                            source.group_membership_field: group_members,
+                        },
+                    }
+                ]
+                start = perf_counter()
+                sync.sync(page)
+                duration = perf_counter() - start
+                self.stdout.write(
+                    f"{label}: {len(group_members)} members, {group.users.count()} in group, "
+                    f"{duration:.2f}s"
+                )
+            transaction.set_rollback(True)
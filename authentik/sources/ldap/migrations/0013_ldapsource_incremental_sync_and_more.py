@@ -0,0 +1,51 @@
+# Generated by Django 5.2.15 on 2026-10-18 09:12
+
+import authentik.lib.utils.time
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authentik_sources_ldap", "0012_ldapsource_sync_group_parents"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="ldapsource",
+            name="full_sync_interval",
+            field=models.TextField(
+                default="hours=24",
+                help_text="When incremental synchronization is enabled, how often a full synchronization is run to pick up deleted objects and other changes which are not reflected by the modification timestamp of users and groups (Format: hours=1;minutes=2;seconds=3).",
+                validators=[authentik.lib.utils.time.timedelta_string_validator],
+            ),
+        ),
+        migrations.AddField(
+            model_name="ldapsource",
+            name="incremental_sync",
+            field=models.BooleanField(
+                default=False,
+                help_text="Only synchronize users and groups which were modified since the previous synchronization. A full synchronization is still run regularly.",
+            ),
+        ),
+        migrations.AddField(
+            model_name="ldapsource",
+            name="last_full_sync",
+            field=models.DateTimeField(
+                default=None,
+                editable=False,
+                help_text="Start of the last completed full synchronization.",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="ldapsource",
+            name="last_sync",
+            field=models.DateTimeField(
+                default=None,
+                editable=False,
+                help_text="Start of the last completed synchronization.",
+                null=True,
+            ),
+        ),
+    ]
@@ -1,5 +1,6 @@
 """authentik LDAP Models"""
 
+from datetime import datetime, timedelta
 from os import chmod
 from os.path import dirname, exists
 from shutil import rmtree
@@ -10,6 +11,7 @@ from typing import Any
 import pglock
 from django.db import connection, models
 from django.templatetags.static import static
+from django.utils.timezone import now
 from django.utils.translation import gettext_lazy as _
 from ldap3 import ALL, NONE, RANDOM, Connection, Server, ServerPool, Tls
 from ldap3.core.exceptions import (
@@ -32,13 +34,21 @@ from authentik.crypto.models import CertificateKeyPair
 from authentik.lib.config import CONFIG, advisory_lock_db_alias
 from authentik.lib.models import DomainlessURLValidator
 from authentik.lib.sync.incoming.models import IncomingSyncSource
-from authentik.lib.utils.time import fqdn_rand
+from authentik.lib.utils.time import (
+    fqdn_rand,
+    timedelta_from_string,
+    timedelta_string_validator,
+)
 from authentik.tasks.schedules.common import ScheduleSpec
 
 LDAP_TIMEOUT = 15
 LDAP_UNIQUENESS = "ldap_uniq"
 """Deprecated, don't use"""
 LDAP_DISTINGUISHED_NAME = "distinguishedName"
+LDAP_MODIFY_TIMESTAMP = "modifyTimestamp"
+# Changes are synchronized from slightly before the previous synchronization started, to account
+# for clock skew and replication delay between directory servers
+INCREMENTAL_SYNC_OVERLAP = timedelta(minutes=5)
 LOGGER = get_logger()
 
 
@@ -164,10 +174,48 @@ class LDAPSource(IncomingSyncSource):
         ),
     )
 
+    incremental_sync = models.BooleanField(
+        default=False,
+        help_text=_(
+            "Only synchronize users and groups which were modified since the previous "
+            "synchronization. A full synchronization is still run regularly."
+        ),
+    )
+    full_sync_interval = models.TextField(
+        default="hours=24",
+        validators=[timedelta_string_validator],
+        help_text=_(
+            "When incremental synchronization is enabled, how often a full synchronization is run "
+            "to pick up deleted objects and other changes which are not reflected by the "
+            "modification timestamp of users and groups (Format: hours=1;minutes=2;seconds=3)."
+        ),
+    )
+    last_sync = models.DateTimeField(
+        null=True,
+        default=None,
+        editable=False,
+        help_text=_("Start of the last completed synchronization."),
+    )
+    last_full_sync = models.DateTimeField(
+        null=True,
+        default=None,
+        editable=False,
+        help_text=_("Start of the last completed full synchronization."),
+    )
+
     @property
     def component(self) -> str:
         return "ak-source-ldap-form"
 
+    def get_changed_since(self) -> datetime | None:
+        """Get the time since which changes need to be synchronized, or None if a
+        full synchronization is due"""
+        if not self.incremental_sync or not self.last_sync or not self.last_full_sync:
+            return None
+        if self.last_full_sync + timedelta_from_string(self.full_sync_interval) <= now():
+            return None
+        return self.last_sync - INCREMENTAL_SYNC_OVERLAP
+
     @property
     def serializer(self) -> type[Serializer]:
         from authentik.sources.ldap.api.sources import LDAPSourceSerializer
@@ -2,17 +2,19 @@
 
 from typing import Any
 
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_save, pre_save
 from django.dispatch import receiver
 from django.utils.translation import gettext_lazy as _
 from ldap3.core.exceptions import LDAPOperationResult
 from rest_framework.serializers import ValidationError
 from structlog.stdlib import get_logger
 
-from authentik.core.models import User
+from authentik.core.models import Source, User
 from authentik.core.signals import password_changed
 from authentik.events.models import Event, EventAction
 from authentik.flows.planner import PLAN_CONTEXT_PENDING_USER
-from authentik.sources.ldap.models import LDAPSource
+from authentik.sources.ldap.models import LDAPSource, LDAPSourcePropertyMapping
 from authentik.sources.ldap.password import LDAPPasswordChanger
 from authentik.stages.prompt.signals import password_validate
 
@@ -61,3 +63,32 @@ def ldap_sync_password(sender, user: User, password: str, **_):
             source=source,
         ).set_user(user).save()
         raise ValidationError("Failed to set password") from exc
+
+
+@receiver(pre_save, sender=LDAPSource)
+def ldap_source_full_sync(sender, instance: LDAPSource, **_):
+    """Run a full synchronization after the source was changed, as changed settings can affect
+    objects which weren't modified in LDAP and as such aren't included in incremental syncs"""
+    instance.last_full_sync = None
+
+
+@receiver(m2m_changed, sender=Source.user_property_mappings.through)
+@receiver(m2m_changed, sender=Source.group_property_mappings.through)
+def ldap_source_mappings_full_sync(
+    sender, instance: Source | LDAPSourcePropertyMapping, action: str, pk_set: set | None, **_
+):
+    """Run a full synchronization after the property mappings of a source were changed"""
+    if action not in ["post_add", "post_remove", "post_clear"]:
+        return
+    if isinstance(instance, Source):
+        LDAPSource.objects.filter(pk=instance.pk).update(last_full_sync=None)
+    elif pk_set:
+        LDAPSource.objects.filter(pk__in=pk_set).update(last_full_sync=None)
+
+
+@receiver(post_save, sender=LDAPSourcePropertyMapping)
+def ldap_property_mapping_full_sync(sender, instance: LDAPSourcePropertyMapping, **_):
+    """Run a full synchronization after a property mapping used by a source was changed"""
+    LDAPSource.objects.filter(
+        Q(user_property_mappings=instance) | Q(group_property_mappings=instance)
+    ).update(last_full_sync=None)
@@ -1,8 +1,10 @@
 """Sync LDAP Users and groups into authentik"""
 
 from collections.abc import Generator
+from datetime import UTC, datetime
 
 from django.conf import settings
+from django.utils.functional import cached_property
 from ldap3 import DEREF_ALWAYS, SUBTREE, Connection
 from structlog.stdlib import BoundLogger, get_logger
 
@@ -11,6 +13,7 @@ from authentik.core.sources.matcher import SourceMatcher
 from authentik.lib.config import CONFIG
 from authentik.lib.sync.mapper import PropertyMappingManager
 from authentik.sources.ldap.models import (
+    LDAP_MODIFY_TIMESTAMP,
     GroupLDAPSourceConnection,
     LDAPSource,
     UserLDAPSourceConnection,
@@ -25,19 +28,25 @@ class BaseLDAPSynchronizer:
     _source: LDAPSource
     _task: Task
     _logger: BoundLogger
-    _connection: Connection
+    _changed_since: datetime | None
     mapper: SourceMapper
     manager: PropertyMappingManager
 
-    def __init__(self, source: LDAPSource, task: Task):
+    def __init__(self, source: LDAPSource, task: Task, changed_since: datetime | None = None):
         self._source = source
         self._task = task
-        self._connection = source.connection()
+        self._changed_since = changed_since
         self._logger = get_logger().bind(source=source, syncer=self.__class__.__name__)
         self.matcher = SourceMatcher(
             self._source, UserLDAPSourceConnection, GroupLDAPSourceConnection
         )
 
+    @cached_property
+    def _connection(self) -> Connection:
+        """Connection to the source, only opened when needed, as syncing a page of objects
+        doesn't always require one"""
+        return self._source.connection()
+
     @staticmethod
     def name() -> str:
         """UI name for the type of object this class synchronizes"""
@@ -74,6 +83,14 @@ class BaseLDAPSynchronizer:
         """Get objects from LDAP, implemented in subclass"""
         raise NotImplementedError()
 
+    def get_search_filter(self, object_filter: str) -> str:
+        """Restrict `object_filter` to objects modified since `changed_since`, when only changes
+        are synchronized"""
+        if not self._changed_since:
+            return object_filter
+        changed_since = self._changed_since.astimezone(UTC).strftime("%Y%m%d%H%M%S.0Z")
+        return f"(&{object_filter}({LDAP_MODIFY_TIMESTAMP}>={changed_since}))"
+
     def get_attributes(self, object):
         if "attributes" not in object:
             return
@@ -84,6 +101,26 @@ class BaseLDAPSynchronizer:
             return
         return flatten(attributes[self._source.object_uniqueness_field])
 
+    def get_connections[T: UserLDAPSourceConnection | GroupLDAPSourceConnection](
+        self, connection_type: type[T], page_data: list, related: str
+    ) -> dict[str, T]:
+        """Get existing connections of this source for all objects in `page_data` at once,
+        with their `related` object, by identifier"""
+        identifiers = []
+        for obj in page_data:
+            if not (attributes := self.get_attributes(obj)):
+                continue
+            if uniq := self.get_identifier(attributes):
+                identifiers.append(uniq)
+        connections: dict[str, T] = {}
+        for connection in (
+            connection_type.objects.filter(source=self._source, identifier__in=identifiers)
+            .select_related(related)
+            .order_by("pk")
+        ):
+            connections.setdefault(connection.identifier, connection)
+        return connections
+
     def search_paginator(  # noqa: PLR0913, PLR0917
         self,
         search_base,
@@ -1,6 +1,8 @@
 """Sync LDAP Users and groups into authentik"""
 
 from collections.abc import Generator
+from datetime import datetime
+from uuid import UUID
 
 from django.core.exceptions import FieldError
 from django.db.utils import IntegrityError
@@ -10,7 +12,7 @@ from authentik.core.expression.exceptions import (
     PropertyMappingExpressionException,
     SkipObjectException,
 )
-from authentik.core.models import Group
+from authentik.core.models import Group, GroupParentageNode
 from authentik.core.sources.mapper import SourceMapper
 from authentik.core.sources.matcher import Action
 from authentik.events.models import Event, EventAction
@@ -29,8 +31,8 @@ from authentik.tasks.models import Task
 class GroupLDAPSynchronizer(BaseLDAPSynchronizer):
     """Sync LDAP Users and groups into authentik"""
 
-    def __init__(self, source: LDAPSource, task: Task):
-        super().__init__(source, task)
+    def __init__(self, source: LDAPSource, task: Task, changed_since: datetime | None = None):
+        super().__init__(source, task, changed_since)
         self._source = source
         self.mapper = SourceMapper(source)
         self.manager = self.mapper.get_manager(Group, ["ldap", "dn"])
@@ -45,7 +47,7 @@ class GroupLDAPSynchronizer(BaseLDAPSynchronizer):
             return iter(())
         return self.search_paginator(
             search_base=self.base_dn_groups,
-            search_filter=self._source.group_object_filter,
+            search_filter=self.get_search_filter(self._source.group_object_filter),
             search_scope=SUBTREE,
             attributes=[
                 ALL_ATTRIBUTES,
@@ -55,12 +57,34 @@ class GroupLDAPSynchronizer(BaseLDAPSynchronizer):
             **kwargs,
         )
 
+    def get_action(
+        self, connections: dict[str, GroupLDAPSourceConnection], uniq: str, defaults: dict
+    ) -> tuple[Action, GroupLDAPSourceConnection | None]:
+        """Use the existing connection for `uniq` if there is one, otherwise let the matcher
+        decide how to handle the group"""
+        if connection := connections.get(uniq):
+            return Action.AUTH, connection
+        return self.matcher.get_group_action(uniq, defaults)
+
+    def get_group_parents(
+        self, connections: dict[str, GroupLDAPSourceConnection]
+    ) -> dict[UUID, set[UUID]]:
+        """Get the parents of all existing groups, to only add parents which are missing"""
+        group_parents: dict[UUID, set[UUID]] = {}
+        for child, parent in GroupParentageNode.objects.filter(
+            child__in=[connection.group_id for connection in connections.values()]
+        ).values_list("child", "parent"):
+            group_parents.setdefault(child, set()).add(parent)
+        return group_parents
+
     def sync(self, page_data: list) -> int:
         """Iterate over all LDAP Groups and create authentik_core.Group instances"""
         if not self._source.sync_groups:
             self._task.info("Group syncing is disabled for this Source")
             return -1
         group_count = 0
+        connections = self.get_connections(GroupLDAPSourceConnection, page_data, "group")
+        group_parents = self.get_group_parents(connections)
         for group_data in page_data:
             if (attributes := self.get_attributes(group_data)) is None:
                 continue
@@ -87,10 +111,9 @@ class GroupLDAPSynchronizer(BaseLDAPSynchronizer):
                 if "name" not in defaults:
                     raise IntegrityError("Name was not set by propertymappings")
                 # Special check for `users` field, as this is an M2M relation, and cannot be sync'd
-                if "users" in defaults:
-                    del defaults["users"]
+                defaults.pop("users", None)
                 parent = defaults.pop("parent", None)
-                action, connection = self.matcher.get_group_action(uniq, defaults)
+                action, connection = self.get_action(connections, uniq, defaults)
 
                 created = False
                 if action == Action.ENROLL:
@@ -122,7 +145,7 @@ class GroupLDAPSynchronizer(BaseLDAPSynchronizer):
                 elif action == Action.DENY:
                     continue
 
-                if parent:
+                if parent and parent.pk not in group_parents.get(group.pk, ()):
                     group.parents.add(parent)
                 self._logger.debug("Created group with attributes", **defaults)
             except SkipObjectException:
@@ -1,13 +1,15 @@
 """Sync LDAP Users and groups into authentik"""
 
 from collections.abc import Generator
+from datetime import datetime
 from typing import Any
+from uuid import UUID
 
-from django.db.models import Q
+from django.db.models.fields.json import KT
 from ldap3 import SUBTREE
 from ldap3.utils.conv import escape_filter_chars
 
-from authentik.core.models import Group, User
+from authentik.core.models import Group, User, UserGroup, deferred_group_ancestry
 from authentik.sources.ldap.models import (
     LDAP_DISTINGUISHED_NAME,
     GroupLDAPSourceConnection,
@@ -22,8 +24,8 @@ class BaseMembershipLDAPSynchronizer(BaseLDAPSynchronizer):
 
     group_cache: dict[str, Group]
 
-    def __init__(self, source: LDAPSource, task: Task):
-        super().__init__(source, task)
+    def __init__(self, source: LDAPSource, task: Task, changed_since: datetime | None = None):
+        super().__init__(source, task, changed_since)
         self.group_cache: dict[str, Group] = {}
 
     @staticmethod
@@ -83,55 +85,93 @@ class MembershipLDAPSynchronizer(BaseMembershipLDAPSynchronizer):
 
         return self.search_paginator(
             search_base=self.base_dn_groups,
-            search_filter=self._source.group_object_filter,
+            search_filter=self.get_search_filter(self._source.group_object_filter),
             search_scope=SUBTREE,
             attributes=attributes,
             **kwargs,
         )
 
+    def get_members(self, group_data: dict[str, Any]) -> list[str] | None:
+        """Get the values of `user_membership_attribute` of all members of a group"""
+        if self._source.lookup_groups_from_user:
+            group_dn = group_data.get("dn", {})
+            escaped_dn = escape_filter_chars(group_dn)
+            group_filter = f"({self._source.group_membership_field}={escaped_dn})"
+            group_members = self._connection.extend.standard.paged_search(
+                search_base=self.base_dn_users,
+                search_filter=group_filter,
+                search_scope=SUBTREE,
+                attributes=[self._source.object_uniqueness_field],
+            )
+            return [group_member.get("dn", {}) for group_member in group_members]
+        if (attributes := self.get_attributes(group_data)) is None:
+            return None
+        return attributes.get(self._source.group_membership_field, [])
+
+    def get_member_pks(self, members: set[str]) -> dict[str, set[int]]:
+        """Get the primary keys of all users by their `user_membership_attribute` value"""
+        attribute = self._source.user_membership_attribute
+        member_pks: dict[str, set[int]] = {}
+        for member, pk in (
+            User.objects.filter(**{f"attributes__{attribute}__in": members})
+            .annotate(member=KT(f"attributes__{attribute}"))
+            .values_list("member", "pk")
+        ):
+            member_pks.setdefault(member, set()).add(pk)
+        return member_pks
+
+    def set_members(self, group: Group, members: set[int], current: set[int]) -> int:
+        """Change the members of `group` from `current` to `members`, and return how many
+        members the group has.
+
+        Current members which don't have `user_membership_attribute`, and as such weren't
+        synchronized from a source, are kept."""
+        removed = set()
+        if stale := current - members:
+            removed = set(
+                User.objects.filter(
+                    pk__in=stale,
+                    **{f"attributes__{self._source.user_membership_attribute}__isnull": False},
+                ).values_list("pk", flat=True)
+            )
+        if added := members - current:
+            group.users.add(*added)
+        if removed:
+            group.users.remove(*removed)
+        return len(members | (current - removed))
+
     def sync(self, page_data: list) -> int:
         """Iterate over all Users and assign Groups using memberOf Field"""
         if not self._source.sync_groups:
             self._task.info("Group syncing is disabled for this Source")
             return -1
-        membership_count = 0
+        group_members: list[tuple[Group, list[str]]] = []
         for group_data in page_data:
-            if self._source.lookup_groups_from_user:
-                group_dn = group_data.get("dn", {})
-                escaped_dn = escape_filter_chars(group_dn)
-                group_filter = f"({self._source.group_membership_field}={escaped_dn})"
-                group_members = self._source.connection().extend.standard.paged_search(
-                    search_base=self.base_dn_users,
-                    search_filter=group_filter,
-                    search_scope=SUBTREE,
-                    attributes=[self._source.object_uniqueness_field],
-                )
-                members = []
-                for group_member in group_members:
-                    group_member_dn = group_member.get("dn", {})
-                    members.append(group_member_dn)
-            else:
-                if (attributes := self.get_attributes(group_data)) is None:
-                    continue
-                members = attributes.get(self._source.group_membership_field, [])
-
+            if (members := self.get_members(group_data)) is None:
+                continue
             group = self.get_group(group_data)
             if not group:
                 continue
+            group_members.append((group, members))
 
-            users = User.objects.filter(
-                Q(**{f"attributes__{self._source.user_membership_attribute}__in": members})
-                | Q(
-                    **{
-                        f"attributes__{self._source.user_membership_attribute}__isnull": True,
-                        "groups__in": [group],
-                    }
-                )
-            ).distinct()
+        # Resolve members and current memberships of all groups at once
+        member_pks = self.get_member_pks(
+            {member for _, members in group_members for member in members}
+        )
+        current_members: dict[UUID, set[int]] = {}
+        for group_pk, user_pk in UserGroup.objects.filter(
+            group__in=[group for group, _ in group_members]
+        ).values_list("group", "user"):
+            current_members.setdefault(group_pk, set()).add(user_pk)
+
+        membership_count = 0
+        for group, members in group_members:
             membership_count += 1
-            membership_count += users.count()
-            group.users.set(users)
-            group.save()
+            membership_count += self.set_members(
+                group,
+                {pk for member in members for pk in member_pks.get(member, ())},
+                current_members.get(group.pk, set()),
+            )
         self._logger.debug("Successfully updated group membership")
         return membership_count
 
@@ -160,7 +200,7 @@ class GroupHierarchyLDAPSynchronizer(BaseMembershipLDAPSynchronizer):
 
         return self.search_paginator(
             search_base=self.base_dn_groups,
-            search_filter=self._source.group_object_filter,
+            search_filter=self.get_search_filter(self._source.group_object_filter),
             search_scope=SUBTREE,
             attributes=attributes,
             **kwargs,
@@ -175,44 +215,50 @@ class GroupHierarchyLDAPSynchronizer(BaseMembershipLDAPSynchronizer):
             self._task.info("Group hierarchy syncing is disabled for this Source")
             return -1
         count = 0
-        for group_data in page_data:
-            if (attributes := self.get_attributes(group_data)) is None:
-                continue
-            group = self.get_group(group_data)
-            if not group:
-                continue
+        # Rebuild group ancestry once per page if it changed, instead of for every changed parent
+        with deferred_group_ancestry():
+            for group_data in page_data:
+                if (attributes := self.get_attributes(group_data)) is None:
+                    continue
+                group = self.get_group(group_data)
+                if not group:
+                    continue
 
-            # Deliberately WET
-            if self._source.lookup_groups_from_user:
-                parents_from_source_raw = attributes.get(self._source.group_membership_field, [])
-                parents_from_source = Group.objects.filter(
-                    **{
-                        (
-                            "attributes__" f"{self._source.user_membership_attribute}__in"
-                        ): parents_from_source_raw
-                    }
-                )
-                parents_not_from_source = group.parents.exclude(
-                    groupsourceconnection__source=self._source
-                )
+                # Deliberately WET
+                if self._source.lookup_groups_from_user:
+                    parents_from_source_raw = attributes.get(
+                        self._source.group_membership_field, []
+                    )
+                    parents_from_source = Group.objects.filter(
+                        **{
+                            (
+                                "attributes__" f"{self._source.user_membership_attribute}__in"
+                            ): parents_from_source_raw
+                        }
+                    )
+                    parents_not_from_source = group.parents.exclude(
+                        groupsourceconnection__source=self._source
+                    )
 
-                count = len(parents_from_source)
-                group.parents.set(parents_from_source.union(parents_not_from_source))
-            else:
-                children_from_source_raw = attributes.get(self._source.group_membership_field, [])
-                children_from_source = Group.objects.filter(
-                    **{
-                        (
-                            "attributes__" f"{self._source.user_membership_attribute}__in"
-                        ): children_from_source_raw
-                    }
-                )
-                children_not_from_source = group.children.exclude(
-                    groupsourceconnection__source=self._source
-                )
+                    count = len(parents_from_source)
+                    group.parents.set(parents_from_source.union(parents_not_from_source))
+                else:
+                    children_from_source_raw = attributes.get(
+                        self._source.group_membership_field, []
+                    )
+                    children_from_source = Group.objects.filter(
+                        **{
+                            (
+                                "attributes__" f"{self._source.user_membership_attribute}__in"
+                            ): children_from_source_raw
+                        }
+                    )
+                    children_not_from_source = group.children.exclude(
+                        groupsourceconnection__source=self._source
+                    )
 
-                count = len(children_from_source)
-                group.children.set(children_from_source.union(children_not_from_source))
+                    count = len(children_from_source)
+                    group.children.set(children_from_source.union(children_not_from_source))
 
         self._logger.debug("Successfully updated group hierarchy")
         return count
@@ -1,6 +1,7 @@
 """Sync LDAP Users into authentik"""
 
 from collections.abc import Generator
+from datetime import datetime
 
 from django.core.exceptions import FieldError
 from django.db.utils import IntegrityError
@@ -31,8 +32,8 @@ from authentik.tasks.models import Task
 class UserLDAPSynchronizer(BaseLDAPSynchronizer):
     """Sync LDAP Users into authentik"""
 
-    def __init__(self, source: LDAPSource, task: Task):
-        super().__init__(source, task)
+    def __init__(self, source: LDAPSource, task: Task, changed_since: datetime | None = None):
+        super().__init__(source, task, changed_since)
         self.mapper = SourceMapper(source)
         self.manager = self.mapper.get_manager(User, ["ldap", "dn"])
 
@@ -46,7 +47,7 @@ class UserLDAPSynchronizer(BaseLDAPSynchronizer):
             return iter(())
         return self.search_paginator(
             search_base=self.base_dn_users,
-            search_filter=self._source.user_object_filter,
+            search_filter=self.get_search_filter(self._source.user_object_filter),
             search_scope=SUBTREE,
             attributes=[
                 ALL_ATTRIBUTES,
@@ -56,6 +57,15 @@ class UserLDAPSynchronizer(BaseLDAPSynchronizer):
             **kwargs,
         )
 
+    def get_action(
+        self, connections: dict[str, UserLDAPSourceConnection], uniq: str, defaults: dict
+    ) -> tuple[Action, UserLDAPSourceConnection | None]:
+        """Use the existing connection for `uniq` if there is one, otherwise let the matcher
+        decide how to handle the user"""
+        if connection := connections.get(uniq):
+            return Action.AUTH, connection
+        return self.matcher.get_user_action(uniq, defaults)
+
     def sync(self, page_data: list) -> int:
         """Iterate over all LDAP Users and create authentik_core.User instances"""
         if not self._source.sync_users:
@@ -65,6 +75,7 @@ class UserLDAPSynchronizer(BaseLDAPSynchronizer):
 
         ms_ad_syncer = MicrosoftActiveDirectory(self._source, self._task)
         freeipa_syncer = FreeIPA(self._source, self._task)
+        connections = self.get_connections(UserLDAPSourceConnection, page_data, "user")
 
         for user in page_data:
             if (attributes := self.get_attributes(user)) is None:
@@ -92,7 +103,7 @@ class UserLDAPSynchronizer(BaseLDAPSynchronizer):
                 self._logger.debug("Writing user with attributes", **defaults)
                 if "username" not in defaults:
                     raise IntegrityError("Username was not set by propertymappings")
-                action, connection = self.matcher.get_user_action(uniq, defaults)
+                action, connection = self.get_action(connections, uniq, defaults)
                 created = False
                 if action == Action.ENROLL:
                     # Legacy fallback, in case the user only has an `ldap_uniq` attribute set, but
@@ -1,11 +1,16 @@
 """LDAP Sync tasks"""
 
+from collections import deque
+from collections.abc import Generator, Iterable
+from datetime import datetime
+from itertools import chain
+from typing import Any
 from uuid import uuid4
 
 from django.core.cache import cache
+from django.utils.timezone import now
 from django.utils.translation import gettext_lazy as _
 from dramatiq.actor import actor
-from dramatiq.composition import group
 from dramatiq.message import Message
 from ldap3.core.exceptions import LDAPException
 from structlog.stdlib import get_logger
@@ -36,7 +41,9 @@ SYNC_CLASSES: list[type[BaseLDAPSynchronizer]] = [
     MembershipLDAPSynchronizer,
     GroupHierarchyLDAPSynchronizer,
 ]
-CACHE_KEY_PREFIX = "goauthentik.io/sources/ldap/page/"
+# Parts of LDAP search results which are used to synchronize objects. Notably, this excludes
+# `raw_attributes`, which contain all of `attributes` again as bytes.
+PAGE_ENTRY_KEYS = ("dn", "entryDN", "attributes")
 CACHE_KEY_STATUS = "goauthentik.io/sources/ldap/status/"
 
 
@@ -70,28 +77,22 @@ def ldap_sync(source_pk: str):
             LOGGER.debug("Failed to acquire lock for LDAP sync, skipping task", source=source.slug)
             return
 
-        user_group_tasks = group(
-            ldap_sync_paginator(task, source, UserLDAPSynchronizer)
-            + ldap_sync_paginator(task, source, GroupLDAPSynchronizer)
-        )
-
-        membership_tasks = group(
-            ldap_sync_paginator(task, source, MembershipLDAPSynchronizer)
-            + ldap_sync_paginator(task, source, GroupHierarchyLDAPSynchronizer)
-        )
-
-        deletion_tasks = group(
-            ldap_sync_paginator(task, source, UserLDAPForwardDeletion)
-            + ldap_sync_paginator(task, source, GroupLDAPForwardDeletion),
-        )
+        started = now()
+        # Only fetch objects which were modified since the last synchronization, unless
+        # incremental synchronization is disabled or a full synchronization is due
+        changed_since = source.get_changed_since()
+        if changed_since:
+            task.info(f"Synchronizing changes since {changed_since.isoformat()}")
 
         # User and group sync can happen at once, they have no dependencies on each other
-        user_group_tasks.run().wait(
-            timeout=60 * 60 * CONFIG.get_int("ldap.task_timeout_hours") * 1000
+        ldap_sync_pages(
+            ldap_sync_paginator(task, source, UserLDAPSynchronizer, changed_since),
+            ldap_sync_paginator(task, source, GroupLDAPSynchronizer, changed_since),
         )
         # Membership sync needs to run afterwards
-        membership_tasks.run().wait(
-            timeout=60 * 60 * CONFIG.get_int("ldap.task_timeout_hours") * 1000
+        ldap_sync_pages(
+            ldap_sync_paginator(task, source, MembershipLDAPSynchronizer, changed_since),
+            ldap_sync_paginator(task, source, GroupHierarchyLDAPSynchronizer, changed_since),
         )
         # Finally, deletions. What we'd really like to do here is something like
         # ```
@@ -108,8 +109,15 @@ def ldap_sync(source_pk: str):
         #    large chunks, and only queue the deletion step afterwards.
         # 3. Delete every unmarked item. This is slow, so we spread it over many tasks in
         #    small chunks.
-        deletion_tasks.run().wait(
-            timeout=60 * 60 * CONFIG.get_int("ldap.task_timeout_hours") * 1000,
+        # Finding deleted objects requires all objects, so only do so for full synchronizations
+        if not changed_since:
+            ldap_sync_pages(
+                ldap_sync_paginator(task, source, UserLDAPForwardDeletion),
+                ldap_sync_paginator(task, source, GroupLDAPForwardDeletion),
+            )
+        # Update without saving the source, as that would trigger another synchronization
+        LDAPSource.objects.filter(pk=source.pk).update(
+            last_sync=started, **({} if changed_since else {"last_full_sync": started})
         )
 
     if source.sync_outgoing_trigger_mode == SyncOutgoingTriggerMode.DEFERRED_END:
@@ -118,30 +126,61 @@ def ldap_sync(source_pk: str):
                 provider.sync_dispatch()
 
 
+def ldap_sync_pages(*paginators: Iterable[Message]):
+    """Enqueue page synchronization tasks while their pages are fetched, and wait for all of
+    them to finish. At most `ldap.max_in_flight_pages` pages are queued or being synchronized
+    at the same time, after which fetching the next page waits for the oldest page."""
+    timeout = 60 * 60 * CONFIG.get_int("ldap.task_timeout_hours") * 1000
+    max_in_flight = max(CONFIG.get_int("ldap.max_in_flight_pages"), 1)
+    in_flight: deque[Message] = deque()
+    for message in chain(*paginators):
+        if len(in_flight) >= max_in_flight:
+            in_flight.popleft().get_result(block=True, timeout=timeout)
+        in_flight.append(ldap_sync_page.broker.enqueue(message))
+    for message in in_flight:
+        message.get_result(block=True, timeout=timeout)
+
+
 def ldap_sync_paginator(
-    task: Task, source: LDAPSource, sync: type[BaseLDAPSynchronizer]
-) -> list[Message]:
-    """Return a list of task signatures with LDAP pagination data"""
-    sync_inst: BaseLDAPSynchronizer = sync(source, task)
-    messages = []
+    task: Task,
+    source: LDAPSource,
+    sync: type[BaseLDAPSynchronizer],
+    changed_since: datetime | None = None,
+) -> Generator[Message]:
+    """Fetch LDAP pages one by one, and yield a task message with the data of each page"""
+    sync_inst: BaseLDAPSynchronizer = sync(source, task, changed_since)
+    changed = 0
     for page in sync_inst.get_objects():
-        page_uid = str(uuid4())
-        page_cache_key = CACHE_KEY_PREFIX + page_uid
-        cache.set(page_cache_key, page, 60 * 60 * CONFIG.get_int("ldap.task_timeout_hours"))
-        page_sync = ldap_sync_page.message_with_options(
-            args=(source.pk, class_to_path(sync), page_cache_key),
+        changed += len(page)
+        yield ldap_sync_page.message_with_options(
+            args=(source.pk, class_to_path(sync), compact_page(page)),
             rel_obj=task.rel_obj,
-            uid=f"{source.slug}:{sync_inst.name()}:{page_uid}",
+            uid=f"{source.slug}:{sync_inst.name()}:{uuid4()}",
         )
-        messages.append(page_sync)
-    return messages
+    if changed_since:
+        task.info(f"Found {changed} changed objects for {sync_inst.name()}")
+
+
+def compact_page(page: Iterable[Any]) -> list[Any]:
+    """Only keep the parts of LDAP search results which are required for synchronization, as
+    pages are stored in the task queue until they are synchronized. Pages which don't contain
+    search results, such as primary keys of objects to delete, are kept as-is."""
+    compacted = []
+    for entry in page:
+        if not isinstance(entry, dict):
+            compacted.append(entry)
+            continue
+        if "attributes" not in entry:
+            continue
+        compacted.append({key: entry[key] for key in PAGE_ENTRY_KEYS if key in entry})
+    return compacted
 
 
 @actor(
     time_limit=60 * 60 * CONFIG.get_int("ldap.task_timeout_hours") * 1000,
     description=_("Sync page for LDAP source."),
 )
-def ldap_sync_page(source_pk: str, sync_class: str, page_cache_key: str):
+def ldap_sync_page(source_pk: str, sync_class: str, page: list):
     """Synchronization of an LDAP Source"""
     self = CurrentTask.get_task()
     source: LDAPSource = LDAPSource.objects.filter(pk=source_pk).first()
@@ -152,23 +191,12 @@ def ldap_sync_page(source_pk: str, sync_class: str, page_cache_key: str):
     sync: type[BaseLDAPSynchronizer] = path_to_class(sync_class)
     try:
         sync_inst: BaseLDAPSynchronizer = sync(source, self)
-        page = cache.get(page_cache_key)
-        if not page:
-            error_message = (
-                f"Could not find page in cache: {page_cache_key}. "
-                + "Try increasing ldap.task_timeout_hours"
-            )
-            LOGGER.warning(error_message)
-            self.error(error_message)
-            return
-        cache.touch(page_cache_key)
         if source.sync_outgoing_trigger_mode == SyncOutgoingTriggerMode.IMMEDIATE:
             count = sync_inst.sync(page)
         else:
             with sync_outgoing_inhibit_dispatch():
                 count = sync_inst.sync(page)
         self.info(f"Synced {count} objects.")
-        cache.delete(page_cache_key)
     except (LDAPException, StopSync) as exc:
         # No explicit event is created here as .error will do that
         LOGGER.warning("Failed to sync LDAP", exc=exc, source=source)
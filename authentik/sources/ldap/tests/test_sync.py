@@ -1,9 +1,13 @@
 """LDAP Source tests"""
 
+from datetime import UTC, timedelta
 from unittest.mock import MagicMock, patch
 
+from django.db import connection as db_connection
 from django.db.models import Q
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import now
 from ldap3.core.exceptions import LDAPInvalidFilterError
 from ldap3.utils.conv import escape_filter_chars
 
@@ -11,6 +15,7 @@ from authentik.blueprints.tests import apply_blueprint
 from authentik.core.models import Group, Session, User
 from authentik.core.tests.utils import create_test_admin_user, create_test_session
 from authentik.events.models import Event, EventAction
+from authentik.lib.config import CONFIG
 from authentik.lib.generators import generate_id, generate_key
 from authentik.lib.sync.outgoing.exceptions import StopSync
 from authentik.lib.utils.reflection import class_to_path
@@ -27,7 +32,7 @@ from authentik.sources.ldap.sync.membership import (
     MembershipLDAPSynchronizer,
 )
 from authentik.sources.ldap.sync.users import UserLDAPSynchronizer
-from authentik.sources.ldap.tasks import ldap_sync, ldap_sync_page
+from authentik.sources.ldap.tasks import compact_page, ldap_sync, ldap_sync_page
 from authentik.sources.ldap.tests.mock_ad import mock_ad_connection
 from authentik.sources.ldap.tests.mock_freeipa import mock_freeipa_connection
 from authentik.sources.ldap.tests.mock_slapd import (
@@ -55,11 +60,53 @@ class LDAPSyncTests(TestCase):
             additional_group_dn="ou=groups",
         )
 
-    def test_sync_missing_page(self):
-        """Test sync with missing page"""
+    def test_sync_empty_page(self):
+        """Test sync with empty page"""
         connection = MagicMock(return_value=mock_ad_connection())
         with patch("authentik.sources.ldap.models.LDAPSource.connection", connection):
-            ldap_sync_page.send(self.source.pk, class_to_path(UserLDAPSynchronizer), "foo")
+            ldap_sync_page.send(self.source.pk, class_to_path(UserLDAPSynchronizer), [])
+
+    def test_compact_page(self):
+        """Test only required parts of search results are kept in pages"""
+        page = [
+            {
+                "dn": "cn=foo,dc=goauthentik,dc=io",
+                "raw_dn": b"cn=foo,dc=goauthentik,dc=io",
+                "attributes": {"cn": "foo"},
+                "raw_attributes": {"cn": [b"foo"]},
+                "type": "searchResEntry",
+            },
+            {"uri": ["ldap://goauthentik.io/dc=goauthentik,dc=io"], "type": "searchResRef"},
+        ]
+        self.assertEqual(
+            compact_page(page),
+            [{"dn": "cn=foo,dc=goauthentik,dc=io", "attributes": {"cn": "foo"}}],
+        )
+        self.assertEqual(compact_page((1, 2)), [1, 2])
+
+    @CONFIG.patch("ldap.page_size", 1)
+    @CONFIG.patch("ldap.max_in_flight_pages", 1)
+    def test_sync_streaming(self):
+        """Test sync with pages synchronized while further pages are fetched"""
+        self.source.object_uniqueness_field = "uid"
+        self.source.group_object_filter = "(objectClass=groupOfNames)"
+        self.source.user_property_mappings.set(
+            LDAPSourcePropertyMapping.objects.filter(
+                Q(managed__startswith="goauthentik.io/sources/ldap/default")
+                | Q(managed__startswith="goauthentik.io/sources/ldap/openldap")
+            )
+        )
+        self.source.group_property_mappings.set(
+            LDAPSourcePropertyMapping.objects.filter(
+                managed="goauthentik.io/sources/ldap/openldap-cn"
+            )
+        )
+        self.source.save()
+        connection = MagicMock(return_value=mock_slapd_connection(LDAP_PASSWORD))
+        with patch("authentik.sources.ldap.models.LDAPSource.connection", connection):
+            ldap_sync.send(self.source.pk)
+        self.assertTrue(User.objects.filter(username="user0_sn").exists())
+        self.assertTrue(Group.objects.filter(name="group1").exists())
 
     def test_sync_error(self):
         """Test user sync"""
@@ -236,6 +283,39 @@ class LDAPSyncTests(TestCase):
             self.assertTrue(User.objects.filter(username="user0_sn").exists())
             self.assertFalse(User.objects.filter(username="user1_sn").exists())
 
+    def test_sync_users_unchanged(self):
+        """Test users are looked up once per page, and not written again when unchanged"""
+        self.source.object_uniqueness_field = "uid"
+        # Exclude duplicate users, which update the same user with alternating attributes
+        self.source.user_object_filter = "(&(objectClass=person)(!(uid=unique-test2222)))"
+        self.source.user_property_mappings.set(
+            LDAPSourcePropertyMapping.objects.filter(
+                Q(managed__startswith="goauthentik.io/sources/ldap/default")
+                | Q(managed__startswith="goauthentik.io/sources/ldap/openldap")
+            )
+        )
+        connection = MagicMock(return_value=mock_slapd_connection(LDAP_PASSWORD))
+        with patch("authentik.sources.ldap.models.LDAPSource.connection", connection):
+            user_sync = UserLDAPSynchronizer(self.source, Task())
+            user_sync.sync_full()
+            page = next(user_sync.get_objects())
+            with CaptureQueriesContext(db_connection) as queries:
+                self.assertGreater(user_sync.sync(page), 0)
+        connection_queries = [
+            query["sql"]
+            for query in queries.captured_queries
+            if "authentik_sources_ldap_userldapsourceconnection" in query["sql"]
+        ]
+        self.assertEqual(len(connection_queries), 1)
+        self.assertFalse(
+            [
+                query["sql"]
+                for query in queries.captured_queries
+                if query["sql"].startswith(("INSERT", "UPDATE"))
+                and "authentik_core_user" in query["sql"]
+            ]
+        )
+
     def test_sync_users_freeipa_ish(self):
         """Test user sync (FreeIPA-ish), mainly testing vendor quirks"""
         self.source.object_uniqueness_field = "uid"
@@ -727,6 +807,135 @@ class LDAPSyncTests(TestCase):
         self.assertFalse(User.objects.filter(username__startswith="not-in-the-source").exists())
         self.assertFalse(Group.objects.filter(name__startswith="not-in-the-source").exists())
 
+    def test_sync_incremental(self):
+        """Test incremental sync only synchronizes modified objects, and doesn't delete objects"""
+        self.source.object_uniqueness_field = "uid"
+        self.source.group_object_filter = "(objectClass=groupOfNames)"
+        self.source.user_property_mappings.set(
+            LDAPSourcePropertyMapping.objects.filter(
+                Q(managed__startswith="goauthentik.io/sources/ldap/default")
+                | Q(managed__startswith="goauthentik.io/sources/ldap/openldap")
+            )
+        )
+        self.source.delete_not_found_objects = True
+        self.source.incremental_sync = True
+        self.source.save()
+        user = User.objects.create_user(username="not-in-the-source")
+        UserLDAPSourceConnection.objects.create(
+            user=user, source=self.source, identifier="not-in-the-source"
+        )
+        last_sync = now() - timedelta(hours=1)
+        LDAPSource.objects.filter(pk=self.source.pk).update(
+            last_sync=last_sync, last_full_sync=last_sync
+        )
+
+        mock_connection = mock_slapd_connection(LDAP_PASSWORD)
+        mock_connection.strategy.add_entry(
+            "cn=user-changed,ou=users,dc=goauthentik,dc=io",
+            {
+                "name": "user-changed",
+                "uid": "user-changed",
+                "objectClass": "person",
+                "modifyTimestamp": now().astimezone(UTC).strftime("%Y%m%d%H%M%S.0Z"),
+            },
+        )
+        connection = MagicMock(return_value=mock_connection)
+        with patch("authentik.sources.ldap.models.LDAPSource.connection", connection):
+            ldap_sync.send(self.source.pk)
+        self.assertTrue(User.objects.filter(username="user-changed").exists())
+        self.assertFalse(User.objects.filter(username="user0_sn").exists())
+        self.assertTrue(User.objects.filter(username="not-in-the-source").exists())
+        self.source.refresh_from_db()
+        self.assertGreater(self.source.last_sync, last_sync)
+        self.assertEqual(self.source.last_full_sync, last_sync)
+
+    def test_sync_incremental_source_changed(self):
+        """Test a full sync is run after the source or its property mappings were changed"""
+        mapping = LDAPSourcePropertyMapping.objects.create(
+            name=generate_id(), expression="return {}"
+        )
+        self.source.incremental_sync = True
+        self.source.save()
+        self.source.user_property_mappings.add(mapping)
+
+        def synced():
+            last_sync = now() - timedelta(minutes=10)
+            LDAPSource.objects.filter(pk=self.source.pk).update(
+                last_sync=last_sync, last_full_sync=last_sync
+            )
+            self.source.refresh_from_db()
+            self.assertIsNotNone(self.source.get_changed_since())
+
+        synced()
+        self.source.user_object_filter = "(objectClass=inetOrgPerson)"
+        self.source.save()
+        self.source.refresh_from_db()
+        self.assertIsNone(self.source.get_changed_since())
+
+        synced()
+        self.source.group_property_mappings.add(mapping)
+        self.source.refresh_from_db()
+        self.assertIsNone(self.source.get_changed_since())
+
+        synced()
+        mapping.expression = "return {'name': 'foo'}"
+        mapping.save()
+        self.source.refresh_from_db()
+        self.assertIsNone(self.source.get_changed_since())
+
+    def test_sync_incremental_full(self):
+        """Test a full sync is run when incremental sync is due for one"""
+        self.source.incremental_sync = True
+        self.source.full_sync_interval = "hours=1"
+        self.source.last_sync = now() - timedelta(minutes=10)
+        self.source.last_full_sync = now() - timedelta(minutes=30)
+        self.assertEqual(
+            self.source.get_changed_since(), self.source.last_sync - timedelta(minutes=5)
+        )
+        self.source.last_full_sync = now() - timedelta(hours=2)
+        self.assertIsNone(self.source.get_changed_since())
+        self.source.last_full_sync = None
+        self.assertIsNone(self.source.get_changed_since())
+
+    def test_sync_membership_changes(self):
+        """Test membership sync adds and removes members, and keeps members which weren't
+        synchronized from a source"""
+        group = Group.objects.create(name=generate_id())
+        GroupLDAPSourceConnection.objects.create(
+            group=group, source=self.source, identifier=group.name
+        )
+        member = User.objects.create(
+            username=generate_id(),
+            attributes={"distinguishedName": "cn=member,ou=users,dc=goauthentik,dc=io"},
+        )
+        removed = User.objects.create(
+            username=generate_id(),
+            attributes={"distinguishedName": "cn=removed,ou=users,dc=goauthentik,dc=io"},
+        )
+        local = User.objects.create(username=generate_id())
+        group.users.add(removed, local)
+        page = [
+            {
+                "dn": f"cn={group.name},ou=groups,dc=goauthentik,dc=io",
+                "attributes": {
+                    "objectSid": group.name,
+                    "member": ["cn=member,ou=users,dc=goauthentik,dc=io"],
+                },
+            }
+        ]
+        membership_sync = MembershipLDAPSynchronizer(self.source, Task())
+        self.assertEqual(membership_sync.sync(page), 3)
+        self.assertEqual(set(group.users.all()), {member, local})
+        with CaptureQueriesContext(db_connection) as queries:
+            self.assertEqual(membership_sync.sync(page), 3)
+        self.assertFalse(
+            [
+                query["sql"]
+                for query in queries.captured_queries
+                if query["sql"].startswith(("INSERT", "UPDATE", "DELETE"))
+            ]
+        )
+
     def test_membership_sync_special_chars_in_group_dn(self):
         """Test membership synchronization with special characters in group DN"""
         self.source.object_uniqueness_field = "uid"
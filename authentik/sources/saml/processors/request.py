@@ -16,6 +16,7 @@ from authentik.common.saml.constants import (
     SAML_BINDING_POST,
     SIGN_ALGORITHM_TRANSFORM_MAP,
 )
+from authentik.common.saml.keys import get_signing_key
 from authentik.lib.xml import remove_xml_newlines
 from authentik.providers.saml.utils import get_random_id
 from authentik.providers.saml.utils.encoding import deflate_and_base64_encode
@@ -98,14 +99,7 @@ class RequestProcessor:
 
             ctx = xmlsec.SignatureContext()
 
-            key = xmlsec.Key.from_memory(
-                self.source.signing_kp.key_data, xmlsec.constants.KeyDataFormatPem, None
-            )
-            key.load_cert_from_memory(
-                self.source.signing_kp.certificate_data,
-                xmlsec.constants.KeyDataFormatCertPem,
-            )
-            ctx.key = key
+            ctx.key = get_signing_key(self.source.signing_kp)
 
             digest_algorithm_transform = DIGEST_ALGORITHM_TRANSLATION_MAP.get(
                 self.source.digest_algorithm, xmlsec.constants.TransformSha1
@@ -154,14 +148,7 @@ class RequestProcessor:
 
             ctx = xmlsec.SignatureContext()
 
-            key = xmlsec.Key.from_memory(
-                self.source.signing_kp.key_data, xmlsec.constants.KeyDataFormatPem, None
-            )
-            key.load_cert_from_memory(
-                self.source.signing_kp.certificate_data,
-                xmlsec.constants.KeyDataFormatPem,
-            )
-            ctx.key = key
+            ctx.key = get_signing_key(self.source.signing_kp)
 
             signature = ctx.sign_binary(querystring.encode("utf-8"), sign_algorithm_transform)
             response_dict["Signature"] = b64encode(signature).decode()
@@ -82,9 +82,12 @@ def post_fork(server: "Arbiter", worker: DjangoUvicornWorker):  # noqa: UP037
 
 
 def worker_exit(server: "Arbiter", worker: DjangoUvicornWorker):  # noqa: UP037
-    """Remove pid dbs when worker is shutdown"""
+    """Write queued events and remove pid dbs when worker is shutdown"""
     from prometheus_client import multiprocess
 
+    from authentik.events.buffer import EVENT_BUFFER
+
+    EVENT_BUFFER.flush()
     multiprocess.mark_process_dead(worker._worker_id)
 
 
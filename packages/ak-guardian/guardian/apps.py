@@ -1,5 +1,5 @@
 from django.apps import AppConfig
-from django.db.models.signals import post_migrate
+from django.db.models.signals import post_delete, post_migrate, post_save
 
 
 class GuardianConfig(AppConfig):
@@ -7,6 +7,15 @@ class GuardianConfig(AppConfig):
     default_auto_field = "django.db.models.AutoField"
 
     def ready(self):
+        from django.contrib.auth.models import Permission
+
+        from .core import invalidate_permission_cache
         from .shortcuts import clear_ct_cache
+        from .utils import get_role_model, get_role_model_perms_model, get_role_obj_perms_model
 
         post_migrate.connect(clear_ct_cache)
+        for model in (get_role_obj_perms_model(), get_role_model_perms_model()):
+            post_save.connect(invalidate_permission_cache, sender=model)
+            post_delete.connect(invalidate_permission_cache, sender=model)
+        post_delete.connect(invalidate_permission_cache, sender=get_role_model())
+        post_delete.connect(invalidate_permission_cache, sender=Permission)
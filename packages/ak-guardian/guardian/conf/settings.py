@@ -8,6 +8,9 @@ GET_INIT_ANONYMOUS_USER = getattr(
 # Anonymous user cache TTL configuration
 # 0 = no cache (default), positive number = cache TTL in seconds, -1 = cache indefinitely
 ANONYMOUS_USER_CACHE_TTL = getattr(settings, "GUARDIAN_ANONYMOUS_USER_CACHE_TTL", 0)
+# Permission cache TTL configuration, shared by all `ObjectPermissionChecker` instances
+# 0 = no cache (default), positive number = cache TTL in seconds, -1 = cache indefinitely
+PERMISSION_CACHE_TTL = getattr(settings, "GUARDIAN_PERMISSION_CACHE_TTL", 0)
 
 group_model_label = getattr(settings, "GUARDIAN_GROUP_MODEL", None)
 role_model_label = getattr(settings, "GUARDIAN_ROLE_MODEL", None)
@@ -1,9 +1,18 @@
+from hashlib import sha256
+from typing import Any
+from uuid import uuid4
+
 from django.contrib.auth.models import Permission
+from django.core.cache import cache
 from django.db.models import Model, Q
 from django.utils.encoding import force_str
 
+from guardian.conf import settings as guardian_settings
 from guardian.utils import get_content_type, get_identity
 
+PERMISSION_CACHE_PREFIX = "guardian:perms"
+PERMISSION_CACHE_VERSION_KEY = f"{PERMISSION_CACHE_PREFIX}:version"
+
 
 def remove_app_label(perm: str) -> str:
     if "." in perm:
@@ -11,6 +20,15 @@ def remove_app_label(perm: str) -> str:
     return perm
 
 
+# kwargs are required to be connected to a django signal
+def invalidate_permission_cache(**kwargs) -> None:
+    """Invalidate the permissions cached by all processes.
+
+    Cached permissions are keyed by the set of roles they were resolved for, so changes to
+    membership don't need to invalidate them; changes to permissions or roles do."""
+    cache.set(PERMISSION_CACHE_VERSION_KEY, uuid4().hex, None)
+
+
 class ObjectPermissionChecker:
     """Generic object permissions checker class being the heart of `ak-guardian`.
 
@@ -26,6 +44,9 @@ class ObjectPermissionChecker:
        perm1/object1 on the same instance of ObjectPermissionChecker we won't see a
        difference as permissions are already fetched and stored within the cache
        dictionary.
+
+       When `GUARDIAN_PERMISSION_CACHE_TTL` is set, permissions are also cached across
+       instances and processes, keyed by the identity's set of roles.
     """
 
     def __init__(self, identity: Model | None = None) -> None:
@@ -36,6 +57,7 @@ class ObjectPermissionChecker:
         """
         self.user, self.group, self.role = get_identity(identity)  # type: ignore[arg-type] # None is not allowed
         self._obj_perms_cache: dict = {}
+        self._role_pks: list | None = None
 
     def has_perm(self, perm: str, obj: Model | None = None) -> bool:
         """Checks if user/group/role has the specified permission for the given object.
@@ -60,11 +82,23 @@ class ObjectPermissionChecker:
 
         return perm in perms
 
+    def get_role_pks(self) -> list:
+        """Get the primary keys of all roles of the user/group/role, resolved once"""
+        if self._role_pks is None:
+            if self.user:
+                roles = self.user.all_roles()
+            elif self.group:
+                roles = self.group.all_roles()
+            elif self.role:
+                return [self.role.pk]
+            else:
+                return []
+            self._role_pks = sorted(roles.values_list("pk", flat=True))
+        return self._role_pks
+
     def role_filter(self, related_name: str) -> dict:
-        if self.user:
-            return {f"{related_name}__role__in": self.user.all_roles()}
-        elif self.group:
-            return {f"{related_name}__role__in": self.group.all_roles()}
+        if self.user or self.group:
+            return {f"{related_name}__role__in": self.get_role_pks()}
         elif self.role:
             return {f"{related_name}__role": self.role}
         return {}
@@ -104,20 +138,51 @@ class ObjectPermissionChecker:
 
         key = self.get_local_cache_key(obj)
         if key not in self._obj_perms_cache:
-            if self.user and self.user.is_superuser:
-                perms = Permission.objects.all()
-                if obj:
-                    perms = perms.filter(get_content_type(type(obj)))
+            if guardian_settings.PERMISSION_CACHE_TTL != 0:
+                self._obj_perms_cache[key] = self._get_shared_perms(obj, key)
             else:
-                filter = Q(**self.model_filter())
-                if obj:
-                    filter |= Q(**self.object_filter(obj))
-                perms = Permission.objects.filter(filter)
-
-            perms_list = list(set(perms.values_list("content_type__app_label", "codename")))
-            self._obj_perms_cache[key] = {f"{ct}.{name}" for ct, name in perms_list}
+                self._obj_perms_cache[key] = self._query_perms(obj)
         return self._obj_perms_cache[key]
 
+    def _query_perms(self, obj: Model | None) -> set[str]:
+        if self.user and self.user.is_superuser:
+            perms = Permission.objects.all()
+            if obj:
+                perms = perms.filter(content_type=get_content_type(type(obj)))
+        else:
+            filter = Q(**self.model_filter())
+            if obj:
+                filter |= Q(**self.object_filter(obj))
+            perms = Permission.objects.filter(filter)
+
+        perms_list = list(set(perms.values_list("content_type__app_label", "codename")))
+        return {f"{ct}.{name}" for ct, name in perms_list}
+
+    def _get_shared_perms(self, obj: Model | None, key: tuple) -> set[str]:
+        """Get permissions from the cache shared by all checkers, keyed by the set of roles
+        and the object. The cache version is fetched alongside, so a hit is one round trip."""
+        if self.user and self.user.is_superuser:
+            identity = "superuser"
+        else:
+            identity = sha256(",".join(str(pk) for pk in self.get_role_pks()).encode()).hexdigest()
+        cache_key = f"{PERMISSION_CACHE_PREFIX}:{identity}:{key[0]}:{key[1]}"
+        cached: dict[str, Any] = cache.get_many([PERMISSION_CACHE_VERSION_KEY, cache_key])
+        version = cached.get(PERMISSION_CACHE_VERSION_KEY)
+        if version is None:
+            cache.add(PERMISSION_CACHE_VERSION_KEY, uuid4().hex, None)
+            version = cache.get(PERMISSION_CACHE_VERSION_KEY)
+        entry = cached.get(cache_key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        perms = self._query_perms(obj)
+        ttl = (
+            None
+            if guardian_settings.PERMISSION_CACHE_TTL == -1
+            else guardian_settings.PERMISSION_CACHE_TTL
+        )
+        cache.set(cache_key, (version, perms), ttl)
+        return perms
+
     def get_local_cache_key(self, obj: Model | None) -> tuple:
         """Returns cache key for `_obj_perms_cache` dict."""
         if not obj:
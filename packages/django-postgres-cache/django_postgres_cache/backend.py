@@ -4,32 +4,121 @@ from collections.abc import Iterable
 from datetime import UTC, datetime
 from typing import Any
 
+try:
+    from compression import zstd
+except ImportError:  # pragma: no cover
+    zstd = None  # type: ignore[assignment]
+
 from django.conf import settings
 from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache, get_key_func
-from django.db import DatabaseError
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections, router
 from django.utils.timezone import now
 from psqlextra.types import ConflictAction
 
+from django_postgres_cache.local import (
+    NOTIFY_CHANNEL,
+    NOTIFY_CLEAR,
+    LocalCache,
+    get_local_cache,
+    notify_payloads,
+)
 from django_postgres_cache.models import CacheEntry
 
+# First byte of `CacheEntry.data`, describing how the rest of it is encoded
+FORMAT_PICKLE = b"\x00"
+FORMAT_PICKLE_ZSTD = b"\x01"
+
 
 class DatabaseCache(BaseCache):
+    """Cache backed by a Postgres table.
+
+    Values are pickled into the binary ``data`` column. Rows written by older versions store
+    base64 in the ``value`` column instead, and are still read until they expire. Pickled values
+    of at least ``COMPRESS_MIN_LENGTH`` bytes are compressed with zstd, when available.
+
+    Older versions can only read the ``value`` column, so while ``LEGACY_VALUE`` is enabled
+    (the default), values are still written there in their format instead. Disable it once no
+    older version accesses the table anymore, e.g. after a rolling upgrade has finished.
+
+    Optionally, a per-process in-memory cache is used in front of the table, enabled by setting
+    the ``LOCAL_MAX_ENTRIES`` option. ``LOCAL_TIMEOUT`` bounds how long a value is served from
+    memory, and ``LISTEN_DB_ALIAS`` selects the database connection used to listen for
+    invalidations, which must not go through a transaction pooler."""
+
     pickle_protocol = pickle.HIGHEST_PROTOCOL
 
     def __init__(self, location: Any, params: dict[str, Any]) -> None:
         super().__init__(params)
         self.reverse_key_func = get_key_func(params["REVERSE_KEY_FUNCTION"])
+        options = params.get("OPTIONS", {})
+        self._compress_min_length = int(options.get("COMPRESS_MIN_LENGTH", 0))
+        self._legacy_value = bool(options.get("LEGACY_VALUE", True))
+        self._local: LocalCache | None = None
+        local_max_entries = int(options.get("LOCAL_MAX_ENTRIES", 0))
+        if local_max_entries > 0:
+            self._local = get_local_cache(
+                str(location),
+                local_max_entries,
+                float(options.get("LOCAL_TIMEOUT", 5)),
+                options.get("LISTEN_DB_ALIAS", DEFAULT_DB_ALIAS),
+            )
 
-    def _make_value(self, value: Any) -> str:
+    def _make_value(self, value: Any) -> bytes:
         pickled = pickle.dumps(value, self.pickle_protocol)
-        # The DB column is expecting a string, so make sure the value is a
-        # string, not bytes. Refs #19274.
-        b64encoded = base64.b64encode(pickled).decode("latin1")
+        if zstd is not None and 0 < self._compress_min_length <= len(pickled):
+            return FORMAT_PICKLE_ZSTD + zstd.compress(pickled)
+        return FORMAT_PICKLE + pickled
+
+    def _make_row(self, value: Any) -> tuple[str | None, bytes | None]:
+        """Get the `value` and `data` columns to store `value` in"""
+        if self._legacy_value:
+            pickled = pickle.dumps(value, self.pickle_protocol)
+            return base64.b64encode(pickled).decode("latin1"), None
+        return None, self._make_value(value)
+
+    def _pickled(self, data: bytes | memoryview | None, value: str | None) -> bytes:
+        """Get the pickled value of a row, from either the binary or the legacy column"""
+        if data is None:
+            return base64.b64decode(value.encode())  # type: ignore[union-attr]
+        data = bytes(data)
+        if data[:1] == FORMAT_PICKLE_ZSTD:
+            return zstd.decompress(data[1:])  # type: ignore[union-attr]
+        return data[1:]
+
+    def _unmake_value(self, data: bytes | memoryview | None, value: str | None = None) -> Any:
+        return pickle.loads(self._pickled(data, value))  # nosec
+
+    def _cache_locally(
+        self,
+        key: str,
+        data: bytes | memoryview | None,
+        value: str | None,
+        expires: datetime,
+        generation: int,
+    ) -> Any:
+        """Decode a row, keeping its pickled value in the local cache"""
+        pickled = self._pickled(data, value)
+        if self._local is not None:
+            expires_in = (expires - now()).total_seconds()
+            self._local.set(key, pickled, generation, expires_in)
+        return pickle.loads(pickled)  # nosec
+
+    def _table(self, using: str) -> str:
+        return connections[using].ops.quote_name(CacheEntry._meta.db_table)
 
-        return b64encoded
+    def _invalidate(self, keys: Iterable[str]) -> None:
+        """Evict `keys` from the local cache of this and all other processes. Other processes
+        are notified when the current transaction commits."""
+        if self._local is None:
+            return
+        keys = list(keys)
+        self._local.evict(keys)
+        self._notify(notify_payloads(keys))
 
-    def _unmake_value(self, encoded_value: str) -> Any:
-        return pickle.loads(base64.b64decode(encoded_value.encode()))  # nosec
+    def _notify(self, payloads: list[str]) -> None:
+        with connections[router.db_for_write(CacheEntry)].cursor() as cursor:
+            for payload in payloads:
+                cursor.execute("SELECT pg_notify(%s, %s)", [NOTIFY_CHANNEL, payload])
 
     def _make_expiry(self, timeout: float | None) -> datetime:
         tz = UTC if settings.USE_TZ else None
@@ -49,26 +138,46 @@ class DatabaseCache(BaseCache):
         version: int | None = None,
     ) -> bool:
         key = self.make_and_validate_key(key, version=version)
-        value = self._make_value(value)
+        legacy, data = self._make_row(value)
         expiry = self._make_expiry(timeout)
-        # No need for a transaction here, since old values get deleted
-        CacheEntry.objects.filter(cache_key=key, expires__lte=now()).delete()
+        using = router.db_for_write(CacheEntry)
+        # Insert, or take over the row if the existing value has expired, in one statement
+        table = self._table(using)
         try:
-            CacheEntry.objects.create(cache_key=key, value=value, expires=expiry)
-            return True
+            with connections[using].cursor() as cursor:
+                cursor.execute(
+                    f"INSERT INTO {table} (cache_key, value, data, expires) "  # nosec
+                    "VALUES (%s, %s, %s, %s) "
+                    "ON CONFLICT (cache_key) DO UPDATE "
+                    "SET value = EXCLUDED.value, data = EXCLUDED.data, "
+                    "expires = EXCLUDED.expires "
+                    f"WHERE {table}.expires <= %s "
+                    "RETURNING cache_key",
+                    [key, legacy, data, expiry, now()],
+                )
+                added = cursor.fetchone() is not None
         except DatabaseError:
-            # Any error, including integrity error and we didn't insert the row
             return False
+        if added:
+            self._invalidate([key])
+        return added
 
     def get(self, key: Any, default: Any | None = None, version: int | None = None) -> Any:
         key = self.make_and_validate_key(key, version=version)
+        generation = 0
+        if self._local is not None:
+            pickled = self._local.get(key)
+            if pickled is not None:
+                return pickle.loads(pickled)  # nosec
+            generation = self._local.generation
         try:
             entry = CacheEntry.objects.filter(cache_key=key, expires__gte=now()).first()
         except DatabaseError:
             entry = None
-        if entry is None:
+        # Rows without a value can't be decoded, treat them as a miss
+        if entry is None or (entry.data is None and entry.value is None):
             return default
-        return self._unmake_value(entry.value)
+        return self._cache_locally(key, entry.data, entry.value, entry.expires, generation)
 
     def set(
         self,
@@ -78,16 +187,18 @@ class DatabaseCache(BaseCache):
         version: int | None = None,
     ) -> None:
         key = self.make_and_validate_key(key, version=version)
-        value = self._make_value(value)
+        legacy, data = self._make_row(value)
         expiry = self._make_expiry(timeout)
         CacheEntry.objects.on_conflict(
             ["cache_key"],
             ConflictAction.UPDATE,
         ).insert(
             cache_key=key,
-            value=value,
+            value=legacy,
+            data=data,
             expires=expiry,
         )
+        self._invalidate([key])
 
     def touch(
         self,
@@ -97,19 +208,44 @@ class DatabaseCache(BaseCache):
     ) -> bool:
         key = self.make_and_validate_key(key, version=version)
         expiry = self._make_expiry(timeout)
-        return bool(CacheEntry.objects.filter(cache_key=key).update(expires=expiry))
+        updated = CacheEntry.objects.filter(cache_key=key).update(expires=expiry)
+        self._invalidate([key])
+        return bool(updated)
 
     def delete(self, key: Any, version: int | None = None) -> bool:
         key = self.make_and_validate_key(key, version=version)
         count, _ = CacheEntry.objects.filter(cache_key=key).delete()
+        self._invalidate([key])
         return bool(count)
 
     def get_many(self, keys: Iterable[Any], version: int | None = None) -> dict[Any, Any]:
         key_map = {self.make_and_validate_key(key, version=version): key for key in keys}
-        entries = CacheEntry.objects.filter(cache_key__in=key_map.keys(), expires__gte=now())
         result = {}
-        for entry in entries:
-            result[key_map[entry.cache_key]] = self._unmake_value(entry.value)
+        generation = 0
+        if self._local is not None:
+            for key in list(key_map.keys()):
+                pickled = self._local.get(key)
+                if pickled is not None:
+                    result[key_map.pop(key)] = pickle.loads(pickled)  # nosec
+            if not key_map:
+                return result
+            generation = self._local.generation
+        if not key_map:
+            return result
+        using = router.db_for_read(CacheEntry)
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                f"SELECT cache_key, data, value, expires FROM {self._table(using)} "  # nosec
+                "WHERE cache_key = ANY(%s) AND expires >= %s",
+                [list(key_map.keys()), now()],
+            )
+            rows = cursor.fetchall()
+        for cache_key, data, value, expires in rows:
+            if data is None and value is None:
+                continue
+            result[key_map[cache_key]] = self._cache_locally(
+                cache_key, data, value, expires, generation
+            )
         return result
 
     def has_key(self, key: Any, version: int | None = None) -> bool:
@@ -123,28 +259,44 @@ class DatabaseCache(BaseCache):
         version: int | None = None,
     ) -> list[Any]:
         expiry = self._make_expiry(timeout)
-        CacheEntry.objects.on_conflict(
-            ["cache_key"],
-            ConflictAction.UPDATE,
-        ).bulk_insert(
-            [
+        rows = []
+        for key, value in data.items():
+            legacy, pickled = self._make_row(value)
+            rows.append(
                 dict(
                     cache_key=self.make_and_validate_key(key, version=version),
-                    value=self._make_value(value),
+                    value=legacy,
+                    data=pickled,
                     expires=expiry,
                 )
-                for key, value in data.items()
-            ]
-        )
+            )
+        if not rows:
+            return []
+        # Single multi-row INSERT ... ON CONFLICT DO UPDATE
+        CacheEntry.objects.on_conflict(
+            ["cache_key"],
+            ConflictAction.UPDATE,
+        ).bulk_insert(rows)
+        self._invalidate(row["cache_key"] for row in rows)
         return []
 
     def delete_many(self, keys: Iterable[Any], version: int | None = None) -> None:
-        CacheEntry.objects.filter(
-            cache_key__in=[self.make_and_validate_key(key, version=version) for key in keys]
-        ).delete()
+        cache_keys = [self.make_and_validate_key(key, version=version) for key in keys]
+        if not cache_keys:
+            return
+        using = router.db_for_write(CacheEntry)
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {self._table(using)} WHERE cache_key = ANY(%s)",  # nosec
+                [cache_keys],
+            )
+        self._invalidate(cache_keys)
 
     def clear(self) -> None:
         CacheEntry.objects.truncate()
+        if self._local is not None:
+            self._local.clear()
+            self._notify([NOTIFY_CLEAR])
 
     def keys(self, keys_pattern: str, version: int | None = None) -> list[str]:
         """Return cache keys matching a glob pattern (``*`` wildcard).
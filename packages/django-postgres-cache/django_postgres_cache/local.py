@@ -0,0 +1,174 @@
+"""Per-process in-memory cache in front of the database cache.
+
+Entries are kept as pickled bytes, so every ``get`` returns a fresh object just like a
+database round trip would, while skipping the query and base64 decoding.
+
+Coherence across processes is provided by Postgres ``LISTEN``/``NOTIFY``: every write sends
+the affected keys on ``NOTIFY_CHANNEL`` within the writing transaction (so the notification
+is only delivered once the new value is visible), and each process runs a listener thread
+that evicts the keys it is notified about. The local cache is only used while the listener
+is connected, and entries are additionally bounded by a short TTL.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+
+from django.db import DatabaseError, connections
+from psycopg import sql
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "django_postgres_cache.invalidate"
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+NOTIFY_PAYLOAD_LIMIT = 7900
+# Payload sent to evict all entries, never a valid cache key as those can't contain spaces
+NOTIFY_CLEAR = " clear"
+LISTEN_TIMEOUT = 30
+LISTEN_RETRY_DELAY = 5
+
+
+class LocalCache:
+    """Thread-safe, size- and TTL-bounded LRU of pickled cache values."""
+
+    def __init__(self, max_entries: int, timeout: float) -> None:
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+        # Incremented on every eviction, see `generation`
+        self._generation = 0
+        self.active = False
+
+    @property
+    def generation(self) -> int:
+        """Capture before reading from the database and pass to `set`, so that a value read
+        before a concurrent invalidation is not stored."""
+        return self._generation
+
+    def get(self, key: str) -> bytes | None:
+        if not self.active:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            deadline, value = entry
+            if deadline < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, generation: int, expires_in: float) -> None:
+        if not self.active or expires_in <= 0:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[key] = (time.monotonic() + min(self.timeout, expires_in), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def evict(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def notify_payloads(keys: Iterable[str]) -> list[str]:
+    """Split keys into newline-separated NOTIFY payloads below the size limit"""
+    payloads: list[str] = []
+    current: list[str] = []
+    size = 0
+    for key in keys:
+        key_size = len(key.encode()) + 1
+        if key_size > NOTIFY_PAYLOAD_LIMIT:
+            # Can't be sent on its own, evict everything instead
+            return [NOTIFY_CLEAR]
+        if size + key_size > NOTIFY_PAYLOAD_LIMIT:
+            payloads.append("\n".join(current))
+            current, size = [], 0
+        current.append(key)
+        size += key_size
+    if current:
+        payloads.append("\n".join(current))
+    return payloads
+
+
+class InvalidationListener(threading.Thread):
+    """Listen for invalidations from other processes and apply them to a `LocalCache`"""
+
+    def __init__(self, local: LocalCache, db_alias: str) -> None:
+        super().__init__(name="django-postgres-cache-listener", daemon=True)
+        self.local = local
+        self.db_alias = db_alias
+        self.pid = os.getpid()
+
+    def handle(self, payload: str) -> None:
+        if payload == NOTIFY_CLEAR:
+            self.local.clear()
+            return
+        self.local.evict(payload.split("\n"))
+
+    def listen(self) -> None:
+        connection = connections.create_connection(self.db_alias)
+        try:
+            connection.set_autocommit(True)
+            with connection.cursor() as cursor:
+                cursor.execute(sql.SQL("LISTEN {}").format(sql.Identifier(NOTIFY_CHANNEL)))
+                # Anything could have changed while we weren't listening
+                self.local.clear()
+                self.local.active = True
+                while True:
+                    for notify in cursor.connection.notifies(timeout=LISTEN_TIMEOUT):
+                        self.handle(notify.payload)
+        finally:
+            self.local.active = False
+            self.local.clear()
+            connection.close()
+
+    def run(self) -> None:
+        while True:
+            try:
+                self.listen()
+            except DatabaseError as exc:
+                logger.warning("Cache invalidation listener disconnected: %s", exc)
+            time.sleep(LISTEN_RETRY_DELAY)
+
+
+_local_caches: dict[str, LocalCache] = {}
+_listeners: dict[str, InvalidationListener] = {}
+_registry_lock = threading.Lock()
+
+
+def get_local_cache(name: str, max_entries: int, timeout: float, db_alias: str) -> LocalCache:
+    """Get the process-wide local cache for `name`, starting its listener if required.
+
+    Django creates cache backend instances per thread, so the local cache is shared through
+    this registry. Listener threads don't survive a fork, so a new one is started in forked
+    children."""
+    with _registry_lock:
+        local = _local_caches.get(name)
+        if local is None:
+            local = _local_caches[name] = LocalCache(max_entries, timeout)
+        listener = _listeners.get(name)
+        if listener is None or listener.pid != os.getpid():
+            local.active = False
+            local.clear()
+            listener = _listeners[name] = InvalidationListener(local, db_alias)
+            listener.start()
+        return local
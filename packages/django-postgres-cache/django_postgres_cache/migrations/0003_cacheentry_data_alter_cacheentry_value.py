@@ -0,0 +1,25 @@
+# Generated by Django 5.2.17 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_postgres_cache", "0002_alter_cacheentry_managers"),
+    ]
+
+    operations = [
+        # Both operations only change the catalog, so they don't rewrite or lock the table for
+        # longer than necessary. Existing rows keep their `value` until they expire.
+        migrations.AddField(
+            model_name="cacheentry",
+            name="data",
+            field=models.BinaryField(null=True),
+        ),
+        migrations.AlterField(
+            model_name="cacheentry",
+            name="value",
+            field=models.TextField(null=True),
+        ),
+    ]
@@ -4,7 +4,9 @@ from psqlextra.manager import PostgresManager
 
 class CacheEntry(models.Model):
     cache_key = models.TextField(primary_key=True)
-    value = models.TextField()
+    # Legacy base64-encoded pickle, only set on rows written by older versions
+    value = models.TextField(null=True)
+    data = models.BinaryField(null=True)
     expires = models.DateTimeField(db_index=True)
 
     objects = PostgresManager()  # type: ignore[no-untyped-call]
@@ -1,17 +1,26 @@
 """Tests for django_postgres_cache.backend"""
 
+import base64
+import pickle  # nosec
+from unittest import skipIf
+
 from django.test import SimpleTestCase, override_settings
 from django.utils.timezone import is_aware, is_naive
 
-from django_postgres_cache.backend import DatabaseCache
+from django_postgres_cache.backend import (
+    FORMAT_PICKLE,
+    FORMAT_PICKLE_ZSTD,
+    DatabaseCache,
+    zstd,
+)
 
 
-def _cache() -> DatabaseCache:
+def _cache(**options) -> DatabaseCache:
     return DatabaseCache(
         "django_postgres_cache_cacheentry",
         {
             "TIMEOUT": 300,
-            "OPTIONS": {},
+            "OPTIONS": options,
             "KEY_PREFIX": "",
             "VERSION": 1,
             "KEY_FUNCTION": "django.core.cache.backends.base.default_key_func",
@@ -58,3 +67,43 @@ class MakeExpiryTests(SimpleTestCase):
 
         self.assertTrue(is_naive(expiry), "Expected a naive datetime")
         self.assertEqual(expiry.microsecond, 0)
+
+
+class ValueFormatTests(SimpleTestCase):
+    """Encoding of values stored in the cache table."""
+
+    def test_binary(self) -> None:
+        """Values are stored as raw pickles without base64."""
+        cache = _cache()
+        value = {"foo": ["bar"] * 100}
+        data = cache._make_value(value)
+        self.assertEqual(data[:1], FORMAT_PICKLE)
+        self.assertEqual(cache._unmake_value(data), value)
+
+    def test_legacy(self) -> None:
+        """Rows written with the base64 text format are still readable."""
+        value = {"foo": "bar"}
+        legacy = base64.b64encode(pickle.dumps(value)).decode("latin1")
+        self.assertEqual(_cache()._unmake_value(None, legacy), value)
+
+    def test_legacy_write(self) -> None:
+        """Values are written in the format older versions can read, unless disabled."""
+        value = {"foo": "bar"}
+        legacy, data = _cache()._make_row(value)
+        self.assertIsNone(data)
+        self.assertEqual(pickle.loads(base64.b64decode(legacy.encode())), value)  # nosec
+        legacy, data = _cache(LEGACY_VALUE=False)._make_row(value)
+        self.assertIsNone(legacy)
+        self.assertEqual(data[:1], FORMAT_PICKLE)
+        self.assertEqual(_cache()._unmake_value(data), value)
+
+    @skipIf(zstd is None, "zstd not available")
+    def test_compressed(self) -> None:
+        """Large values are compressed, small ones aren't."""
+        cache = _cache(COMPRESS_MIN_LENGTH=1024)
+        value = "foo" * 1000
+        data = cache._make_value(value)
+        self.assertEqual(data[:1], FORMAT_PICKLE_ZSTD)
+        self.assertLess(len(data), 1000)
+        self.assertEqual(cache._unmake_value(memoryview(data)), value)
+        self.assertEqual(cache._make_value("foo")[:1], FORMAT_PICKLE)
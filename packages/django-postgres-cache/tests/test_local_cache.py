@@ -0,0 +1,100 @@
+"""Tests for the per-process local cache in front of ``DatabaseCache``.
+
+Pure unit tests, no database access.
+"""
+
+from unittest import TestCase, mock
+
+from django_postgres_cache.local import (
+    NOTIFY_CLEAR,
+    NOTIFY_PAYLOAD_LIMIT,
+    InvalidationListener,
+    LocalCache,
+    notify_payloads,
+)
+
+
+def _local(max_entries: int = 10, timeout: float = 60) -> LocalCache:
+    local = LocalCache(max_entries, timeout)
+    local.active = True
+    return local
+
+
+class TestLocalCache(TestCase):
+    """LRU, TTL and generation handling of ``LocalCache``."""
+
+    def test_get_set(self) -> None:
+        local = _local()
+        local.set("foo", b"bar", local.generation, 60)
+        self.assertEqual(local.get("foo"), b"bar")
+        self.assertIsNone(local.get("baz"))
+
+    def test_inactive(self) -> None:
+        """Nothing is stored or served while the listener isn't connected."""
+        local = _local()
+        local.active = False
+        local.set("foo", b"bar", local.generation, 60)
+        self.assertEqual(len(local), 0)
+        self.assertIsNone(local.get("foo"))
+
+    def test_max_entries(self) -> None:
+        """The least recently used entry is evicted first."""
+        local = _local(max_entries=2)
+        local.set("a", b"a", local.generation, 60)
+        local.set("b", b"b", local.generation, 60)
+        local.get("a")
+        local.set("c", b"c", local.generation, 60)
+        self.assertEqual(local.get("a"), b"a")
+        self.assertIsNone(local.get("b"))
+        self.assertEqual(local.get("c"), b"c")
+
+    def test_timeout(self) -> None:
+        """Entries expire after the local timeout or the database expiry, whichever is first."""
+        local = _local(timeout=5)
+        with mock.patch("django_postgres_cache.local.time.monotonic", return_value=100):
+            local.set("local", b"a", local.generation, 60)
+            local.set("db", b"b", local.generation, 2)
+            local.set("expired", b"c", local.generation, -1)
+        with mock.patch("django_postgres_cache.local.time.monotonic", return_value=103):
+            self.assertEqual(local.get("local"), b"a")
+            self.assertIsNone(local.get("db"))
+            self.assertIsNone(local.get("expired"))
+        with mock.patch("django_postgres_cache.local.time.monotonic", return_value=106):
+            self.assertIsNone(local.get("local"))
+
+    def test_generation(self) -> None:
+        """A value read before a concurrent invalidation is not stored."""
+        local = _local()
+        generation = local.generation
+        local.evict(["foo"])
+        local.set("foo", b"stale", generation, 60)
+        self.assertIsNone(local.get("foo"))
+
+    def test_listener_handle(self) -> None:
+        local = _local()
+        for key in ("a", "b", "c"):
+            local.set(key, b"", local.generation, 60)
+        listener = InvalidationListener(local, "default")
+        listener.handle("a\nb")
+        self.assertIsNone(local.get("a"))
+        self.assertEqual(local.get("c"), b"")
+        listener.handle(NOTIFY_CLEAR)
+        self.assertEqual(len(local), 0)
+
+
+class TestNotifyPayloads(TestCase):
+    """Splitting keys into NOTIFY payloads."""
+
+    def test_single(self) -> None:
+        self.assertEqual(notify_payloads(["a", "b"]), ["a\nb"])
+
+    def test_split(self) -> None:
+        keys = [str(i) * 1000 for i in range(10)]
+        payloads = notify_payloads(keys)
+        self.assertGreater(len(payloads), 1)
+        for payload in payloads:
+            self.assertLess(len(payload), NOTIFY_PAYLOAD_LIMIT)
+        self.assertEqual([key for payload in payloads for key in payload.split("\n")], keys)
+
+    def test_oversized(self) -> None:
+        self.assertEqual(notify_payloads(["a", "b" * 8000]), [NOTIFY_CLEAR])
@@ -422,6 +422,20 @@ export function renderForm({
                         <ak-utils-time-delta-help></ak-utils-time-delta-help>`}
                 >
                 </ak-text-input>
+                <ak-text-input
+                    name="introspectionCacheValidity"
+                    label=${msg("Introspection Cache Validity")}
+                    value="${provider?.introspectionCacheValidity ?? "seconds=0"}"
+                    input-hint="code"
+                    required
+                    .bighelp=${html` <p class="pf-c-form__helper-text">
+                            ${msg(
+                                "Configure how long token introspection responses for this provider are cached for. Revoked tokens are removed from the cache immediately. Set to seconds=0 to disable caching.",
+                            )}
+                        </p>
+                        <ak-utils-time-delta-help></ak-utils-time-delta-help>`}
+                >
+                </ak-text-input>
                 <ak-form-element-horizontal label=${msg("Scopes")} name="propertyMappings">
                     <ak-dual-select-dynamic-selected
                         .provider=${propertyMappingsProvider}
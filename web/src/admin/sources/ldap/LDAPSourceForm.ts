@@ -3,10 +3,12 @@ import "#components/ak-secret-text-input";
 import "#components/ak-slug-input";
 import "#components/ak-radio-input";
 import "#components/ak-switch-input";
+import "#components/ak-text-input";
 import "#elements/ak-dual-select/ak-dual-select-dynamic-selected-provider";
 import "#elements/forms/FormGroup";
 import "#elements/forms/HorizontalFormElement";
 import "#elements/forms/SearchSelect/index";
+import "#elements/utils/TimeDeltaHelp";
 
 import { propertyMappingsProvider, propertyMappingsSelector } from "./LDAPSourceFormHelpers.js";
 
@@ -132,6 +134,28 @@ export class LDAPSourceForm extends BaseSourceForm<LDAPSource> {
                     "Delete authentik users and groups which were previously supplied by this source, but are now missing from it.",
                 )}
             ></ak-switch-input>
+            <ak-switch-input
+                name="incrementalSync"
+                label=${msg("Incremental Sync")}
+                ?checked=${this.instance?.incrementalSync ?? false}
+                help=${msg(
+                    "Only synchronize users and groups which were modified since the previous synchronization. Deleted objects are only removed during full synchronizations.",
+                )}
+            ></ak-switch-input>
+            <ak-text-input
+                name="fullSyncInterval"
+                label=${msg("Full Sync Interval")}
+                value="${this.instance?.fullSyncInterval ?? "hours=24"}"
+                input-hint="code"
+                required
+                .bighelp=${html`<p class="pf-c-form__helper-text">
+                        ${msg(
+                            "When incremental sync is enabled, configure how often a full synchronization is run.",
+                        )}
+                    </p>
+                    <ak-utils-time-delta-help></ak-utils-time-delta-help>`}
+            >
+            </ak-text-input>
             <ak-form-group open label="${msg("Connection settings")}">
                 <div class="pf-c-form">
                     <ak-form-element-horizontal